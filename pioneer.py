@@ -2,18 +2,150 @@
 import utils.helper as helper
 import utils.gvars as gvars
 from pkg.MigrationProject import MigrationProject, MigrationProjectDatabase
-from pkg import PioneerDatabase
+from pkg import PioneerDatabase, DBConnectionPool
 from pkg.SecurityDevice import SecurityDevice, SecurityDeviceDatabase 
 from pkg.SecurityDevice.SecurityDeviceFactory import SecurityDeviceFactory
+from pkg.SecurityDevice.ImportScheduler import ImportScheduler
+from pkg.SecurityDevice.APIResponseCache import APIResponseCache
+from pkg.SecurityDevice.DeviceRefresh import DeviceRefresh
 from pkg.MigrationProject import MigrationProjectFactory
 import sys
 from datetime import datetime, timezone
 import time
 from pkg.Container.PioneerContainer import PioneerSecurityPolicyContainer, PioneerNATPolicyContainer
+from pkg.MigrationProject.MigrationPipeline import MigrationPipeline
 
 # Disable logging for the 'fireREST' logger
 helper.logging.getLogger('fireREST').setLevel(helper.logging.CRITICAL)
 
+def import_security_device_data(security_device_object, device_name, import_threads, offline, stream_pages=False):
+    """
+    Import the containers, objects and policies of a security device in its db.
+
+    Args:
+        security_device_object (SecurityDevice): The security device. Its db must already be set.
+        device_name (str): The name of the security device.
+        import_threads (int): The number of threads retrieving data from the device.
+        offline (bool): If True, the data is replayed from the API snapshot of the device.
+        stream_pages (bool): If True, the objects are saved page by page while they are retrieved.
+    """
+    general_logger = helper.logging.getLogger(gvars.general_logger)
+
+    # Retrieve the data from the device in parallel, while it is processed below in dependency order
+    # Responses replayed from an API snapshot do not count against the rate limit of the device
+    requests_per_minute = 0 if offline else gvars.fmc_api_requests_per_minute
+    with ImportScheduler(security_device_object, import_threads, requests_per_minute, stream_pages) as import_scheduler:
+        import_scheduler.prefetch_container_info([
+            gvars.object_containers,
+            gvars.security_zone_container,
+            gvars.managed_device_container,
+            gvars.security_policy_container,
+            gvars.nat_policy_container
+        ])
+
+        # Log the import of object container data
+        print("Importing the object container data.")
+        general_logger.info(f"################## Getting the object containers of device: <{device_name}>. ##################")
+
+        # Import and insert the object container data
+        object_containers_list = security_device_object.get_container_info_from_device_conn(gvars.object_containers, import_scheduler.container_info(gvars.object_containers))
+
+        # Log the import of security zones container data
+        print("Importing security zones container data.")
+        zone_containers_list = security_device_object.get_container_info_from_device_conn(gvars.security_zone_container, import_scheduler.container_info(gvars.security_zone_container))
+
+        # Log the import of managed devices container data
+        print("Importing managed devices container data.")
+        managed_devices_container_list = security_device_object.get_container_info_from_device_conn(gvars.managed_device_container, import_scheduler.container_info(gvars.managed_device_container))
+
+        # Log the import of security policy containers data
+        print("Importing the security policy containers info.")
+        security_policy_containers_list = security_device_object.get_container_info_from_device_conn(gvars.security_policy_container, import_scheduler.container_info(gvars.security_policy_container))
+
+        # Log the import of NAT policy containers data
+        print("Importing the NAT policy containers info.")
+        nat_policy_containers_list = security_device_object.get_container_info_from_device_conn(gvars.nat_policy_container, import_scheduler.container_info(gvars.nat_policy_container))
+
+        # Schedule the retrieval of all the objects and policies now that their containers are known
+        import_scheduler.prefetch_object_info([
+            gvars.network_object,
+            gvars.network_group_object,
+            gvars.port_object,
+            gvars.port_group_object,
+            gvars.url_object,
+            gvars.url_group_object,
+            gvars.schedule_object
+        ], object_containers_list)
+        import_scheduler.prefetch_object_info([gvars.security_zone], zone_containers_list)
+        if managed_devices_container_list is not None:
+            import_scheduler.prefetch_object_info([gvars.managed_device], managed_devices_container_list)
+        import_scheduler.prefetch_object_info([gvars.security_policy], security_policy_containers_list)
+        import_scheduler.prefetch_object_info([gvars.nat_policy], nat_policy_containers_list)
+
+        # Log the import of object data
+        print("Importing the object data")
+        general_logger.info(f"################## Getting the objects of device: <{device_name}>. ##################")
+
+        # Iterate through each object container and import relevant data
+        for object_container in object_containers_list:
+            # Log and import network objects
+            general_logger.info(f"################## Getting the network objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
+            print("Import network objects.")
+            security_device_object.get_object_info_from_device_conn(gvars.network_object, object_container, import_scheduler.object_info(gvars.network_object, object_container))
+
+            # Log and import network group objects
+            general_logger.info(f"################## Getting the network group objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
+            print("Import network group objects.")
+            security_device_object.get_object_info_from_device_conn(gvars.network_group_object, object_container, import_scheduler.object_info(gvars.network_group_object, object_container))
+
+            # Log and import port objects
+            general_logger.info(f"################## Getting the port objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
+            print("Import port objects.")
+            security_device_object.get_object_info_from_device_conn(gvars.port_object, object_container, import_scheduler.object_info(gvars.port_object, object_container))
+
+            # Log and import port group objects
+            general_logger.info(f"################## Getting the port group objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
+            print("Import port group objects.")
+            security_device_object.get_object_info_from_device_conn(gvars.port_group_object, object_container, import_scheduler.object_info(gvars.port_group_object, object_container))
+
+            # Log and import URL objects
+            general_logger.info(f"################## Getting the URL objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
+            print("Import URL objects.")
+            security_device_object.get_object_info_from_device_conn(gvars.url_object, object_container, import_scheduler.object_info(gvars.url_object, object_container))
+
+            # Log and import URL group objects
+            general_logger.info(f"################## Getting the URL group objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
+            print("Import URL group objects.")
+            security_device_object.get_object_info_from_device_conn(gvars.url_group_object, object_container, import_scheduler.object_info(gvars.url_group_object, object_container))
+
+            # Log and import schedule objects
+            general_logger.info(f"################## Getting the schedule objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
+            print("Import the schedule objects.")
+            security_device_object.get_object_info_from_device_conn(gvars.schedule_object, object_container, import_scheduler.object_info(gvars.schedule_object, object_container))
+
+        # Iterate through each zone container and import zone data
+        for zone_container in zone_containers_list:
+            print("Importing the interfaces/zones data.")
+            security_device_object.get_object_info_from_device_conn(gvars.security_zone, zone_container, import_scheduler.object_info(gvars.security_zone, zone_container))
+
+        # Log and import managed devices
+        general_logger.info(f"################## Getting the managed devices of device: <{device_name}>. ##################")
+        print("Importing the managed devices data.")
+        if managed_devices_container_list is not None:
+            for managed_device_container in managed_devices_container_list:
+                security_device_object.get_object_info_from_device_conn(gvars.managed_device, managed_device_container, import_scheduler.object_info(gvars.managed_device, managed_device_container))
+
+        # Log and import security policies
+        print("Importing security policies.")
+        for security_policy_container in security_policy_containers_list:
+            security_device_object.get_object_info_from_device_conn(gvars.security_policy, security_policy_container, import_scheduler.object_info(gvars.security_policy, security_policy_container))
+
+        # Log and import NAT policies
+        print("Importing NAT policies.")
+        for nat_policy_container in nat_policy_containers_list:
+            security_device_object.get_object_info_from_device_conn(gvars.nat_policy, nat_policy_container, import_scheduler.object_info(gvars.nat_policy, nat_policy_container))
+
+
 def main():
     # Retrieve db credentials and connection details from global variables
     db_user = gvars.pioneer_db_user
@@ -32,11 +164,12 @@ def main():
     pioneer_args = vars(pioneer_args)
 
     # Check if the necessary arguments for creating a security device are provided
+    # Config file devices are created from their config file instead of their connection details
     if (pioneer_args["create_security_device [name]"] and 
         pioneer_args["device_type [type]"] and 
-        pioneer_args["hostname [hostname]"] and 
+        ((pioneer_args["hostname [hostname]"] and 
         pioneer_args["username [username]"] and 
-        pioneer_args["secret [secret]"]):
+        pioneer_args["secret [secret]"]) or pioneer_args["config_file [path]"])):
 
         # Extract information about the security device from pioneer_args
         device_name = pioneer_args["create_security_device [name]"]
@@ -46,6 +179,14 @@ def main():
         device_secret = pioneer_args["secret [secret]"]
         device_port = pioneer_args["port [port]"]
         device_domain = pioneer_args["domain [fmc_domain]"]
+        insert_batch_size = pioneer_args["insert_batch_size"]
+        bulk_load = pioneer_args["bulk_load"]
+        atomic_import = pioneer_args["atomic_import"]
+        commit_every = pioneer_args["commit_every"]
+        import_threads = pioneer_args["import_threads"]
+        stream_pages = pioneer_args["stream_pages"]
+        offline = pioneer_args["offline"]
+        use_snapshot = pioneer_args["use_snapshot"] or pioneer_args["refresh_snapshot"] or offline
 
         # Set up logging directory
         log_folder = helper.os.path.join('log', f'device_{device_name}')
@@ -76,7 +217,25 @@ def main():
             security_device_object = SecurityDeviceFactory.build_api_security_device(
                 device_uuid, device_name, device_type, 
                 security_device_db, device_hostname, device_username, 
-                device_secret, device_port, device_domain
+                device_secret, device_port, device_domain, offline
+            )
+
+            # Reuse the raw API responses stored by previous imports of the device
+            if use_snapshot:
+                api_response_cache = APIResponseCache(device_name, pioneer_args["snapshot_ttl"], offline)
+                if pioneer_args["refresh_snapshot"]:
+                    api_response_cache.invalidate()
+                security_device_object.api_response_cache = api_response_cache
+        elif '_config' in device_type:
+            general_logger.info(f"The device <{device_name}> is a config file device. Its config file will be used for importing it.")
+
+            # The path of the config file is stored as the hostname of the device, so it is found again when the device is refreshed
+            device_hostname = pioneer_args["config_file [path]"]
+            device_username = device_username or ''
+            device_secret = ''
+            security_device_object = SecurityDeviceFactory.build_config_security_device(
+                device_uuid, device_name, device_type,
+                security_device_db, device_hostname
             )
         else:
             general_logger.critical(f"Provided device type <{device_type}> is invalid.")
@@ -101,114 +260,82 @@ def main():
             security_device_db_cursor = PioneerDatabase.connect_to_db(db_user, security_device_db_name, db_password, db_host, db_port)
             security_device_db = SecurityDeviceDatabase(security_device_db_cursor)
 
-            # Create the necessary tables in the device db
-            security_device_db.create_security_device_tables()
+            # Run the whole import inside an import session, so the writes are grouped in transactions
+            with security_device_db.import_session(atomic_import, commit_every):
+                # Create the necessary tables in the device db
+                security_device_db.create_security_device_tables()
 
-            # Set the db for the security device object
-            security_device_object.db = security_device_db
+                # Queue the imported rows and write them to the db in batches. In bulk load mode, the largest tables are loaded with COPY
+                security_device_db.start_buffered_inserts(insert_batch_size, bulk_load)
 
-            # Insert general device info into the db
-            general_logger.info(f"Inserting general device info in the db.")
-            security_device_object.save_general_info(
-                security_device_object.uid, device_name, device_username, 
-                device_secret, device_hostname, device_type, 
-                device_port, device_version, device_domain
-            )
+                # Set the db for the security device object
+                security_device_object.db = security_device_db
 
-            # Log the import of object container data
-            print("Importing the object container data.")
-            general_logger.info(f"################## Getting the object containers of device: <{device_name}>. ##################")
-            
-            # Import and insert the object container data
-            object_containers_list = security_device_object.get_container_info_from_device_conn(gvars.object_containers)
-            
-            # Log the import of security zones container data
-            print("Importing security zones container data.")
-            zone_containers_list = security_device_object.get_container_info_from_device_conn(gvars.security_zone_container)
-            
-            # Log the import of managed devices container data
-            print("Importing managed devices container data.")
-            managed_devices_container_list = security_device_object.get_container_info_from_device_conn(gvars.managed_device_container)
-            
-            # Log the import of security policy containers data
-            print("Importing the security policy containers info.")
-            security_policy_containers_list = security_device_object.get_container_info_from_device_conn(gvars.security_policy_container)
+                # Insert general device info into the db
+                general_logger.info(f"Inserting general device info in the db.")
+                security_device_object.save_general_info(
+                    security_device_object.uid, device_name, device_username, 
+                    device_secret, device_hostname, device_type, 
+                    device_port, device_version, device_domain
+                )
 
-            # Log the import of NAT policy containers data
-            print("Importing the NAT policy containers info.")
-            nat_policy_containers_list = security_device_object.get_container_info_from_device_conn(gvars.nat_policy_container)
-            
-            # Log the import of object data
-            print("Importing the object data")
-            general_logger.info(f"################## Getting the objects of device: <{device_name}>. ##################")
-            
-            # Iterate through each object container and import relevant data
-            for object_container in object_containers_list:
-                # Log and import network objects
-                general_logger.info(f"################## Getting the network objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
-                print("Import network objects.")
-                security_device_object.get_object_info_from_device_conn(gvars.network_object, object_container)
-
-                # Log and import network group objects
-                general_logger.info(f"################## Getting the network group objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
-                print("Import network group objects.")
-                security_device_object.get_object_info_from_device_conn(gvars.network_group_object, object_container)
-
-                # Log and import port objects
-                general_logger.info(f"################## Getting the port objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
-                print("Import port objects.")
-                security_device_object.get_object_info_from_device_conn(gvars.port_object, object_container)
-                
-                # Log and import port group objects
-                general_logger.info(f"################## Getting the port group objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
-                print("Import port group objects.")
-                security_device_object.get_object_info_from_device_conn(gvars.port_group_object, object_container)
-                
-                # Log and import URL objects
-                general_logger.info(f"################## Getting the URL objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
-                print("Import URL objects.")
-                security_device_object.get_object_info_from_device_conn(gvars.url_object, object_container)
-                
-                # Log and import URL group objects
-                general_logger.info(f"################## Getting the URL group objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
-                print("Import URL group objects.")
-                security_device_object.get_object_info_from_device_conn(gvars.url_group_object, object_container)
-
-                # Log and import schedule objects
-                general_logger.info(f"################## Getting the schedule objects of device: <{device_name}>. Container: <{object_container.name}> ##################")
-                print("Import the schedule objects.")
-                security_device_object.get_object_info_from_device_conn(gvars.schedule_object, object_container)
-            
-            # Iterate through each zone container and import zone data
-            for zone_container in zone_containers_list:
-                print("Importing the interfaces/zones data.")
-                security_device_object.get_object_info_from_device_conn(gvars.security_zone, zone_container)
-
-            # Log and import managed devices
-            general_logger.info(f"################## Getting the managed devices of device: <{device_name}>. ##################")
-            print("Importing the managed devices data.")
-            if managed_devices_container_list is not None:
-                for managed_device_container in managed_devices_container_list:
-                    security_device_object.get_object_info_from_device_conn(gvars.managed_device, managed_device_container)
-            
-            # Log and import security policies
-            print("Importing security policies.")
-            for security_policy_container in security_policy_containers_list:
-                security_device_object.get_object_info_from_device_conn(gvars.security_policy, security_policy_container)
+                # Import the containers, objects and policies of the device
+                import_security_device_data(security_device_object, device_name, import_threads, offline, stream_pages)
 
-            # Log and import NAT policies
-            print("Importing NAT policies.")
-            for nat_policy_container in nat_policy_containers_list:
-                security_device_object.get_object_info_from_device_conn(gvars.nat_policy, nat_policy_container)
+                # Write the rows that are still queued and disable the buffered inserts
+                security_device_db.stop_buffered_inserts()
 
         else:
             # Log critical error and exit if device version retrieval fails
             general_logger.critical(f"Failed to retrieve version of the security device. Exiting...")
             sys.exit(1)
         
-        # Close the cursors used to connect to the dbs
-        landing_db_cursor.close()
-        security_device_db_cursor.close()
+        # Close the cursors used to connect to the dbs and give their connections back to the pool
+        PioneerDatabase.release_db_connection(landing_db_cursor)
+        PioneerDatabase.release_db_connection(security_device_db_cursor)
+
+    if pioneer_args['device_name [device_name]'] and pioneer_args['refresh']:
+        device_name = pioneer_args['device_name [device_name]']
+        offline = pioneer_args["offline"]
+        use_snapshot = pioneer_args["use_snapshot"] or pioneer_args["refresh_snapshot"] or offline
+
+        # Set up logging directory, the same one as the first import of the device
+        log_folder = helper.os.path.join('log', f'device_{device_name}')
+        helper.setup_logging(log_folder, {gvars.general_logger: gvars.general_log_file,
+                                          gvars.special_policies_logger: gvars.special_policies_logger_file})
+
+        # Build the security device from the connection details stored by its first import
+        security_device_object = SecurityDeviceFactory.create_security_device(db_user, device_name, db_password, db_host, db_port, offline)
+        security_device_db = security_device_object.db
+        general_logger = helper.logging.getLogger(gvars.general_logger)
+        general_logger.info(f"################## REFRESHING DEVICE: <{device_name}> ##################")
+
+        # Reuse the raw API responses stored by previous imports of the device
+        if use_snapshot:
+            api_response_cache = APIResponseCache(device_name, pioneer_args["snapshot_ttl"], offline)
+            if pioneer_args["refresh_snapshot"]:
+                api_response_cache.invalidate()
+            security_device_object.api_response_cache = api_response_cache
+
+        with security_device_db.import_session(pioneer_args["atomic_import"], pioneer_args["commit_every"]):
+            # Devices imported by older versions do not have the content hashes table yet
+            security_device_db.row_content_hashes_table.create()
+
+            # Compare the data returned by the device with the previous import and only write the differences
+            device_refresh = DeviceRefresh(security_device_db)
+            security_device_object.device_refresh = device_refresh
+            with security_device_db.upserting():
+                import_security_device_data(security_device_object, device_name, pioneer_args["import_threads"], offline, pioneer_args["stream_pages"])
+                device_refresh.delete_stale_rows()
+
+        device_refresh.log_summary()
+        PioneerDatabase.release_db_connection(security_device_db.cursor)
+
+    if pioneer_args['device_name [device_name]'] and pioneer_args['create_indexes']:
+        # Add the indexes missing from the db of a security device imported by an older version
+        security_device = SecurityDeviceFactory.create_security_device(db_user, pioneer_args['device_name [device_name]'], db_password, db_host, db_port)
+        security_device.db.create_missing_indexes()
+        PioneerDatabase.release_db_connection(security_device.db.cursor)
 
     if pioneer_args['create_project [name]']:
         # Extract the project name from arguments
@@ -234,15 +361,19 @@ def main():
         # Save general information about the project
         migration_project.save_general_info('TEST_DESC', creation_timestamp)
 
-        # Close the cursors
-        landing_db_cursor.close()
-        migration_project.db.cursor.close()
+        # Close the cursors and give their connections back to the pool
+        PioneerDatabase.release_db_connection(landing_db_cursor)
+        PioneerDatabase.release_db_connection(migration_project.db.cursor)
 
     if pioneer_args['project [name]']:
         # Extract the project name from arguments
         project_name = pioneer_args['project [name]']
         migration_project = MigrationProjectFactory.create_migration_project(db_user, project_name, db_password, db_host, db_port)
 
+        # Add the indexes missing from projects created by older versions
+        if pioneer_args['create_indexes']:
+            migration_project.db.create_missing_indexes()
+
         # Set source and target devices if provided
         if pioneer_args['set_source_device [name]'] and pioneer_args['set_target_device [name]']:
             source_device = SecurityDeviceFactory.create_security_device(db_user, pioneer_args['set_source_device [name]'], db_password, db_host, db_port)
@@ -274,20 +405,46 @@ def main():
             migration_project.set_security_profile(security_profile_name)
 
         # Perform migration if requested
-        if pioneer_args['migrate']:
+        if pioneer_args['migrate'] or pioneer_args['migrate_all']:
             migration_project = MigrationProjectFactory.build_migration_project(migration_project.name, migration_project.db)
-
-            # Process and migrate security policy container if provided
-            if pioneer_args['security_policy_container']:
-                security_policy_container = PioneerSecurityPolicyContainer(migration_project, pioneer_args['security_policy_container'], None)
-                security_policy_container.process_and_migrate()
+            migration_project.push_chunk_size = pioneer_args['push_chunk_size']
+            migration_project.migration_threads = pioneer_args['migration_threads']
+
+            # Only migrate what is missing or changed on the target device if requested
+            # The inventory is retrieved before the plan is started, as the plan does not connect to the device
+            if pioneer_args['incremental']:
+                migration_project.load_target_inventory()
+
+            # Render the migration into a plan instead of sending it to the target device if requested
+            if pioneer_args['plan [path]']:
+                migration_project.start_migration_plan()
+
+            try:
+                # Process and migrate security policy container if provided
+                if pioneer_args['security_policy_container']:
+                    security_policy_container = PioneerSecurityPolicyContainer(migration_project, pioneer_args['security_policy_container'], None)
+                    security_policy_container.process_and_migrate()
             
-            if pioneer_args['nat_policy_container']:
-                nat_policy_container = PioneerNATPolicyContainer(migration_project, pioneer_args['nat_policy_container'], None)
-                nat_policy_container.process_and_migrate()
+                if pioneer_args['nat_policy_container']:
+                    nat_policy_container = PioneerNATPolicyContainer(migration_project, pioneer_args['nat_policy_container'], None)
+                    nat_policy_container.process_and_migrate()
+
+                # Migrate all the mapped containers if requested
+                if pioneer_args['migrate_all']:
+                    MigrationPipeline(migration_project).run()
+
+                if pioneer_args['plan [path]']:
+                    migration_project.write_migration_plan(pioneer_args['plan [path]'])
+            finally:
+                # Keep the names given to the objects and policies, even if the migration failed
+                migration_project.save_name_map()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Close all the pooled db connections before exiting
+        DBConnectionPool.close_all()
 
 #TODO: there is a problem with importing some NAT policies, fix it :(
 # rewrite the map-container like migrate argument
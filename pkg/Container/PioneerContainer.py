@@ -45,6 +45,17 @@ class PioneerSecurityPolicyContainer(SecurityPolicyContainer):
         """
         Processes and migrates security policies, network objects, port objects, URL objects, and policy categories.
         """
+        self.migrate(self.load_migration_data())
+
+    def load_migration_data(self) -> dict:
+        """
+        Loads the security policies of the container and the objects they use from the database.
+
+        Only the database is accessed, so the data of a container can be loaded while another one is migrated.
+
+        Returns:
+            dict: The policies, the objects and the policy categories to migrate, as expected by migrate().
+        """
         policies_list = []
         network_objects_set = set()
         network_group_objects_set = set()
@@ -62,9 +73,14 @@ class PioneerSecurityPolicyContainer(SecurityPolicyContainer):
             order_param='index'
         )
 
+        # Retrieve the objects used by all the policies of the container at once
+        relationships = PioneerSecurityPolicy.load_container_relationships(self)
+
         # Process each security policy entry
         for entry in policies:
-            policy = PioneerSecurityPolicy(self, entry)
+            # Policies without any relationship rows get an empty dictionary, so they do not query the database either
+            policy_relationships = relationships.get(entry[0], {}) if relationships is not None else None
+            policy = PioneerSecurityPolicy(self, entry, policy_relationships)
             policy.log_special_parameters()
 
             # Update network-related objects
@@ -90,8 +106,39 @@ class PioneerSecurityPolicyContainer(SecurityPolicyContainer):
             # Add the policy to the list of policies that will be migrated
             policies_list.append(policy)
 
-        # Migrate the network objects
+        # Add the members of the groups to the objects to migrate
         PioneerDeviceObject.recursive_update_objects_and_groups(network_objects_set, network_group_objects_set)
+        PioneerDeviceObject.recursive_update_objects_and_groups(port_objects_set, port_group_objects_set)
+        PioneerDeviceObject.recursive_update_objects_and_groups(url_objects_set, url_group_objects_set)
+
+        return {
+            'policies': policies_list,
+            'network_objects': network_objects_set,
+            'network_group_objects': network_group_objects_set,
+            'port_objects': port_objects_set,
+            'port_group_objects': port_group_objects_set,
+            'url_objects': url_objects_set,
+            'url_group_objects': url_group_objects_set,
+            'policy_categories': policy_categories_set
+        }
+
+    def migrate(self, migration_data) -> None:
+        """
+        Migrates the policies and objects loaded by load_migration_data() to the target device.
+
+        Args:
+            migration_data (dict): The data returned by load_migration_data().
+        """
+        policies_list = migration_data['policies']
+        network_objects_set = migration_data['network_objects']
+        network_group_objects_set = migration_data['network_group_objects']
+        port_objects_set = migration_data['port_objects']
+        port_group_objects_set = migration_data['port_group_objects']
+        url_objects_set = migration_data['url_objects']
+        url_group_objects_set = migration_data['url_group_objects']
+        policy_categories_set = migration_data['policy_categories']
+
+        # Migrate the network objects
         if not network_objects_set:
             pass
         else:
@@ -106,7 +153,6 @@ class PioneerSecurityPolicyContainer(SecurityPolicyContainer):
             self._security_device.migrate_network_group_objects(network_group_objects_set)
 
         # Migrate the port objects
-        PioneerDeviceObject.recursive_update_objects_and_groups(port_objects_set, port_group_objects_set)
         if not port_objects_set:
             pass
         else:
@@ -120,7 +166,6 @@ class PioneerSecurityPolicyContainer(SecurityPolicyContainer):
             print("migrating port group objects")
             self._security_device.migrate_port_group_objects(port_group_objects_set)
 
-        PioneerDeviceObject.recursive_update_objects_and_groups(url_objects_set, url_group_objects_set)
         # Migrate the url objects
         if not url_objects_set:
             pass
@@ -179,6 +224,17 @@ class PioneerNATPolicyContainer(NATPolicyContainer):
         """
         Processes and migrates NAT policies, network objects, port objects associated with the to-be-migrated NAT policies.
         """
+        self.migrate(self.load_migration_data())
+
+    def load_migration_data(self):
+        """
+        Loads the NAT policies of the container and the objects they use from the database.
+
+        Only the database is accessed, so the data of a container can be loaded while another one is migrated.
+
+        Returns:
+            dict: The policies and the objects to migrate, as expected by migrate().
+        """
         policies_list = []
         network_objects_set = set()
         network_group_objects_set = set()
@@ -193,9 +249,14 @@ class PioneerNATPolicyContainer(NATPolicyContainer):
             order_param='index'
         )
 
+        # Retrieve the objects used by all the NAT policies of the container at once
+        relationships = PioneerNATPolicy.load_container_relationships(self)
+
         # Process each security policy entry
         for entry in policies:
-            policy = PioneerNATPolicy(self, entry)
+            # Policies without any relationship rows get an empty dictionary, so they do not query the database either
+            policy_relationships = relationships.get(entry[0], {}) if relationships is not None else None
+            policy = PioneerNATPolicy(self, entry, policy_relationships)
             #TODO: this policy should log static NAT policies that use group objects
 #            policy.log_special_parameters()
 
@@ -230,8 +291,32 @@ class PioneerNATPolicyContainer(NATPolicyContainer):
             # Add the policy to the list of policies that will be migrated
             policies_list.append(policy)
 
-        # Migrate the network objects
+        # Add the members of the groups to the objects to migrate
         PioneerDeviceObject.recursive_update_objects_and_groups(network_objects_set, network_group_objects_set)
+        PioneerDeviceObject.recursive_update_objects_and_groups(port_objects_set, port_group_objects_set)
+
+        return {
+            'policies': policies_list,
+            'network_objects': network_objects_set,
+            'network_group_objects': network_group_objects_set,
+            'port_objects': port_objects_set,
+            'port_group_objects': port_group_objects_set
+        }
+
+    def migrate(self, migration_data):
+        """
+        Migrates the NAT policies and objects loaded by load_migration_data() to the target device.
+
+        Args:
+            migration_data (dict): The data returned by load_migration_data().
+        """
+        policies_list = migration_data['policies']
+        network_objects_set = migration_data['network_objects']
+        network_group_objects_set = migration_data['network_group_objects']
+        port_objects_set = migration_data['port_objects']
+        port_group_objects_set = migration_data['port_group_objects']
+
+        # Migrate the network objects
         if not network_objects_set:
             pass
         else:
@@ -246,7 +331,6 @@ class PioneerNATPolicyContainer(NATPolicyContainer):
             self._security_device.migrate_network_group_objects(network_group_objects_set)
 
         # Migrate the port objects
-        PioneerDeviceObject.recursive_update_objects_and_groups(port_objects_set, port_group_objects_set)
         if not port_objects_set:
             pass
         else:
@@ -9,6 +9,130 @@ from abc import abstractmethod
 general_logger = helper.logging.getLogger('general')
 
 class FMCObjectWithLiterals(Object):
+    # Objects converted from literals during the current import, keyed by (object type, container uid, normalized literal).
+    # The same literal is often used by many groups and policies, so it is converted and saved only once.
+    _converted_literals = {}
+
+    @staticmethod
+    def clear_converted_literals():
+        """
+        Forget the objects converted from literals. Called when a new import starts.
+        """
+        FMCObjectWithLiterals._converted_literals = {}
+
+    @staticmethod
+    def save_converted_literal(object_type, ObjectContainer, literal_key, convert_literal, Database):
+        """
+        Convert a literal to an object and save it, unless the same literal was already converted during the import.
+
+        Args:
+            object_type (str): The type of the converted object, for example gvars.network_object.
+            ObjectContainer: The container holding the converted object.
+            literal_key: The normalized value of the literal. Literals with the same value are converted to the same object.
+            convert_literal (Callable): Function building the object from the literal.
+            Database: The db instance where the object is saved.
+
+        Returns:
+            Object: The object the literal was converted to.
+        """
+        cache_key = (object_type, ObjectContainer.uid, literal_key)
+        converted_literal = FMCObjectWithLiterals._converted_literals.get(cache_key)
+        if converted_literal is None:
+            converted_literal = convert_literal()
+            # A refreshed device keeps the objects converted by the previous import instead of saving new copies
+            device_refresh = ObjectContainer.security_device.device_refresh
+            if device_refresh is None or device_refresh.reuse_converted_literal(object_type, converted_literal, ObjectContainer.uid):
+                converted_literal.save(Database)
+            FMCObjectWithLiterals._converted_literals[cache_key] = converted_literal
+        return converted_literal
+
+    @staticmethod
+    def save_network_literal(ObjectContainer, network_literal, Database):
+        """
+        Convert a network literal to an object and save it, once per import.
+
+        Args:
+            ObjectContainer: The container holding the converted object.
+            network_literal (dict): The network literal.
+            Database: The db instance where the object is saved.
+
+        Returns:
+            FMCNetworkObject: The object the literal was converted to.
+        """
+        # Networks are normalized to their network address, the same as in the name of the converted object
+        literal_value = network_literal.get('value')
+        try:
+            if network_literal.get('type') == 'Network':
+                literal_value = str(ipaddress.ip_network(literal_value, strict=False))
+        except ValueError:
+            pass
+
+        return FMCObjectWithLiterals.save_converted_literal(
+            gvars.network_object, ObjectContainer, (network_literal.get('type'), literal_value),
+            lambda: FMCObjectWithLiterals.convert_network_literal_to_object(ObjectContainer, network_literal), Database
+        )
+
+    @staticmethod
+    def save_port_literal(ObjectContainer, port_literal, polinfo, Database):
+        """
+        Convert a port literal to an object and save it, once per import.
+
+        Args:
+            ObjectContainer: The container holding the converted object.
+            port_literal (dict): The port literal.
+            polinfo (dict): Information about the policy using the literal.
+            Database: The db instance where the object is saved.
+
+        Returns:
+            FMCPortObject or FMCICMPObject: The object the literal was converted to.
+        """
+        literal_key = tuple(port_literal.get(key) for key in ('protocol', 'port', 'icmpType', 'code'))
+        return FMCObjectWithLiterals.save_converted_literal(
+            gvars.port_object, ObjectContainer, literal_key,
+            lambda: FMCObjectWithLiterals.convert_port_literals_to_objects(ObjectContainer, port_literal, polinfo), Database
+        )
+
+    @staticmethod
+    def save_url_literal(ObjectContainer, url_literal, Database):
+        """
+        Convert a URL literal to an object and save it, once per import.
+
+        Args:
+            ObjectContainer: The container holding the converted object.
+            url_literal (dict): The URL literal.
+            Database: The db instance where the object is saved.
+
+        Returns:
+            FMCURLObject: The object the literal was converted to.
+        """
+        return FMCObjectWithLiterals.save_converted_literal(
+            gvars.url_object, ObjectContainer, url_literal.get('url'),
+            lambda: FMCObjectWithLiterals.convert_url_literal_to_object(ObjectContainer, url_literal), Database
+        )
+
+    @staticmethod
+    def save_policy_region(ObjectContainer, region_info, Database):
+        """
+        Convert a geolocation or a country used by a policy to an object and save it, once per import.
+
+        Args:
+            ObjectContainer: The container holding the converted object.
+            region_info (dict): Information about the region. Its type is either 'Geolocation' or 'Country'.
+            Database: The db instance where the object is saved.
+
+        Returns:
+            FMCGeolocationObject or FMCCountryObject: The object the region was converted to.
+        """
+        if region_info.get('type') == 'Country':
+            return FMCObjectWithLiterals.save_converted_literal(
+                gvars.country_object, ObjectContainer, region_info.get('name'),
+                lambda: FMCObjectWithLiterals.convert_policy_country_to_object(ObjectContainer, region_info), Database
+            )
+        return FMCObjectWithLiterals.save_converted_literal(
+            gvars.geolocation_object, ObjectContainer, region_info.get('name'),
+            lambda: FMCObjectWithLiterals.convert_policy_region_to_object(ObjectContainer, region_info), Database
+        )
+
     def set_object_member_names(self):
         general_logger.info(f"Getting the names of object members of group <{self._name}>.")
         try:
@@ -27,10 +151,9 @@ class FMCObjectWithLiterals(Object):
             literal_members = self.object_info['literals']
             # now loop through the literal_members
             for literal_member in literal_members:
-                converted_literal = FMCObjectWithLiterals.convert_network_literal_to_object(ObjectContainer, literal_member)
+                converted_literal = FMCObjectWithLiterals.save_network_literal(ObjectContainer, literal_member, Database)
                 # add the name of the literal object to the list tracking the member names of the object
                 self.add_group_member_name(converted_literal.name)
-                converted_literal.save(Database)
         except:
             general_logger.info(f"No literal members found for network group <{self._name}>.")
 
@@ -44,11 +167,10 @@ class FMCObjectWithLiterals(Object):
             literal_members = self.object_info['literals']
             # now loop through the literal_members
             for literal_member in literal_members:
-                converted_literal = FMCObjectWithLiterals.convert_url_literal_to_object(ObjectContainer, literal_member)
+                converted_literal = FMCObjectWithLiterals.save_url_literal(ObjectContainer, literal_member, Database)
 
                 # add the name of the literal object to the list tracking the member names of the object
                 self.add_group_member_name(converted_literal.name)
-                converted_literal.save(Database)
         except:
             general_logger.info(f"No literal members found for URL group <{self._name}>.")
 
@@ -49,6 +49,109 @@ class ObjectCache:
         # Return the cached object (either newly created or retrieved from the cache)
         return self._cache[key]
 
+class GroupMembershipGraph:
+    """
+    The membership graph of all the groups stored in a group members table.
+
+    The members table is read once, with one query per member type, and each group is resolved exactly once,
+    no matter how many policies or parent groups reference it. Membership cycles are detected and reported
+    instead of being followed forever.
+
+    Attributes:
+        _group_class (type): The Pioneer group class of the groups in the graph.
+        _members_table (PioneerTable): The table holding the group members.
+        _members (dict): The members of each group, keyed by group UID. None until the table is loaded.
+        _resolved_groups (set): The UIDs of the groups whose members were already resolved.
+        _groups_in_progress (list): The groups currently being resolved, from the outermost to the innermost.
+        _cycles (list): The membership cycles found so far, as lists of group names.
+    """
+
+    def __init__(self, group_class, members_table) -> None:
+        """
+        Initialize the GroupMembershipGraph instance.
+
+        Args:
+            group_class (type): The Pioneer group class of the groups in the graph.
+            members_table (PioneerTable): The table holding the group members.
+        """
+        self._group_class = group_class
+        self._members_table = members_table
+        self._members = None
+        self._resolved_groups = set()
+        self._groups_in_progress = []
+        self._cycles = []
+
+    @property
+    def cycles(self):
+        """
+        Get the membership cycles found so far.
+
+        Returns:
+            list: Lists of group names, where the last group contains the first one.
+        """
+        return self._cycles
+
+    def load(self) -> None:
+        """
+        Read the members of all the groups from the members table.
+        """
+        self._members = defaultdict(list)
+        table_name = self._members_table.name
+
+        for member_type, (columns, _, join_conditions) in self._group_class.get_member_specs().items():
+            members_info = self._members_table.get(
+                columns=[f"{table_name}.group_uid"] + columns,
+                join=join_conditions
+            )
+            for member_info in members_info:
+                self._members[member_info[0]].append((member_type, member_info[1:]))
+
+        general_logger.info(f"Loaded the members of <{len(self._members)}> groups from table <{table_name}>.")
+
+    def resolve(self, group, object_cache) -> None:
+        """
+        Populate the members of a group and, recursively, of all its nested groups.
+
+        Args:
+            group (PioneerObject): The group to resolve.
+            object_cache (ObjectCache): Cache to store and retrieve object instances.
+        """
+        if group.uid in self._resolved_groups:
+            return
+
+        if self._members is None:
+            self.load()
+
+        member_specs = self._group_class.get_member_specs()
+        self._groups_in_progress.append(group)
+
+        for member_type, member_info in self._members.get(group.uid, []):
+            obj_class = member_specs[member_type][1]
+            member = object_cache.get_or_create(
+                (member_info[0], member_info[1]),
+                lambda: obj_class(None, member_info)
+            )
+
+            match member_type:
+                case 'object':
+                    group.object_members.add(member)
+                case 'icmp':
+                    group._icmp_object_members.add(member)
+                case 'group':
+                    # A group that is still being resolved contains itself, so the membership is not followed
+                    in_progress_uids = [group_in_progress.uid for group_in_progress in self._groups_in_progress]
+                    if member.uid in in_progress_uids:
+                        cycle = [group_in_progress.name for group_in_progress in self._groups_in_progress[in_progress_uids.index(member.uid):]]
+                        self._cycles.append(cycle)
+                        general_logger.error(f"Group membership cycle detected: <{' -> '.join(cycle + [member.name])}>. Ignoring the membership of <{member.name}> in <{group.name}>.")
+                        continue
+
+                    group._group_object_members.add(member)
+                    self.resolve(member, object_cache)
+
+        self._groups_in_progress.pop()
+        self._resolved_groups.add(group.uid)
+
 class PioneerObject(Object):
     """
     Class representing a Pioneer object, inheriting from Object.
@@ -123,6 +226,52 @@ class PioneerNetworkGroupObject(NetworkGroupObject, PioneerObject):
         # Set the UID for the object
         self.uid = object_info[0]
 
+    @staticmethod
+    def get_member_specs():
+        """
+        Describe how each type of member is retrieved from the network group members table.
+
+        Returns:
+            dict: Maps each member type ('object' or 'group') to a tuple holding the columns to fetch,
+                  the class of the member objects and the join conditions.
+        """
+        return {
+            'object': (
+                [
+                    "network_address_objects.uid",
+                    "network_address_objects.name",
+                    "network_address_objects.object_container_uid",
+                    "network_address_objects.value",
+                    "network_address_objects.description",
+                    "network_address_objects.type",
+                    "network_address_objects.overridable_object"
+                ],
+                PioneerNetworkObject,
+                [
+                    {
+                        "table": "network_address_objects",
+                        "condition": "network_group_objects_members.object_uid = network_address_objects.uid"
+                    }
+                ]
+            ),
+            'group': (
+                [
+                    "network_group_objects.uid",
+                    "network_group_objects.name",
+                    "network_group_objects.object_container_uid",
+                    "network_group_objects.description",
+                    "network_group_objects.overridable_object"
+                ],
+                PioneerNetworkGroupObject,
+                [
+                    {
+                        "table": "network_group_objects",
+                        "condition": "network_group_objects_members.object_uid = network_group_objects.uid"
+                    }
+                ]
+            )
+        }
+
     def extract_members(self, member_type, object_cache, network_group_objects_members_table) -> None:
         """
         Extract members based on the specified type and cache them.
@@ -132,49 +281,16 @@ class PioneerNetworkGroupObject(NetworkGroupObject, PioneerObject):
             object_cache (ObjectCache): Cache to store and retrieve object instances.
             network_group_objects_members_table (Table): Table object to query the members.
         """
-        if member_type == 'object':
-            columns = [
-                "network_address_objects.uid",
-                "network_address_objects.name",
-                "network_address_objects.object_container_uid",
-                "network_address_objects.value",
-                "network_address_objects.description",
-                "network_address_objects.type",
-                "network_address_objects.overridable_object"
-            ]
-            obj_class = PioneerNetworkObject
-            join_conditions = [
-                {
-                    "table": "network_address_objects",
-                    "condition": "network_group_objects_members.object_uid = network_address_objects.uid"
-                }
-            ]
-            name_column = 'network_group_objects_members.group_uid'
-
-        elif member_type == 'group':
-            columns = [
-                "network_group_objects.uid",
-                "network_group_objects.name",
-                "network_group_objects.object_container_uid",
-                "network_group_objects.description",
-                "network_group_objects.overridable_object"
-            ]
-            obj_class = PioneerNetworkGroupObject
-            join_conditions = [
-                {
-                    "table": "network_group_objects",
-                    "condition": "network_group_objects_members.object_uid = network_group_objects.uid"
-                }
-            ]
-            name_column = 'network_group_objects_members.group_uid'
-
-        else:
+        member_specs = self.get_member_specs()
+        if member_type not in member_specs:
             raise ValueError("Invalid type specified. Must be 'object' or 'group'.")
 
+        columns, obj_class, join_conditions = member_specs[member_type]
+
         # Fetch members information from the database
         members_info = network_group_objects_members_table.get(
             columns=columns,
-            name_col=name_column,
+            name_col='network_group_objects_members.group_uid',
             val=self.uid,
             join=join_conditions,
             not_null_condition=False,
@@ -272,82 +388,94 @@ class PioneerPortGroupObject(PortGroupObject, PioneerObject):
         # Set UID property
         self.uid = object_info[0]
 
+    @staticmethod
+    def get_member_specs():
+        """
+        Describe how each type of member is retrieved from the port group members table.
+
+        Returns:
+            dict: Maps each member type ('object', 'icmp' or 'group') to a tuple holding the columns to fetch,
+                  the class of the member objects and the join conditions.
+        """
+        return {
+            'object': (
+                [
+                    "port_objects.uid",
+                    "port_objects.name",
+                    "port_objects.object_container_uid",
+                    "port_objects.protocol",
+                    "port_objects.source_port_number",
+                    "port_objects.destination_port_number",
+                    "port_objects.description",
+                    "port_objects.overridable_object"
+                ],
+                PioneerPortObject,
+                [
+                    {
+                        "table": "port_objects",
+                        "condition": "port_group_objects_members.object_uid = port_objects.uid"
+                    }
+                ]
+            ),
+            'icmp': (
+                [
+                    "icmp_objects.uid",
+                    "icmp_objects.name",
+                    "icmp_objects.object_container_uid",
+                    "icmp_objects.type",
+                    "icmp_objects.code",
+                    "icmp_objects.description",
+                    "icmp_objects.overridable_object"
+                ],
+                PioneerICMPObject,
+                [
+                    {
+                        "table": "icmp_objects",
+                        "condition": "port_group_objects_members.object_uid = icmp_objects.uid"
+                    }
+                ]
+            ),
+            'group': (
+                [
+                    "port_group_objects.uid",
+                    "port_group_objects.name",
+                    "port_group_objects.object_container_uid",
+                    "port_group_objects.description",
+                    "port_group_objects.overridable_object"
+                ],
+                PioneerPortGroupObject,
+                [
+                    {
+                        "table": "port_group_objects",
+                        "condition": "port_group_objects_members.object_uid = port_group_objects.uid"
+                    }
+                ]
+            )
+        }
+
     def extract_members(self, member_type, object_cache, port_group_objects_network_group_objects_members_table):
         """
         Extract members based on the type and cache them.
 
         Args:
-            member_type (str): Type of members to extract ('object', 'icmp_object', or 'group').
+            member_type (str): Type of members to extract ('object', 'icmp', or 'group').
             object_cache (ObjectCache): Cache for storing objects.
             port_group_objects_network_group_objects_members_table (DatabaseTable): Table for fetching members information.
         
         Raises:
             ValueError: If an unknown type is provided.
         """
-        # Determine the columns to fetch and the class for the objects based on type
-        if member_type == 'object':
-            columns = [
-                "port_objects.uid",
-                "port_objects.name",
-                "port_objects.object_container_uid",
-                "port_objects.protocol",
-                "port_objects.source_port_number",
-                "port_objects.destination_port_number",
-                "port_objects.description",
-                "port_objects.overridable_object"
-            ]
-            obj_class = PioneerPortObject
-            join_conditions = [
-                {
-                    "table": "port_objects",
-                    "condition": "port_group_objects_members.object_uid = port_objects.uid"
-                }
-            ]
-            name_col = 'port_group_objects_members.group_uid'
-
-        elif member_type == 'icmp':
-            columns = [
-                "icmp_objects.uid",
-                "icmp_objects.name",
-                "icmp_objects.object_container_uid",
-                "icmp_objects.type",
-                "icmp_objects.code",
-                "icmp_objects.description",
-                "icmp_objects.overridable_object"
-            ]
-            obj_class = PioneerICMPObject
-            join_conditions = [
-                {
-                    "table": "icmp_objects",
-                    "condition": "port_group_objects_members.object_uid = icmp_objects.uid"
-                }
-            ]
-            name_col = 'port_group_objects_members.group_uid'
-
-        elif member_type == 'group':
-            columns = [
-                "port_group_objects.uid",
-                "port_group_objects.name",
-                "port_group_objects.object_container_uid",
-                "port_group_objects.description",
-                "port_group_objects.overridable_object"
-            ]
-            obj_class = PioneerPortGroupObject
-            join_conditions = [
-                {
-                    "table": "port_group_objects",
-                    "condition": "port_group_objects_members.object_uid = port_group_objects.uid"
-                }
-            ]
-            name_col = 'port_group_objects_members.group_uid'
-
-        else:
+        member_specs = self.get_member_specs()
+        if member_type not in member_specs:
             raise ValueError(f"Unknown member type: {member_type}")
 
+        # Determine the columns to fetch and the class for the objects based on type
+        columns, obj_class, join_conditions = member_specs[member_type]
+
         # Fetch members information from the database table
         members_info = port_group_objects_network_group_objects_members_table.get(
             columns=columns,
-            name_col=name_col,
+            name_col='port_group_objects_members.group_uid',
             val=self.uid,
             join=join_conditions,
             not_null_condition=False,
@@ -437,6 +565,51 @@ class PioneerURLGroupObject(URLGroupObject, PioneerObject):
         # Set UID property
         self.uid = object_info[0]
 
+    @staticmethod
+    def get_member_specs():
+        """
+        Describe how each type of member is retrieved from the URL group members table.
+
+        Returns:
+            dict: Maps each member type ('object' or 'group') to a tuple holding the columns to fetch,
+                  the class of the member objects and the join conditions.
+        """
+        return {
+            'object': (
+                [
+                    "url_objects.uid",
+                    "url_objects.name",
+                    "url_objects.object_container_uid",
+                    "url_objects.url_value",
+                    "url_objects.description",
+                    "url_objects.overridable_object"
+                ],
+                PioneerURLObject,
+                [
+                    {
+                        "table": "url_objects",
+                        "condition": "url_group_objects_members.object_uid = url_objects.uid"
+                    }
+                ]
+            ),
+            'group': (
+                [
+                    "url_group_objects.uid",
+                    "url_group_objects.name",
+                    "url_group_objects.object_container_uid",
+                    "url_group_objects.description",
+                    "url_group_objects.overridable_object"
+                ],
+                PioneerURLGroupObject,
+                [
+                    {
+                        "table": "url_group_objects",
+                        "condition": "url_group_objects_members.object_uid = url_group_objects.uid"
+                    }
+                ]
+            )
+        }
+
     def extract_members(self, member_type, object_cache, url_group_objects_members_table):
         """
         Extract and cache members of the URL group object.
@@ -449,48 +622,16 @@ class PioneerURLGroupObject(URLGroupObject, PioneerObject):
         Raises:
             ValueError: If the member_type is unknown.
         """
-        if member_type == 'object':
-            columns = [
-                "url_objects.uid",
-                "url_objects.name",
-                "url_objects.object_container_uid",
-                "url_objects.url_value",
-                "url_objects.description",
-                "url_objects.overridable_object"
-            ]
-            obj_class = PioneerURLObject
-            join_conditions = [
-                {
-                    "table": "url_objects",
-                    "condition": "url_group_objects_members.object_uid = url_objects.uid"
-                }
-            ]
-            name_col = 'url_group_objects_members.group_uid'
-
-        elif member_type == 'group':
-            columns = [
-                "url_group_objects.uid",
-                "url_group_objects.name",
-                "url_group_objects.object_container_uid",
-                "url_group_objects.description",
-                "url_group_objects.overridable_object"
-            ]
-            obj_class = PioneerURLGroupObject
-            join_conditions = [
-                {
-                    "table": "url_group_objects",
-                    "condition": "url_group_objects_members.object_uid = url_group_objects.uid"
-                }
-            ]
-            name_col = 'url_group_objects_members.group_uid'
-
-        else:
+        member_specs = self.get_member_specs()
+        if member_type not in member_specs:
             raise ValueError(f"Unknown member type: {member_type}")
 
+        columns, obj_class, join_conditions = member_specs[member_type]
+
         # Fetch members information
         members_info = url_group_objects_members_table.get(
             columns=columns,
-            name_col=name_col,
+            name_col='url_group_objects_members.group_uid',
             val=self.uid,
             join=join_conditions,
             not_null_condition=False,
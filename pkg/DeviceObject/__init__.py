@@ -343,10 +343,14 @@ class NetworkGroupObject(GroupObject):
             db: The db object where relationships will be created.
             preloaded_data (dict): Preloaded data mapping member names to their UIDs.
         """        
+        member_rows = []
         for member_name in self.group_member_names:
             group_member_uid = preloaded_data.get(member_name)
             if group_member_uid:
-                db.network_group_objects_members_table.insert(self.uid, group_member_uid)
+                member_rows.append((self.uid, group_member_uid))
+
+        # Insert all the members of the group in batches
+        db.network_group_objects_members_table.insert_many(member_rows)
 
 class PortObject:
     """
@@ -546,10 +550,14 @@ class PortGroupObject(GroupObject):
             db: The db object where relationships will be created.
             preloaded_data (dict): A dictionary mapping member names to their UIDs.
         """
+        member_rows = []
         for member_name in self.group_member_names:
             group_member_uid = preloaded_data.get(member_name)
             if group_member_uid is not None:
-                db.port_group_objects_members_table.insert(self.uid, group_member_uid)
+                member_rows.append((self.uid, group_member_uid))
+
+        # Insert all the members of the group in batches
+        db.port_group_objects_members_table.insert_many(member_rows)
 
 class URLObject:
     """
@@ -630,10 +638,14 @@ class URLGroupObject(GroupObject):
             db: The db object used for creating relationships.
             preloaded_data (dict): Dictionary containing member names and their corresponding UIDs.
         """
+        member_rows = []
         for member_name in self.group_member_names:
             group_member_uid = preloaded_data.get(member_name)
             if group_member_uid:
-                db.url_group_objects_members_table.insert(self.uid, group_member_uid)
+                member_rows.append((self.uid, group_member_uid))
+
+        # Insert all the members of the group in batches
+        db.url_group_objects_members_table.insert_many(member_rows)
     
 
 class ScheduleObject:
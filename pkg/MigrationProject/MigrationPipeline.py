@@ -0,0 +1,60 @@
+from pkg.Container.PioneerContainer import PioneerSecurityPolicyContainer, PioneerNATPolicyContainer
+from pkg.SecurityDevice.ImportScheduler import APIRateLimiter, PageStream
+import utils.helper as helper
+import utils.gvars as gvars
+
+general_logger = helper.logging.getLogger('general')
+
+class MigrationPipeline:
+    """
+    Migrates the policies of all the mapped containers of a migration project.
+
+    The migration of a container runs in two stages: its policies and objects are loaded from the database, then they
+    are pushed to the target device. The containers are loaded on a background thread and handed over through a
+    bounded queue, so the next container is loaded while the current one is pushed and the target device does not
+    wait for the database. The push stage does not access the database, so the two stages never share the connection.
+
+    Attributes:
+        _migration_project (MigrationProject): The migration project, built for migrating.
+        _max_pending_containers (int): The maximum number of containers loaded in advance.
+    """
+
+    def __init__(self, migration_project, max_pending_containers=gvars.migration_prefetch_containers):
+        """
+        Initialize the MigrationPipeline instance.
+
+        Args:
+            migration_project (MigrationProject): The migration project, built for migrating.
+            max_pending_containers (int): The maximum number of containers loaded in advance.
+        """
+        self._migration_project = migration_project
+        self._max_pending_containers = max_pending_containers
+
+    def load_containers(self):
+        """
+        Load the mapped containers one after the other. Runs on the background thread.
+
+        Yields:
+            list: A single (container, migration data) pair per container, the format expected by PageStream.
+        """
+        container_classes = {
+            'security_policy_containers': PioneerSecurityPolicyContainer,
+            'nat_policy_containers': PioneerNATPolicyContainer
+        }
+
+        for container_type, container_class in container_classes.items():
+            for container_name in self._migration_project.get_mapped_container_names(container_type):
+                general_logger.info(f"Loading the policies of the container <{container_name}> from the database.")
+                container = container_class(self._migration_project, container_name, None)
+                yield [(container, container.load_migration_data())]
+
+    def run(self):
+        """
+        Migrate all the mapped containers. The security policy containers are migrated first, then the NAT ones.
+        """
+        # The containers are loaded from the database, so the loading stage is not rate limited
+        containers = PageStream(self.load_containers, APIRateLimiter(0), self._max_pending_containers)
+
+        for container, migration_data in containers:
+            print(f"Migrating container {container.name}")
+            container.migrate(migration_data)
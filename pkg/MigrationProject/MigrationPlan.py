@@ -0,0 +1,190 @@
+import re
+import threading
+import xml.etree.ElementTree as ET
+from panos.panorama import Panorama
+import utils.helper as helper
+import utils.gvars as gvars
+
+general_logger = helper.logging.getLogger('general')
+
+class MigrationPlan:
+    """
+    Collects the configuration a migration would create on a Panorama, without connecting to it.
+
+    The migration builds the same pan-os-python objects as for a live migration, but instead of sending them, their
+    elements are merged into a single configuration tree, at the xpath they would have been created at. The tree is
+    then written as one XML config file or as a file of set commands, which can be loaded on the Panorama at once.
+
+    Attributes:
+        _version (str): The PAN-OS version the configuration is rendered for.
+        _device_connection (Panorama): Offline Panorama holding the objects while they are built.
+        _config (Element): The configuration collected so far.
+        _lock (Lock): Serializes the updates of the configuration made by the migration threads.
+    """
+
+    # Matches the steps of an xpath, for example device-group or entry[@name='name']
+    xpath_step_pattern = re.compile(r"([^/\[]+)(?:\[@name='([^']*)'\])?")
+
+    def __init__(self, version):
+        """
+        Initialize the MigrationPlan instance.
+
+        Args:
+            version (str): The PAN-OS version of the target Panorama. Some elements are rendered differently depending on it.
+        """
+        self._version = version or gvars.migration_plan_default_version
+        self._device_connection = self.create_device_connection()
+        self._config = ET.Element('config')
+        self._lock = threading.Lock()
+
+    @property
+    def device_connection(self):
+        """
+        Get the offline Panorama holding the objects while they are built.
+
+        Returns:
+            Panorama: The offline Panorama.
+        """
+        return self._device_connection
+
+    def create_device_connection(self):
+        """
+        Create an offline Panorama. It never connects to a device, as its version is already known.
+
+        Returns:
+            Panorama: The offline Panorama.
+        """
+        device_connection = Panorama(gvars.migration_plan_hostname)
+        device_connection._set_version_and_version_info(self._version)
+        return device_connection
+
+    def get_config_node(self, xpath):
+        """
+        Get the element found at an xpath of the configuration, creating the missing elements along the way.
+
+        Args:
+            xpath (str): The xpath, for example /config/shared/address.
+
+        Returns:
+            Element: The element.
+        """
+        node = self._config
+        # The first step is the root element itself
+        for tag, name in self.xpath_step_pattern.findall(xpath)[1:]:
+            child = None
+            for candidate in node.findall(tag):
+                if not name or candidate.get('name') == name:
+                    child = candidate
+                    break
+            if child is None:
+                child = ET.SubElement(node, tag, {'name': name} if name else {})
+            node = child
+        return node
+
+    def add_similar(self, pan_object):
+        """
+        Add an object and all the similar objects of its parent to the configuration, the way create_similar() would
+        create them on the device.
+
+        Args:
+            pan_object (PanObject): The object.
+        """
+        similar_objects = [child for child in pan_object.parent.children if type(child) == type(pan_object)]
+
+        with self._lock:
+            for similar_object in similar_objects:
+                parent_xpath, _ = similar_object.xpath().rsplit('/', 1)
+                parent_node = self.get_config_node(parent_xpath)
+                element = similar_object.element()
+
+                # An object added again replaces the previous version of it
+                for existing_element in parent_node.findall(element.tag):
+                    if existing_element.get('name') == element.get('name'):
+                        parent_node.remove(existing_element)
+                parent_node.append(element)
+
+    @staticmethod
+    def quote(value):
+        """
+        Quote a value of a set command if needed.
+
+        Args:
+            value (str): The value.
+
+        Returns:
+            str: The value, quoted if it is empty or holds spaces or special characters.
+        """
+        value = value or ''
+        if value and re.fullmatch(r'[\w.:/@*-]+', value):
+            return value
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    def iter_set_commands(self, node, path):
+        """
+        Render the children of an element of the configuration as set commands.
+
+        Args:
+            node (Element): The element.
+            path (list): The words of the set command leading to the element.
+
+        Yields:
+            str: The set commands.
+        """
+        for child in node:
+            child_path = path + [self.quote(child.get('name'))] if child.tag == 'entry' else path + [child.tag]
+            members = child.findall('member')
+
+            if len(child) and len(members) == len(child):
+                yield 'set ' + ' '.join(child_path) + ' [ ' + ' '.join(self.quote(member.text) for member in members) + ' ]'
+            elif len(child):
+                yield from self.iter_set_commands(child, child_path)
+            elif child.text and child.text.strip():
+                yield 'set ' + ' '.join(child_path) + ' ' + self.quote(child.text)
+            else:
+                yield 'set ' + ' '.join(child_path)
+
+    def write_xml(self, plan_file_path):
+        """
+        Write the configuration as an XML file, which can be loaded on the Panorama with a partial config load.
+
+        Args:
+            plan_file_path (str): The path of the file.
+        """
+        with self._lock:
+            config_tree = ET.ElementTree(self._config)
+            ET.indent(config_tree)
+            config_tree.write(plan_file_path, encoding='utf-8', xml_declaration=True)
+
+    def write_set_commands(self, plan_file_path):
+        """
+        Write the configuration as set commands, one per line.
+
+        Args:
+            plan_file_path (str): The path of the file.
+        """
+        with self._lock, open(plan_file_path, 'w', encoding='utf-8') as plan_file:
+            for node in self._config:
+                # The configuration of the Panorama itself is set without the devices/entry prefix
+                if node.tag == 'devices':
+                    for device_entry in node.findall('entry'):
+                        for command in self.iter_set_commands(device_entry, []):
+                            plan_file.write(command + '\n')
+                else:
+                    for command in self.iter_set_commands(node, [node.tag]):
+                        plan_file.write(command + '\n')
+
+    def write(self, plan_file_path):
+        """
+        Write the configuration to a file. Files with the .xml extension get the XML configuration, the other ones get
+        set commands.
+
+        Args:
+            plan_file_path (str): The path of the file.
+        """
+        if plan_file_path.lower().endswith('.xml'):
+            self.write_xml(plan_file_path)
+        else:
+            self.write_set_commands(plan_file_path)
+
+        general_logger.info(f"Wrote the migration plan to <{plan_file_path}>.")
+        print(f"Migration plan written to {plan_file_path}")
@@ -0,0 +1,88 @@
+import threading
+import utils.helper as helper
+
+general_logger = helper.logging.getLogger('general')
+
+class NameMap:
+    """
+    Maps the source names of the migrated objects and policies to their names on the target device.
+
+    A target name is computed once, the first time its source name is migrated, and stored in the name map table of
+    the migration project. The next migrations reuse it, so an object keeps the same name on the target device across
+    runs. A target name is never given to two source names of the same name type.
+
+    The map is loaded in memory when the migration starts and the new names are only written to the db by save(),
+    so it can be used while another thread reads the db.
+
+    Attributes:
+        _name_map_table (NameMapTable): The table storing the map.
+        _target_names (dict): The target names, keyed by (name type, source name).
+        _source_names (dict): The source names, keyed by (name type, target name).
+        _pending_rows (list): The mappings that were not saved yet.
+        _lock (Lock): Protects the map, which is used by the migration threads.
+    """
+
+    def __init__(self, name_map_table):
+        """
+        Initialize the NameMap instance.
+
+        Args:
+            name_map_table (NameMapTable): The table storing the map.
+        """
+        self._name_map_table = name_map_table
+        self._target_names = {}
+        self._source_names = {}
+        self._pending_rows = []
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Load the mappings saved by the previous migrations.
+        """
+        for name_type, source_name, target_name in self._name_map_table.get(['name_type', 'source_name', 'target_name']):
+            self._target_names[(name_type, source_name)] = target_name
+            self._source_names[(name_type, target_name)] = source_name
+
+        general_logger.info(f"Loaded <{len(self._target_names)}> names from the name map.")
+
+    def get_target_name(self, name_type, source_name, constraint_function):
+        """
+        Get the target name of a source name, computing it the first time.
+
+        Args:
+            name_type (str): The namespace of the name, for example 'object'. Target names are unique within it.
+            source_name (str): The source name.
+            constraint_function (Callable): Function returning the target name for a source name and an attempt number.
+                                            Each attempt must return a different name, it is called again while the
+                                            name it returns is already taken.
+
+        Returns:
+            str: The target name.
+        """
+        with self._lock:
+            target_name = self._target_names.get((name_type, source_name))
+            if target_name is not None:
+                return target_name
+
+            attempt = 0
+            target_name = constraint_function(source_name, attempt)
+            while (name_type, target_name) in self._source_names:
+                attempt += 1
+                target_name = constraint_function(source_name, attempt)
+
+            self._target_names[(name_type, source_name)] = target_name
+            self._source_names[(name_type, target_name)] = source_name
+            self._pending_rows.append((name_type, source_name, target_name))
+            return target_name
+
+    def save(self):
+        """
+        Write the mappings computed since the last save to the db.
+        """
+        with self._lock:
+            pending_rows = self._pending_rows
+            self._pending_rows = []
+
+        if pending_rows:
+            self._name_map_table.insert_many(pending_rows)
+            general_logger.info(f"Saved <{len(pending_rows)}> new names to the name map.")
@@ -1,8 +1,13 @@
 from pkg.MigrationProject import MigrationProject
+from pkg.MigrationProject.MigrationPlan import MigrationPlan
+from pkg.MigrationProject.NameMap import NameMap
+from pkg.MigrationProject.TargetInventory import TargetInventory
 from pkg.Container.PANMCContainer import PANMCSecurityPolicyContainer
-from pkg.DeviceObject.PioneerDeviceObject import PioneerICMPObject, PioneerPortGroupObject
-import random
+from pkg.DeviceObject.PioneerDeviceObject import PioneerICMPObject, PioneerPortGroupObject, PioneerPortObject
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import re
+import xml.etree.ElementTree as ET
 from panos.panorama import DeviceGroup, Template
 from panos.network import Zone
 from panos.objects import AddressObject, AddressGroup, ServiceObject, ServiceGroup, CustomUrlCategory, Tag
@@ -11,6 +16,7 @@ import utils.helper as helper
 import utils.gvars as gvars
 
 special_policies_log = helper.logging.getLogger(gvars.special_policies_logger)
+general_logger = helper.logging.getLogger('general')
 
 class PANMCMigrationProject(MigrationProject):
     def __init__(self, name, db, source_security_device, target_security_device):
@@ -30,21 +36,189 @@ class PANMCMigrationProject(MigrationProject):
 
         # Load various mappings and settings from the db
         self._security_policy_containers_map = self.load_containers_map()
+        self._nat_policy_containers_map = self.load_containers_map('nat_policy_containers')
         self._security_zones_map = self.load_security_zones_map()
         self._network_object_types_map = self.load_network_object_types_map()
         self._security_policy_actions_map = self.load_security_policies_actions_map()
         self._log_settings = self.load_log_settings()
         self._special_security_policy_parameters = self.load_special_security_policy_parameters()
         self._section_map = self.load_section_map()
+        # When set, the migration is rendered into the plan instead of being sent to the target device
+        self._migration_plan = None
+        # When set, only the objects and policies missing or changed on the target device are created
+        self._target_inventory = None
+
+        # The names given to the objects and policies by the previous migrations are reused
+        # Projects created by older versions do not have the name map table yet
+        self._db.name_map_table.create()
+        self._name_map = NameMap(self._db.name_map_table)
+        self._name_map.load()
+        self._renamed_object_ids = set()
 
         # Initialize the parent class
         super().__init__(name, db)
     
+    def start_migration_plan(self):
+        """
+        Render the next migrations into a MigrationPlan instead of sending them to the target device.
+
+        The objects and policies are built the same way as for a live migration, but they are attached to an offline
+        Panorama, so no call is made to the target device.
+        """
+        target_device_version = self._target_security_device.get_general_data('version', 'name', self._target_security_device.name)
+        self._migration_plan = MigrationPlan(target_device_version)
+        self._target_security_device.device_connection = self._migration_plan.device_connection
+
+    def load_target_inventory(self):
+        """
+        Retrieve the objects already present on the target device, so the next migrations only create the objects and
+        policies that are missing or changed. The policies of a device group are retrieved when it is migrated.
+        """
+        print("Retrieving the objects present on the target device")
+        self._target_inventory = TargetInventory(self._target_security_device)
+        self._target_inventory.load_objects()
+
+    def map_name(self, name_type, name):
+        """
+        Get the name an object or policy gets on the target device. See apply_name_constraints() and
+        apply_url_name_constraints().
+
+        Args:
+            name_type (str): 'object', 'url' or 'policy'. The names of a type are unique on the target device.
+            name (str): The source name.
+
+        Returns:
+            str: The target name. It is the same on every migration of the project.
+        """
+        constraint_function = PANMCMigrationProject.apply_url_name_constraints if name_type == 'url' else PANMCMigrationProject.apply_name_constraints
+        return self._name_map.get_target_name(name_type, name, constraint_function)
+
+    def rename_object(self, device_object, name_type):
+        """
+        Give a device object the name it gets on the target device.
+
+        The objects are shared by the policies of all the containers and are renamed in place, so each object is only
+        renamed the first time it is migrated.
+
+        Args:
+            device_object (DeviceObject): The object.
+            name_type (str): 'object' or 'url'.
+
+        Returns:
+            str: The target name of the object.
+        """
+        if id(device_object) not in self._renamed_object_ids:
+            device_object.name = self.map_name(name_type, device_object.name)
+            self._renamed_object_ids.add(id(device_object))
+        return device_object.name
+
+    def save_name_map(self):
+        """
+        Save the names computed by the migration, so the next migrations reuse them.
+        """
+        self._name_map.save()
+
+    def write_migration_plan(self, plan_file_path):
+        """
+        Write the migration plan started by start_migration_plan() to a file.
+
+        Args:
+            plan_file_path (str): The path of the file. See MigrationPlan.write() for the formats.
+        """
+        self._migration_plan.write(plan_file_path)
+
+    def create_similar_objects(self, pan_object):
+        """
+        Create an object and all the similar objects of its parent in a single call, or add them to the migration plan.
+        When the target inventory is loaded, the objects that are already present on the target device are skipped and
+        the ones that changed are edited, so their configuration is replaced instead of being merged with the new one.
+
+        Args:
+            pan_object (PanObject): The object.
+
+        Returns:
+            list: (object name, reason) pairs for the changed objects that could not be edited. An object that fails
+                  does not prevent the other ones from being edited.
+        """
+        changed_objects = []
+        failed_objects = []
+
+        # The objects already present on the target device are not sent again
+        if self._target_inventory is not None:
+            similar_objects = [child for child in pan_object.parent.children if type(child) == type(pan_object)]
+            similar_objects = self._target_inventory.remove_unchanged(similar_objects)
+            if not similar_objects:
+                return failed_objects
+            pan_object = similar_objects[0]
+            changed_objects = [similar_object for similar_object in similar_objects if not self._target_inventory.is_missing(similar_object)]
+
+        if self._migration_plan is not None:
+            self._migration_plan.add_similar(pan_object)
+        elif changed_objects:
+            parent = pan_object.parent
+
+            # The changed objects are left out of the call creating the missing ones
+            for changed_object in changed_objects:
+                parent.remove(changed_object)
+            try:
+                missing_objects = [child for child in parent.children if type(child) == type(pan_object)]
+                if missing_objects:
+                    missing_objects[0].create_similar()
+            finally:
+                for changed_object in changed_objects:
+                    parent.add(changed_object)
+
+            failed_objects = self.edit_objects(changed_objects)
+        else:
+            pan_object.create_similar()
+
+        # The objects are not sent again by the next calls either
+        if self._target_inventory is not None:
+            failed_object_names = {object_name for object_name, _ in failed_objects}
+            self._target_inventory.index([similar_object for similar_object in similar_objects if similar_object.name not in failed_object_names])
+
+        return failed_objects
+
+    def edit_objects(self, pan_objects):
+        """
+        Replace objects on the target device with their new configuration.
+
+        All the objects are edited in a single multi-config call. If the device rejects it, nothing is changed and each
+        object is edited with a call of its own, so only the objects that cannot be edited are left out.
+
+        Args:
+            pan_objects (list): The objects, attached to the target device.
+
+        Returns:
+            list: (object name, reason) pairs for the objects that could not be edited.
+        """
+        # Each object is replaced at its xpath, the same as apply() does
+        multi_config_request = ET.Element('multi-configure-request')
+        for action_id, pan_object in enumerate(pan_objects, start=1):
+            edit_action = ET.SubElement(multi_config_request, 'edit', {'id': str(action_id), 'xpath': pan_object.xpath()})
+            edit_action.append(pan_object.element())
+
+        try:
+            pan_objects[0].nearest_pandevice().xapi.multi_config(ET.tostring(multi_config_request, encoding='unicode'))
+            return []
+        except Exception as e:
+            general_logger.info(f"Failed to edit <{len(pan_objects)}> objects in a single call. Reason: <{e}>. Editing them one by one.")
+
+        failed_objects = []
+        for pan_object in pan_objects:
+            try:
+                pan_object.apply()
+            except Exception as e:
+                print("Error occurred when editing object. More details: ", e)
+                special_policies_log.warn(f"Failed to edit {pan_object.name}. Reason: {e}.\n")
+                failed_objects.append((pan_object.name, str(e)))
+        return failed_objects
+
     # save it to the file file, don't print it
     def print_compatibility_issues(self):
         print("""You are migrating to a Panorama Management Center device. The following is a list with compatibility issues and how they will be fixed:
-Object/Policy/Port/URL object names: All names will be cut to have less than 63 characters. In case a name is longer than 63 characters, only the first 60 characters will be kept and
-a random suffix will be generated in order to avoid duplicates. All special characters will be removed and replaced with "_".
+Object/Policy/Port/URL object names: All names will be cut to have less than 63 characters. In case a name is longer than 63 characters, only the first 58 characters will be kept and
+a suffix derived from the name will be added in order to avoid duplicates. The names are saved in the project and reused by the next migrations. All special characters will be removed and replaced with "_".
 Security Policies restricting ping access: All policies that control ping access will be split in two. The original policy and the ping policy. This is needed because 
 PA treats ping as an application. The second rule will keep the exact same source and destinations, but will have all port objects removed and application set to ping.""" + '\n')
 
@@ -65,7 +239,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         last_obj = ''
         for net_obj in network_objects:
             # Adapt the name of the network object according to the naming constraints
-            adapted_name = PANMCMigrationProject.apply_name_constraints(net_obj.name)
+            adapted_name = self.rename_object(net_obj, 'object')
             net_obj.name = adapted_name
 
             # Map the network object type from source to target
@@ -84,7 +258,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         # Attempt to bulk create the network objects on the target device
         try:
             # Create similar objects in bulk based on the updated object's name
-            self._target_security_device.device_connection.find(last_obj.name).create_similar()
+            self.create_similar_objects(self._target_security_device.device_connection.find(last_obj.name))
         except Exception as e:
             print("Error occurred when bulk creating network address objects. More details: ", e)
 
@@ -106,7 +280,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         last_obj = ''
         for net_group_obj in network_group_objects:
             # Adapt the name of the network group object according to the naming constraints
-            adapted_name = PANMCMigrationProject.apply_name_constraints(net_group_obj.name)
+            adapted_name = self.rename_object(net_group_obj, 'object')
             net_group_obj.name = adapted_name
 
             # Gather the names of all group and object members
@@ -132,7 +306,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         # Attempt to bulk create the network group objects on the target device
         try:
             # Create similar objects in bulk based on the first network group object's name
-            self._target_security_device.device_connection.find(last_obj.name).create_similar()
+            self.create_similar_objects(self._target_security_device.device_connection.find(last_obj.name))
         except Exception as e:
             print("Error occurred when creating network group objects. More details: ", e)
 
@@ -158,7 +332,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
                 continue
 
             # Apply name constraints to the port object name
-            constrained_name = PANMCMigrationProject.apply_name_constraints(port_obj.name)
+            constrained_name = self.rename_object(port_obj, 'object')
             port_obj.name = constrained_name
 
             # Create a new ServiceObject with the required attributes
@@ -175,7 +349,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
             last_obj = new_service_object
 
         try:
-            self._target_security_device.device_connection.find(last_obj.name).create_similar()
+            self.create_similar_objects(self._target_security_device.device_connection.find(last_obj.name))
         except Exception as e:
             print("Error occurred when bulk creating port objects. More details: ", e)
 
@@ -197,7 +371,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         last_obj = ''
         for port_group in port_group_objects:
             # Apply name constraints to the port group object name
-            adapted_name = PANMCMigrationProject.apply_name_constraints(port_group.name)
+            adapted_name = self.rename_object(port_group, 'object')
             port_group.name = adapted_name
 
             # Initialize an empty list to store valid port group members
@@ -227,7 +401,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
 
             # Attempt to create a similar object on the target device
             try:
-                self._target_security_device.device_connection.find(last_obj.name).create_similar()
+                self.create_similar_objects(self._target_security_device.device_connection.find(last_obj.name))
             except Exception as e:
                 print("Error occurred when creating port group. More details: ", e)
 
@@ -249,7 +423,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         last_obj = ''
         for url_obj in url_objects:
             # Adapt the name and URL value of the URL object according to the constraints
-            adapted_name = PANMCMigrationProject.apply_url_name_constraints(url_obj.name)
+            adapted_name = self.rename_object(url_obj, 'url')
             url_obj.name = adapted_name
             adapted_url_value = PANMCMigrationProject.apply_url_value_constraints(url_obj.url_value)
             url_obj.url_value = adapted_url_value
@@ -270,7 +444,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
 
         # Attempt to bulk create similar URL objects on the target device
         try:
-            self._target_security_device.device_connection.find(last_obj.name).create_similar()
+            self.create_similar_objects(self._target_security_device.device_connection.find(last_obj.name))
         except Exception as e:
             print("Error occurred when bulk creating URL objects. More details: ", e)
 
@@ -292,7 +466,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         last_obj = ''
         for url_group in url_group_objects:
             # Apply name constraints to the URL group object
-            adapted_group_name = PANMCMigrationProject.apply_url_name_constraints(url_group.name)
+            adapted_group_name = self.rename_object(url_group, 'url')
             url_group.name = adapted_group_name
 
             # Initialize a set to store unique URL member values
@@ -321,7 +495,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
 
         # Attempt to bulk create similar URL group objects on the target device
         try:
-            self._target_security_device.device_connection.find(last_obj.name).create_similar()
+            self.create_similar_objects(self._target_security_device.device_connection.find(last_obj.name))
         except Exception as e:
             print("Error occurred when bulk creating URL group objects. More details: ", e)
 
@@ -350,7 +524,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
 
         # Attempt to bulk create similar tag objects on the target device
         try:
-            self._target_security_device.device_connection.find(last_obj.name).create_similar()
+            self.create_similar_objects(self._target_security_device.device_connection.find(last_obj.name))
         except Exception as e:
             print("Error occurred when creating tag objects. More details: ", e)
 
@@ -368,16 +542,225 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         elif section == 'post':
             return device_group.add(PostRulebase())
 
-    #TODO: experiment with bulk creating
-    # bulk creation should be possible as long as the rulebase object/device group object doesn't get instantiated each time for a new policy
+    def push_rulebase(self, rulebase, rule_type):
+        """
+        Create the rules of a rulebase on the target device, push_chunk_size rules at a time.
+
+        The rules are taken out of the rulebase and put back one chunk at a time, so every chunk is sent in a single
+        call. The rulebase is empty afterwards.
+
+        Args:
+            rulebase (Rulebase): The rulebase holding the rules.
+            rule_type (type): The class of the rules, for example SecurityRule.
+
+        Returns:
+            tuple: The number of rules of the rulebase and a list of (rule name, reason) pairs for the rules that could
+                   not be created.
+        """
+        rules = rulebase.removeall(rule_type)
+        failed_rules = []
+
+        for chunk_start in range(0, len(rules), self.push_chunk_size):
+            failed_rules.extend(self.push_rules(rulebase, rules[chunk_start:chunk_start + self.push_chunk_size]))
+
+        return len(rules), failed_rules
+
+    def push_rules(self, rulebase, rules):
+        """
+        Create a chunk of rules on the target device in a single call.
+
+        If the call fails, the chunk is split in two halves which are sent again, until the rules that cannot be created
+        are isolated. The other rules of the chunk are still created, in their original order.
+
+        Args:
+            rulebase (Rulebase): The rulebase the rules belong to. It must not hold any other rule of the same type.
+            rules (list): The rules.
+
+        Returns:
+            list: (rule name, reason) pairs for the rules that could not be created or edited.
+        """
+        # create_similar_objects() sends all the rules of the same type found in the rulebase, which are exactly the chunk
+        rulebase.extend(rules)
+        try:
+            return self.create_similar_objects(rules[0])
+        except Exception as e:
+            error = e
+        finally:
+            rulebase.removeall(type(rules[0]))
+
+        if len(rules) == 1:
+            print("Error occurred when creating policy object. More details: ", error)
+            special_policies_log.warn(f"Failed to create policy {rules[0].name}. Reason: {error}.\n")
+            return [(rules[0].name, str(error))]
+
+        # Bisect the chunk to find the rules that cannot be created
+        middle = len(rules) // 2
+        return self.push_rules(rulebase, rules[:middle]) + self.push_rules(rulebase, rules[middle:])
+
+    def push_device_group(self, device_group, rule_type):
+        """
+        Create the rules of all the rulebases of a device group, through a connection of its own. Runs on a worker thread.
+
+        Args:
+            device_group (DeviceGroup): The device group holding the rulebases. It must not belong to any connection.
+            rule_type (type): The class of the rules, for example SecurityRule.
+
+        Returns:
+            dict: The number of rules sent to the device, under 'rules', the number of rules already present on the
+                  device, under 'unchanged', and (rule name, reason) pairs for the rules that could not be created, under
+                  'failed'.
+        """
+        # Each worker sends its calls through its own configuration tree. The ones of a plan never connect to the device.
+        if self._migration_plan is not None:
+            device_connection = self._migration_plan.create_device_connection()
+        else:
+            device_connection = self._target_security_device.create_device_connection()
+        device_connection.add(device_group)
+
+        result = {'rules': 0, 'unchanged': 0, 'failed': []}
+        try:
+            if self._target_inventory is not None:
+                self._target_inventory.load_rules(device_group.name)
+
+            for rulebase in list(device_group.children):
+                rules = rulebase.findall(rule_type)
+                existing_rule_names = set()
+
+                # The rules already present on the target device are not sent again
+                if self._target_inventory is not None:
+                    existing_rule_names = {rule.name for rule in rules if not self._target_inventory.is_missing(rule)}
+                    result['unchanged'] += len(rules) - len(self._target_inventory.remove_unchanged(rules))
+
+                print(f"Creating the policies of the {type(rulebase).__name__} of device group {device_group.name}")
+                rule_count, failed_rules = self.push_rulebase(rulebase, rule_type)
+                result['rules'] += rule_count
+                result['failed'].extend(failed_rules)
+
+                # The rules created next to rules already present on the device are put back in their place
+                if existing_rule_names and self._migration_plan is None:
+                    failed_rule_names = {rule_name for rule_name, _ in failed_rules}
+                    result['failed'].extend(self.order_rules(rulebase, rules, existing_rule_names, failed_rule_names))
+                device_group.remove(rulebase)
+        finally:
+            device_connection.remove(device_group)
+
+        return result
+
+    def order_rules(self, rulebase, rules, existing_rule_names, failed_rule_names):
+        """
+        Move the rules created in a rulebase that already held some of the migrated rules to their place.
+
+        create_similar() appends the created rules at the bottom of the rulebase, below the rules that were already
+        present on the device, which changes the order the rules are matched in. Each created rule followed by an
+        existing one is moved after the rule preceding it in the source order.
+
+        Args:
+            rulebase (Rulebase): The rulebase the rules belong to. It must not hold any other rule of the same type.
+            rules (list): All the migrated rules of the rulebase, in the source order.
+            existing_rule_names (set): The names of the rules that were already present on the device.
+            failed_rule_names (set): The names of the rules that could not be created. They are not on the device.
+
+        Returns:
+            list: (rule name, reason) pairs for the rules that could not be moved.
+        """
+        # The existing rules stay on the device even if they could not be edited
+        placed_rules = [rule for rule in rules if rule.name in existing_rule_names or rule.name not in failed_rule_names]
+        existing_positions = [position for position, rule in enumerate(placed_rules) if rule.name in existing_rule_names]
+        failed_rules = []
+
+        # The created rules following the last existing rule are already in their place
+        rulebase.extend(rule for rule in placed_rules if rule.name not in existing_rule_names)
+        try:
+            for position, rule in enumerate(placed_rules[:existing_positions[-1]]):
+                if rule.name in existing_rule_names:
+                    continue
+                try:
+                    if position:
+                        rule.move('after', placed_rules[position - 1])
+                    else:
+                        rule.move('before', placed_rules[position + 1])
+                except Exception as e:
+                    print("Error occurred when moving policy object. More details: ", e)
+                    special_policies_log.warn(f"Failed to move policy {rule.name} to its place. Reason: {e}.\n")
+                    failed_rules.append((rule.name, str(e)))
+        finally:
+            rulebase.removeall(type(rules[0]))
+
+        return failed_rules
+
+    def push_device_groups(self, device_groups, rule_type):
+        """
+        Create the rules of the device groups on the target device.
+
+        The device groups are independent, so up to migration_threads of them are pushed at the same time. A device group
+        is always pushed by a single worker, which keeps the order of its rules.
+
+        Args:
+            device_groups (list): The device groups holding the rulebases.
+            rule_type (type): The class of the rules, for example SecurityRule.
+
+        Returns:
+            dict: The result of push_device_group() for each device group, keyed by device group name. The device groups
+                  that could not be pushed at all hold no rules and the reason of the failure, under 'error'.
+        """
+        report = {}
+        if not device_groups:
+            return report
+
+        with ThreadPoolExecutor(max_workers=min(self.migration_threads, len(device_groups)), thread_name_prefix='pioneer_migration') as executor:
+            futures = {device_group.name: executor.submit(self.push_device_group, device_group, rule_type) for device_group in device_groups}
+
+            # A device group that cannot be pushed at all does not stop the other ones
+            for device_group_name, future in futures.items():
+                try:
+                    report[device_group_name] = future.result()
+                except Exception as e:
+                    special_policies_log.warn(f"Failed to create the policies of device group {device_group_name}. Reason: {e}.\n")
+                    report[device_group_name] = {'rules': 0, 'unchanged': 0, 'failed': [], 'error': str(e)}
+
+        return report
+
+    @staticmethod
+    def print_migration_report(report, policy_type):
+        """
+        Print the merged results of the device groups pushed by push_device_groups().
+
+        Args:
+            report (dict): The report returned by push_device_groups().
+            policy_type (str): The type of the policies, used in the messages. For example 'security'.
+        """
+        rule_count = 0
+        failed_count = 0
+        failed_device_group_count = 0
+        for device_group_name, result in report.items():
+            if 'error' in result:
+                print(f"Device group {device_group_name} failed, none of its {policy_type} policies were created: {result['error']}")
+                failed_device_group_count += 1
+                continue
+
+            print(f"Device group {device_group_name}: {result['rules'] - len(result['failed'])} of {result['rules']} {policy_type} policies created, {result['unchanged']} already present.")
+            for rule_name, reason in result['failed']:
+                print(f"    {rule_name}: {reason}")
+            rule_count += result['rules']
+            failed_count += len(result['failed'])
+
+        if failed_count:
+            print(f"{failed_count} of {rule_count} {policy_type} policies could not be created. Check the special policies log for details.")
+        if failed_device_group_count:
+            print(f"{failed_device_group_count} of {len(report)} device groups could not be migrated. Check the special policies log for details.")
+
     def migrate_security_policies(self, policies):
         """
         Migrate security policies from the source to the target system.
 
+        The rules of each device group and section are gathered in a single rulebase, which is then pushed in chunks
+        of push_chunk_size rules. The device groups are pushed in parallel, see push_device_groups().
+
         :param policies: List of security policy objects to be migrated.
         """
-        # Dictionary to keep track of created DeviceGroups
+        # Dictionaries to keep track of created DeviceGroups and of their rulebases, keyed by (device group name, section)
         created_device_groups = {}
+        created_rulebases = {}
 
         for policy in policies:
             print(f"Migrating policy: {policy.name}")
@@ -419,16 +802,17 @@ PA treats ping as an application. The second rule will keep the exact same sourc
                 special_policies_log.warning(f"Policy <{policy.name}> cannot be migrated. Action from source device <{policy.action}> cannot be properly mapped.")
                 continue
 
-            #Duct tape solution to avoid having multiple device groups created
-            if policy._policy_container.uid not in created_device_groups:
-                device_group = DeviceGroup(self._security_policy_containers_map[policy._policy_container.uid])
-                self._target_security_device.device_connection.add(device_group)
-                created_device_groups[policy._policy_container.uid] = device_group
-            else:
-                device_group = created_device_groups[policy._policy_container.uid]
+            # Create each target device group only once, several source containers can be mapped to it
+            device_group_name = self._security_policy_containers_map[policy._policy_container.uid]
+            if device_group_name not in created_device_groups:
+                created_device_groups[device_group_name] = DeviceGroup(device_group_name)
+            device_group = created_device_groups[device_group_name]
 
-            # Determine the appropriate rulebase (pre or post)
-            rulebase = self.get_rulebase(device_group, policy.section)
+            # Determine the appropriate rulebase (pre or post), it holds all the policies of its section
+            rulebase_key = (device_group_name, policy.section)
+            if rulebase_key not in created_rulebases:
+                created_rulebases[rulebase_key] = self.get_rulebase(device_group, policy.section)
+            rulebase = created_rulebases[rulebase_key]
 
             # Adjust policy applications based on ICMP presence
             if has_icmp:
@@ -444,28 +828,22 @@ PA treats ping as an application. The second rule will keep the exact same sourc
                 policy.policy_apps == ['any']):
                 special_policies_log.warn(f"Policy {policy.name} is an 'any-any' policy. Check on source device what special parameters it has.")
 
-            # Apply name constraints
-            policy.name = PANMCMigrationProject.apply_name_constraints(policy.name)
+            # Apply name constraints, the source name is kept for naming the ping policy
+            source_policy_name = policy.name
+            policy.name = self.map_name('policy', source_policy_name)
 
             # Create and add policy object to the rulebase
             self._add_security_policy_to_rulebase(rulebase, policy, source_zone_names, destination_zone_names,
                                         source_network_names, destination_network_names,
-                                        destination_port_names, url_names, policy_action, log_end)
+                                        destination_port_names, url_names, policy_action, log_end, source_policy_name)
 
-            # Attempt to create the policy object
-            try:
-                rulebase.find(policy.name).create_similar()
-            except Exception as e:
-                print("Error occurred when creating policy object. More details: ", e)
-                special_policies_log.warn(f"Failed to create policy {policy.name}. Reason: {e}.\n")
-            
-            #TODO: empty the device group after the policies have been created, to prevent
-            # the case where a policy that cannot be migrated prevents further policies from getting migrated
-            device_group.remove(rulebase)
+        # Push the device groups, a policy that cannot be created does not prevent the other ones from being migrated
+        report = self.push_device_groups(list(created_device_groups.values()), SecurityRule)
+        PANMCMigrationProject.print_migration_report(report, 'security')
 
     def _add_security_policy_to_rulebase(self, rulebase, policy, from_zones, to_zones,
                                source_networks, destination_networks,
-                               destination_ports, url_names, policy_action, log_end):
+                               destination_ports, url_names, policy_action, log_end, source_policy_name):
         """
         Create and add a policy object to the rulebase.
 
@@ -479,6 +857,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         :param url_names: List of URL names.
         :param policy_action: Action for the policy.
         :param log_end: Boolean indicating if logging should end.
+        :param source_policy_name: Name of the policy on the source device, the ping policy is named after it.
         """
         if policy.policy_apps != ['ping']:
             policy.policy_apps = ['any']
@@ -526,7 +905,7 @@ PA treats ping as an application. The second rule will keep the exact same sourc
                 rulebase.add(policy_object)
 
             # Create a separate ping policy
-            policy.name = policy.name[:58] + '_PING'
+            policy.name = self.map_name('policy', source_policy_name + '_PING')
             policy.policy_apps = ['ping']
             destination_ports = ['any']
             policy_object = SecurityRule(
@@ -553,8 +932,15 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         """
         Migrate NAT policies from the source to the target system.
 
+        The rules of each device group are gathered in a single rulebase, which is then pushed in chunks of
+        push_chunk_size rules, the same way as the security policies. The device groups are pushed in parallel.
+
         :param policies: List of NAT policy objects to be migrated.
         """
+        # Dictionaries to keep track of created DeviceGroups and of their rulebases, keyed by device group name
+        created_device_groups = {}
+        created_rulebases = {}
+
         for policy in policies:
             print(f"Migrating policy: {policy.name}")
             if policy.status != True:
@@ -577,74 +963,144 @@ PA treats ping as an application. The second rule will keep the exact same sourc
 
             # Get source and destination network names
             original_source_network_names = self.reslove_network_object_names(policy.original_source)
-            original_source_port_names = self.resolve_port_object_names(policy.original_source_port)
+            original_source_port_names, _ = self.resolve_port_object_names(policy.original_source_port)
             original_destination_network_names = self.reslove_network_object_names(policy.original_destination)
-            original_destination_port_names = self.resolve_port_object_names(policy.original_destination_port)
+            original_destination_port_names, _ = self.resolve_port_object_names(policy.original_destination_port)
 
             translated_source_network_names = self.reslove_network_object_names(policy.translated_source)
-            translated_source_port_names = self.resolve_port_object_names(policy.translated_source_port)
+            translated_source_port_names, _ = self.resolve_port_object_names(policy.translated_source_port)
             translated_destination_network_names = self.reslove_network_object_names(policy.translated_destination)
-            translated_destination_port_names = self.resolve_port_object_names(policy.translated_destination_port)
+            translated_destination_port_names, _ = self.resolve_port_object_names(policy.translated_destination_port)
+
+            # Create each target device group only once, several source containers can be mapped to it
+            try:
+                device_group_name = self._nat_policy_containers_map[policy._policy_container.uid]
+            except KeyError:
+                special_policies_log.warning(f"Policy <{policy.name}> cannot be migrated. Its container is not mapped to a target container.")
+                continue
+            if device_group_name not in created_device_groups:
+                created_device_groups[device_group_name] = DeviceGroup(device_group_name)
+
+                # create all policies in the PRE rulebase for now
+                created_rulebases[device_group_name] = created_device_groups[device_group_name].add(PreRulebase())
 
-            # create all policies in the PRE rulebase for now
-            device_group = DeviceGroup(self._security_policy_containers_map[policy.policy_container.uid])
-            self._target_security_device.device_connection.add(device_group)
-            rulebase = device_group.add(PreRulebase())
+            rulebase = created_rulebases[device_group_name]
 
             # now build the NAT policy. All migrated NAT policies will be: static/dynamic policies.
             # dynamic policies will have the following parameters: dynamic-ip-and-port SNAT, dynamic ip with session distribution and ip hash as distribution method for DNAT
             # Apply name constraints
-            policy.name = PANMCMigrationProject.apply_name_constraints(policy.name)
+            policy.name = self.map_name('policy', policy.name)
 
             # Create and add policy object to the rulebase
             self._add_nat_policy_to_rulebase(rulebase, policy, source_zone_names, destination_zone_names,
                                         original_source_network_names, original_source_port_names, original_destination_network_names, original_destination_port_names,
                                         translated_source_network_names, translated_source_port_names, translated_destination_network_names, translated_destination_port_names)
-            try:
-                rulebase.find(policy.name).create_similar()
-            except Exception as e:
-                print("Error occurred when creating policy object. More details: ", e)
-                special_policies_log.warn(f"Failed to create policy {policy.name}. Reason: {e}.\n")
+
+        # Push the device groups, a policy that cannot be created does not prevent the other ones from being migrated
+        report = self.push_device_groups(list(created_device_groups.values()), NatRule)
+        PANMCMigrationProject.print_migration_report(report, 'NAT')
 
     def _add_nat_policy_to_rulebase(self, rulebase, policy, source_zone_names, destination_zone_names,
                                         original_source_network_names, original_source_port_names, original_destination_network_names, original_destination_port_names,
                                         translated_source_network_names, translated_source_port_names, translated_destination_network_names, translated_destination_port_names):
-        
-        # there are multiple cases here:
-        #   NAT policy is:
-            # a static policy
-                # using interface for SNAT (if interface_in_translated_source)
-                # using interface for DNAT (if interface_in_original_destination)
-            # a dynamic policy
-                # using interface for SNAT (if interface_in_translated_source)
-                # using interface for DNAT (if interface_in_original_destination)
-            if(policy.interface_in_translated_source):
-                source_translation_address_type = 'interface-address'
+        """
+        Build the NAT rule of a policy and add it to the rulebase.
+
+        Static policies translate the source to a single address, dynamic policies translate it to the translated source
+        addresses or to the address of the egress interface, with port translation. The destination is translated to
+        the translated destination and, if it is a single port, to the translated destination port.
+
+        :param rulebase: The rulebase the rule is added to.
+        :param policy: The NAT policy.
+        :param source_zone_names: The names of the source zones.
+        :param destination_zone_names: The names of the destination zones.
+        :param original_source_network_names: The names of the original source networks.
+        :param original_source_port_names: The names of the original source ports.
+        :param original_destination_network_names: The names of the original destination networks.
+        :param original_destination_port_names: The names of the original destination ports.
+        :param translated_source_network_names: The names of the translated source networks.
+        :param translated_source_port_names: The names of the translated source ports.
+        :param translated_destination_network_names: The names of the translated destination networks.
+        :param translated_destination_port_names: The names of the translated destination ports.
+        """
+        nat_rule_parameters = {}
+
+        # A NAT rule matches a single service, which is the original destination port
+        if len(original_destination_port_names) > 1:
+            special_policies_log.warning(f"Policy <{policy.name}> has several original destination ports. Only <{original_destination_port_names[0]}> is migrated.")
+        nat_rule_parameters['service'] = original_destination_port_names[0]
+
+        # Source translation
+        if policy.interface_in_translated_source:
+            # The egress interface is not known on the source device, it must be set on the rule after the migration
+            nat_rule_parameters['source_translation_type'] = 'dynamic-ip-and-port'
+            nat_rule_parameters['source_translation_address_type'] = 'interface-address'
+            special_policies_log.warning(f"Policy <{policy.name}> translates the source to the address of the egress interface. Set the interface on the target device.")
+        elif translated_source_network_names != ['any']:
+            if policy.static_or_dynamic == 'static':
+                # A static translation has a single translated address
+                nat_rule_parameters['source_translation_type'] = 'static-ip'
+                nat_rule_parameters['source_translation_static_translated_address'] = translated_source_network_names[0]
             else:
-                source_translation_address_type = 'translated-address'
-
-            policy_object = NatRule(name=policy.name,
-                                    description=policy.description,
-                                    fromzone=source_zone_names,
-                                    tozone=destination_zone_names,
-                                    service=original_source_port_names,
-                                    source=original_source_network_names,
-                                    destination=original_destination_network_names,
-                                    source_translation_type=source_translation_address_type,
-                                    )
+                nat_rule_parameters['source_translation_type'] = 'dynamic-ip-and-port'
+                nat_rule_parameters['source_translation_address_type'] = 'translated-address'
+                nat_rule_parameters['source_translation_translated_addresses'] = translated_source_network_names
+
+        # Destination translation
+        if translated_destination_network_names != ['any']:
+            if len(translated_destination_network_names) > 1:
+                special_policies_log.warning(f"Policy <{policy.name}> has several translated destinations. Only <{translated_destination_network_names[0]}> is migrated.")
+            nat_rule_parameters['destination_translated_address'] = translated_destination_network_names[0]
+
+            # The translated port is a number on the target device, it can only be taken from a single port object
+            translated_destination_ports = [port_object for port_object in policy.translated_destination_port or [] if isinstance(port_object, PioneerPortObject)]
+            if len(translated_destination_ports) == 1 and str(translated_destination_ports[0].destination_port).isdigit():
+                nat_rule_parameters['destination_translated_port'] = int(translated_destination_ports[0].destination_port)
+            elif translated_destination_port_names != ['any']:
+                special_policies_log.warning(f"Policy <{policy.name}> translates the destination port to <{translated_destination_port_names}>, which is not a single port. The port is not translated.")
+
+        policy_object = NatRule(name=policy.name,
+                                description=policy.description,
+                                fromzone=source_zone_names,
+                                tozone=destination_zone_names,
+                                source=original_source_network_names,
+                                destination=original_destination_network_names,
+                                **nat_rule_parameters)
+        rulebase.add(policy_object)
+
+    @staticmethod
+    def get_name_suffix(name, attempt, length):
+        """
+        Build the suffix appended to a name that has to be shortened or that is already taken.
+
+        The suffix is derived from a hash of the name, so the same name always gets the same suffix.
+
+        Args:
+            name (str): The original name.
+            attempt (int): The number of names already tried. Each attempt gets a different suffix.
+            length (int): The number of characters of the hash kept in the suffix.
+
+        Returns:
+            str: The suffix, starting with '_'.
+        """
+        name_hash = hashlib.sha256(f"{name}:{attempt}".encode('utf-8')).hexdigest()
+        return '_' + name_hash[:length]
 
     @staticmethod
-    def apply_name_constraints(name):
+    def apply_name_constraints(name, attempt=0):
         """
         Applies constraints to a given name by replacing invalid characters,
         removing trailing spaces, and truncating the name if necessary.
 
         Args:
             name (str): The original name to be constrained.
+            attempt (int): The number of names already tried for this name, because they were taken by other names.
 
         Returns:
             str: The constrained name.
         """
+        original_name = name
+
         # Check if the first character is non-alphanumeric and replace it with 'a'
         if name and not name[0].isalnum():
             name = 'a' + name[1:]
@@ -656,22 +1112,23 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         if constrained_name and constrained_name[-1].isspace():
             constrained_name = constrained_name[:-1]
         
-        # Truncate the name if it exceeds 63 characters
-        if len(constrained_name) > 63:
+        # Truncate the name if it exceeds 63 characters, or if the name is already taken
+        if len(constrained_name) > 63 or attempt:
             truncated_name = constrained_name[:58]
-            suffix = f"_{random.randint(100, 999)}"
+            suffix = PANMCMigrationProject.get_name_suffix(original_name, attempt, 4)
             constrained_name = truncated_name + suffix
         
         return constrained_name
     
     @staticmethod
-    def apply_url_name_constraints(name):
+    def apply_url_name_constraints(name, attempt=0):
         """
         Applies constraints to a given URL name by replacing invalid characters,
         ensuring the name starts with an alphabet, and truncating the name if necessary.
 
         Args:
             name (str): The original URL name to be constrained.
+            attempt (int): The number of names already tried for this name, because they were taken by other names.
 
         Returns:
             str: The constrained URL name.
@@ -686,10 +1143,10 @@ PA treats ping as an application. The second rule will keep the exact same sourc
         if not constrained_name[0].isalpha():
             constrained_name = 'a' + constrained_name
             
-        # Truncate the name if it exceeds 31 characters
-        if len(constrained_name) > 31:
+        # Truncate the name if it exceeds 31 characters, or if the name is already taken
+        if len(constrained_name) > 31 or attempt:
             truncated_name = constrained_name[:27]
-            suffix = f"_{random.randint(100, 999)}"
+            suffix = PANMCMigrationProject.get_name_suffix(name, attempt, 3)
             constrained_name = truncated_name + suffix
         
         return constrained_name
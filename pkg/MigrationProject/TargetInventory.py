@@ -0,0 +1,177 @@
+import threading
+from panos.panorama import Panorama, DeviceGroup
+from panos.objects import AddressObject, AddressGroup, ServiceObject, ServiceGroup, CustomUrlCategory, Tag
+from panos.policies import PreRulebase, PostRulebase, SecurityRule, NatRule
+import utils.helper as helper
+
+general_logger = helper.logging.getLogger('general')
+
+class TargetInventory:
+    """
+    Index of the configuration already present on the target Panorama.
+
+    The shared objects are retrieved once, when the inventory is loaded. The rules of a device group are retrieved the
+    first time the device group is migrated. The parameters of each element are indexed by its xpath, so an object or
+    rule built by the migration is compared to the one on the device without any other call. Only the missing ones are then created and
+    the changed ones edited, which makes rerunning a migration after a partial failure cheap.
+
+    Attributes:
+        _device_connection (Panorama): The connection to the target device, taken when the inventory is created. The
+                                       connection of the device is swapped out by a migration plan afterwards.
+        _parameters (dict): The parameters of the elements present on the device, keyed by xpath.
+        _loaded_device_groups (set): The names of the device groups whose rules were retrieved.
+        _lock (Lock): Protects the index, which is used by the migration threads.
+        _device_group_locks (dict): Makes sure the rules of a device group are retrieved only once.
+    """
+
+    # The object and rule types indexed by the inventory
+    object_types = (Tag, AddressObject, AddressGroup, ServiceObject, ServiceGroup, CustomUrlCategory)
+    rulebase_types = (PreRulebase, PostRulebase)
+    rule_types = (SecurityRule, NatRule)
+    # The parameters filled in by the device, which the migration never sets
+    device_parameters = ('uuid',)
+
+    def __init__(self, security_device):
+        """
+        Initialize the TargetInventory instance.
+
+        Args:
+            security_device (PANMCSecurityDevice): The target device.
+        """
+        self._device_connection = security_device.device_connection
+        self._parameters = {}
+        self._loaded_device_groups = set()
+        self._lock = threading.Lock()
+        self._device_group_locks = {}
+
+    def create_device_connection(self):
+        """
+        Open another connection to the target device, so the retrieved objects are not mixed with the migrated ones
+        and the threads do not share a connection.
+
+        Returns:
+            Panorama: The new connection.
+        """
+        return Panorama(self._device_connection.hostname, api_key=self._device_connection.api_key, port=self._device_connection.port)
+
+    @staticmethod
+    def get_parameters(pan_object):
+        """
+        Get the parameters of an object in a form that does not depend on how the object was built.
+
+        The members of the lists are sorted, as their order has no meaning on the device, and the values filled in by
+        the device itself, such as the uuid of the rules, are left out.
+
+        Args:
+            pan_object (PanObject): The object.
+
+        Returns:
+            dict: The parameters, keyed by their names.
+        """
+        parameters = {}
+        for parameter_name, value in pan_object.about().items():
+            if parameter_name in TargetInventory.device_parameters:
+                continue
+            if isinstance(value, (list, tuple)):
+                value = tuple(sorted(str(member) for member in value))
+            parameters[parameter_name] = value
+        return parameters
+
+    def index(self, pan_objects):
+        """
+        Add objects to the index, or update the ones already in it.
+
+        Args:
+            pan_objects (iterable): The objects. They must be attached to a Panorama, so their xpath can be built.
+        """
+        parameters = {pan_object.xpath(): self.get_parameters(pan_object) for pan_object in pan_objects}
+        with self._lock:
+            self._parameters.update(parameters)
+
+    def load_objects(self):
+        """
+        Retrieve the shared objects of the device. Each object type is retrieved with a single call.
+        """
+        device_connection = self.create_device_connection()
+
+        for object_type in self.object_types:
+            pan_objects = object_type.refreshall(device_connection)
+            self.index(pan_objects)
+            general_logger.info(f"Found <{len(pan_objects)}> <{object_type.__name__}> objects on the target device.")
+
+    def load_rules(self, device_group_name):
+        """
+        Retrieve the rules of a device group, unless they were already retrieved.
+
+        Args:
+            device_group_name (str): The name of the device group.
+        """
+        with self._lock:
+            device_group_lock = self._device_group_locks.setdefault(device_group_name, threading.Lock())
+
+        with device_group_lock:
+            if device_group_name in self._loaded_device_groups:
+                return
+
+            device_connection = self.create_device_connection()
+            device_group = device_connection.add(DeviceGroup(device_group_name))
+
+            for rulebase_type in self.rulebase_types:
+                rulebase = device_group.add(rulebase_type())
+                for rule_type in self.rule_types:
+                    self.index(rule_type.refreshall(rulebase))
+
+            general_logger.info(f"Retrieved the rules of device group <{device_group_name}> from the target device.")
+            self._loaded_device_groups.add(device_group_name)
+
+    def is_missing(self, pan_object):
+        """
+        Check if an object is absent from the device.
+
+        Args:
+            pan_object (PanObject): The object, attached to a Panorama.
+
+        Returns:
+            bool: True if the device holds no object at the xpath of the object.
+        """
+        with self._lock:
+            return pan_object.xpath() not in self._parameters
+
+    def is_unchanged(self, pan_object):
+        """
+        Check if an object is present on the device, with the same configuration.
+
+        Only the parameters set by the migration are compared. The ones it leaves unset keep the value of the device,
+        for example their default value.
+
+        Args:
+            pan_object (PanObject): The object, attached to a Panorama.
+
+        Returns:
+            bool: True if the device already holds the object, with the same values for the parameters it sets.
+        """
+        with self._lock:
+            existing_parameters = self._parameters.get(pan_object.xpath())
+        if existing_parameters is None:
+            return False
+
+        return all(existing_parameters.get(parameter_name) == value
+                   for parameter_name, value in self.get_parameters(pan_object).items() if value is not None)
+
+    def remove_unchanged(self, pan_objects):
+        """
+        Detach the objects that are already present on the device from their parent.
+
+        Args:
+            pan_objects (list): The objects, attached to a Panorama.
+
+        Returns:
+            list: The objects that are missing or changed on the device. They stay attached to their parent.
+        """
+        changed_objects = []
+        for pan_object in pan_objects:
+            if self.is_unchanged(pan_object):
+                pan_object.parent.remove(pan_object)
+            else:
+                changed_objects.append(pan_object)
+        return changed_objects
@@ -2,7 +2,8 @@ from abc import abstractmethod
 import utils.helper as helper
 import utils.gvars as gvars
 from pkg import SecurityPolicyContainersMapTable, MigrationProjectGeneralDataTable, MigrationProjectDevicesTable, SecurityDeviceInterfaceMap, \
-LogSettingsTable, SpecialSecurityPolicyParametersTable, NetworkObjectTypesMapTable, SecurityPolicyActionMapTable, SecurityPolicySectionMap, NATPolicyContainersMapTable
+LogSettingsTable, SpecialSecurityPolicyParametersTable, NetworkObjectTypesMapTable, SecurityPolicyActionMapTable, SecurityPolicySectionMap, NATPolicyContainersMapTable, \
+NameMapTable
 from pkg.SecurityDevice import SecurityDeviceDatabase
 from pkg.DeviceObject.PioneerDeviceObject import PioneerICMPObject, PioneerPortGroupObject
 
@@ -30,6 +31,7 @@ class MigrationProjectDatabase(SecurityDeviceDatabase):
         self._security_policy_action_map_table = SecurityPolicyActionMapTable(self)
         self._security_policy_section_map_table = SecurityPolicySectionMap(self)
         self._nat_policy_containers_map_table = NATPolicyContainersMapTable(self)
+        self._name_map_table = NameMapTable(self)
 
     def create_migration_project_tables(self):
         """
@@ -56,6 +58,7 @@ class MigrationProjectDatabase(SecurityDeviceDatabase):
         self._security_policy_section_map_table.pre_insert_data()
 
         self._nat_policy_containers_map_table.create()
+        self._name_map_table.create()
 
     @property
     def migration_project_general_data_table(self):
@@ -157,6 +160,16 @@ class MigrationProjectDatabase(SecurityDeviceDatabase):
         """
         return self._nat_policy_containers_map_table
 
+    @property
+    def name_map_table(self):
+        """
+        Get the name map table.
+
+        Returns:
+            NameMapTable: The table mapping the source names to the target names.
+        """
+        return self._name_map_table
+
 class MigrationProject:
     def __init__(self, name, db):
         """
@@ -168,6 +181,8 @@ class MigrationProject:
         """
         self._name = name
         self._db = db
+        self._push_chunk_size = gvars.policy_push_chunk_size
+        self._migration_threads = gvars.panmc_migration_threads
 
     @property
     def db(self):
@@ -189,6 +204,46 @@ class MigrationProject:
         """
         return self._name
 
+    @property
+    def push_chunk_size(self):
+        """
+        Get the number of policies sent to the target device in a single call.
+
+        Returns:
+            int: The number of policies.
+        """
+        return self._push_chunk_size
+
+    @push_chunk_size.setter
+    def push_chunk_size(self, value):
+        """
+        Set the number of policies sent to the target device in a single call.
+
+        Args:
+            value (int): The number of policies. Values lower than 1 are raised to 1.
+        """
+        self._push_chunk_size = max(1, value)
+
+    @property
+    def migration_threads(self):
+        """
+        Get the number of target containers whose policies are pushed in parallel.
+
+        Returns:
+            int: The number of threads.
+        """
+        return self._migration_threads
+
+    @migration_threads.setter
+    def migration_threads(self, value):
+        """
+        Set the number of target containers whose policies are pushed in parallel.
+
+        Args:
+            value (int): The number of threads. Values lower than 1 are raised to 1.
+        """
+        self._migration_threads = max(1, value)
+
     def save_general_info(self, description, creation_timestamp):
         """
         Save the general information of the migration project to the db.
@@ -300,10 +355,8 @@ class MigrationProject:
             target_data = target_device_db_table.get('*')
 
             # Insert data from source and target into the target project table
-            for row in source_data:
-                target_project_db_table.insert(*row)
-            for row in target_data:
-                target_project_db_table.insert(*row)
+            target_project_db_table.insert_many(source_data)
+            target_project_db_table.insert_many(target_data)
     
     def map_containers(self, source_container_name, target_container_name, container_type):
         # Determine the correct tables based on the container type
@@ -391,31 +444,77 @@ class MigrationProject:
         # Insert the security profile into the special security policy parameters table
         self.db.special_security_policy_parameters_table.insert(security_profile)
 
-    def load_containers_map(self):
+    def get_containers_map_tables(self, container_type):
+        """
+        Get the tables holding the policy containers of the specified type and their mapping.
+
+        Args:
+            container_type (str): 'security_policy_containers' or 'nat_policy_containers'.
+
+        Returns:
+            tuple: The containers table, the containers map table and the source and target columns of the map table.
+
+        Raises:
+            ValueError: If the container type is not supported.
+        """
+        if container_type == 'security_policy_containers':
+            return self.db.security_policy_containers_table, self.db.security_policy_containers_map_table, \
+                ['source_security_policy_container_uid', 'target_security_policy_container_uid']
+        elif container_type == 'nat_policy_containers':
+            return self.db.nat_policy_containers_table, self.db.nat_policy_containers_map_table, \
+                ['source_nat_policy_container_uid', 'target_nat_policy_container_uid']
+        else:
+            raise ValueError(f"Unsupported container type: '{container_type}'.")
+
+    def get_mapped_container_names(self, container_type):
         """
-        Loads the mapping of source security policy containers to target security policy containers.
+        Get the names of the source policy containers that are mapped to a target container.
 
-        Retrieves the source and target security policy container UIDs from the containers map table,
+        Args:
+            container_type (str): 'security_policy_containers' or 'nat_policy_containers'.
+
+        Returns:
+            list: The names of the source containers, in the order they were mapped.
+        """
+        containers_table, containers_map_table, map_columns = self.get_containers_map_tables(container_type)
+
+        container_names = []
+        for (source_container_uid,) in containers_map_table.get(map_columns[:1]):
+            source_container_data = containers_table.get(['name'], 'uid', source_container_uid)
+            # A source container can be mapped more than once, it is still migrated only once
+            if source_container_data and source_container_data[0][0] not in container_names:
+                container_names.append(source_container_data[0][0])
+
+        return container_names
+
+    def load_containers_map(self, container_type='security_policy_containers'):
+        """
+        Loads the mapping of source policy containers to target policy containers.
+
+        Retrieves the source and target policy container UIDs from the containers map table,
         and then fetches the names of the target containers to create a mapping dictionary.
 
+        Args:
+            container_type (str): 'security_policy_containers' or 'nat_policy_containers'.
+
         Returns:
             dict: A dictionary where keys are source container UIDs and values are target container names.
         
         Raises:
-            ValueError: If a target container with a given UID is not found in the security policy containers table.
+            ValueError: If a target container with a given UID is not found in the policy containers table.
         """
+        containers_table, containers_map_table, map_columns = self.get_containers_map_tables(container_type)
+
         # Fetch the mapping of source to target container UIDs from the database
-        containers_map = self.db.security_policy_containers_map_table.get(
-            ['source_security_policy_container_uid', 'target_security_policy_container_uid']
-        )
+        containers_map = containers_map_table.get(map_columns)
 
         # Initialize the dictionary to store the container mappings
         containers_map_dict = {}
 
         # Process each pair of source and target container UIDs
         for source_container_uid, target_container_uid in containers_map:
-            # Fetch the name of the target security policy container
-            target_container_data = self.db.security_policy_containers_table.get(
+            # Fetch the name of the target policy container
+            target_container_data = containers_table.get(
                 ['name'], 'uid', target_container_uid
             )
             
@@ -151,17 +151,13 @@ class FMCSecurityPolicy(SecurityPolicy, FMCObjectWithLiterals):
             network_object_name = network_object_entry['name']
             network_object_type = network_object_entry['type']
 
-            # If the network object is of type 'Country' or 'Geolocation'
-            if network_object_type == 'Geolocation':
-                # Convert the policy region to an object and save it
-                policy_region = FMCObjectWithLiterals.convert_policy_region_to_object(virtual_object_container, network_object_entry)
-            elif network_object_type == 'Country':
-                policy_region = FMCObjectWithLiterals.convert_policy_country_to_object(virtual_object_container, network_object_entry)
+            # If the network object is of type 'Country' or 'Geolocation', convert the policy region to an object and save it
+            if network_object_type in ('Geolocation', 'Country'):
+                policy_region = FMCObjectWithLiterals.save_policy_region(virtual_object_container, network_object_entry, db)
             else:
                 policy_region = None
 
             if policy_region:
-                policy_region.save(db)
                 # Append the name of the policy region to the list
                 extracted_network_objects.append(policy_region.name)
             
@@ -172,8 +168,7 @@ class FMCSecurityPolicy(SecurityPolicy, FMCObjectWithLiterals):
         network_literals = network_object_info.get('literals', [])
         for network_literal_entry in network_literals:
             # Convert the network literal to an object and save it
-            converted_literal = FMCObjectWithLiterals.convert_network_literal_to_object(virtual_object_container, network_literal_entry)
-            converted_literal.save(db)
+            converted_literal = FMCObjectWithLiterals.save_network_literal(virtual_object_container, network_literal_entry, db)
             # Append the name of the converted literal to the list
             extracted_network_objects.append(converted_literal.name)
 
@@ -211,11 +206,8 @@ class FMCSecurityPolicy(SecurityPolicy, FMCObjectWithLiterals):
         # Process port literals
         port_literals = port_object_info.get('literals', [])
         for port_literal_entry in port_literals:
-            # Convert the port literal to an object
-            converted_literal = FMCObjectWithLiterals.convert_port_literals_to_objects(virtual_object_container, port_literal_entry, self._policy_info)
-
-            # Save the literal object
-            converted_literal.save(db)
+            # Convert the port literal to an object and save it
+            converted_literal = FMCObjectWithLiterals.save_port_literal(virtual_object_container, port_literal_entry, self._policy_info, db)
             # Append the name of the literal to the list
             extracted_port_objects.append(converted_literal.name)
 
@@ -334,8 +326,7 @@ class FMCSecurityPolicy(SecurityPolicy, FMCObjectWithLiterals):
         # Process URL literals
         url_literals = url_object_info.get('literals', [])
         for url_literal in url_literals:
-            literal_object = FMCObjectWithLiterals.convert_url_literal_to_object(virtual_object_container, url_literal)
-            literal_object.save(db)
+            literal_object = FMCObjectWithLiterals.save_url_literal(virtual_object_container, url_literal, db)
             url_object_names.append(literal_object.name)
 
         # Process URL categories
@@ -205,6 +205,51 @@ class Policy:
     def target_device_uid(self, value):
         self._target_device_uid = value
 
+    def get_reference_rows(self, names, object_types, name_index, *extra_values):
+        """
+        Build the relationship rows of the objects referenced by the policy.
+
+        Args:
+            names (list): The names of the referenced objects.
+            object_types (tuple): The types the names are resolved to, in the order of the columns of the rows.
+            name_index (TypedNameIndex): The index resolving the names to uids.
+            *extra_values: The values of the columns following the uids, for example the flow direction.
+
+        Returns:
+            list: One row per name. If there are no names, a single row without uids is returned.
+        """
+        if not names:
+            return [(self.uid, *(None,) * len(object_types), *extra_values)]
+        return [(self.uid, *name_index.resolve(name, object_types), *extra_values) for name in names]
+
+    def create_relationships_in_db(self, db, name_index):
+        """
+        Create the relationships of the policy in the db.
+
+        Creating the relationships of many policies is faster with SecurityDevice.create_group_relationships(),
+        which writes the rows of all the policies in bulk.
+
+        Args:
+            db (Database): The db instance to create relationships in.
+            name_index (TypedNameIndex): The index resolving the names of the referenced objects to uids.
+        """
+        for table, rows in self.get_relationship_rows(db, name_index):
+            table.insert_many(rows)
+
+    @abstractmethod
+    def get_relationship_rows(self, db, name_index):
+        """
+        Build the relationship rows of the policy.
+
+        Args:
+            db (Database): The db instance holding the relationship tables.
+            name_index (TypedNameIndex): The index resolving the names of the referenced objects to uids.
+
+        Returns:
+            list: (table, rows) tuples.
+        """
+        pass
+
 class SecurityPolicy(Policy):
     """
     Class representing a security policy.
@@ -254,6 +299,15 @@ class SecurityPolicy(Policy):
         _log_end (datetime): End time for logging.
     """
 
+    # The types of the objects the referenced names are resolved to, in the order of the columns of the relationship tables
+    zone_lookup_types = (gvars.security_zone,)
+    network_lookup_types = (gvars.network_object, gvars.network_group_object, gvars.country_object, gvars.geolocation_object)
+    port_lookup_types = (gvars.port_object, gvars.icmp_object, gvars.port_group_object)
+    user_lookup_types = (gvars.policy_user_object,)
+    url_lookup_types = (gvars.url_object, gvars.url_group_object, gvars.url_category_object)
+    l7_app_lookup_types = (gvars.l7_app_object, gvars.l7_app_filter_object, gvars.l7_app_group_object)
+    schedule_lookup_types = (gvars.schedule_object,)
+
     def __init__(
         self,
         policy_container,
@@ -447,148 +501,43 @@ class SecurityPolicy(Policy):
             self.target_device_uid,
         )
 
-    def create_relationships_in_db(self, db, preloaded_data):
+    def get_relationship_rows(self, db, name_index):
         """
-        Create relationships in the db for the security policy.
+        Build the relationship rows of the security policy.
 
         Args:
-            db (Database): The db instance to create relationships in.
-            preloaded_data (dict): Preloaded data for creating relationships.
-        """
-        def insert_zones(zone_names, flow):
-            """
-            Insert zone data into the db.
-
-            Args:
-                zone_names (list): List of zone names.
-                flow (str): Flow direction ('source' or 'destination').
-            """
-            if not zone_names:
-                db.security_policy_zones_table.insert(self.uid, None, flow)
-            else:
-                for zone_name in zone_names:
-                    zone_uid = preloaded_data[gvars.security_zone].get(zone_name)
-                    db.security_policy_zones_table.insert(self.uid, zone_uid, flow)
-
-        def insert_networks(network_names, flow):
-            """
-            Insert network data into the db.
-
-            Args:
-                network_names (list): List of network names.
-                flow (str): Flow direction ('source' or 'destination').
-            """
-            if not network_names:
-                db.security_policy_networks_table.insert(self.uid, None, None, None, None, flow)
-            else:
-                for network_name in network_names:
-                    object_uid = preloaded_data[gvars.network_object].get(network_name)
-                    group_uid = preloaded_data[gvars.network_group_object].get(network_name)
-                    country_uid = preloaded_data[gvars.country_object].get(network_name)
-                    geolocation_uid = preloaded_data[gvars.geolocation_object].get(network_name)
-                    db.security_policy_networks_table.insert(self.uid, object_uid, group_uid, country_uid, geolocation_uid, flow)
-
-        def insert_ports(port_names, flow):
-            """
-            Insert port data into the db.
-
-            Args:
-                port_names (list): List of port names.
-                flow (str): Flow direction ('source' or 'destination').
-            """
-            if not port_names:
-                db.security_policy_ports_table.insert(self.uid, None, None, None, flow)
-            else:
-                for port_name in port_names:
-                    object_uid = preloaded_data[gvars.port_object].get(port_name)
-                    icmp_uid = preloaded_data[gvars.icmp_object].get(port_name)
-                    group_uid = preloaded_data[gvars.port_group_object].get(port_name)
-                    db.security_policy_ports_table.insert(self.uid, object_uid, icmp_uid, group_uid, flow)
-
-        def insert_users(user_names):
-            """
-            Insert user data into the db.
-
-            Args:
-                user_names (list): List of user names.
-            """
-            if not user_names:
-                db.security_policy_users_table.insert(self.uid, None)
-            else:
-                for user_name in user_names:
-                    user_uid = preloaded_data[gvars.policy_user_object].get(user_name)
-                    db.security_policy_users_table.insert(self.uid, user_uid)
-
-        def insert_urls(url_names):
-            """
-            Insert URL data into the db.
-
-            Args:
-                url_names (list): List of URL names.
-            """
-            if not url_names:
-                db.security_policy_urls_table.insert(self.uid, None, None, None)
-            else:
-                for url_name in url_names:
-                    object_uid = preloaded_data[gvars.url_object].get(url_name)
-                    group_uid = preloaded_data[gvars.url_group_object].get(url_name)
-                    category_uid = preloaded_data[gvars.url_category_object].get(url_name)
-                    db.security_policy_urls_table.insert(self.uid, object_uid, group_uid, category_uid)
-
-        def insert_l7_apps(app_names):
-            """
-            Insert Layer 7 application data into the db.
-
-            Args:
-                app_names (list): List of application names.
-            """
-            if not app_names:
-                db.security_policy_l7_apps_table.insert(self.uid, None, None, None)
-            else:
-                for app_name in app_names:
-                    app_uid = preloaded_data[gvars.l7_app_object].get(app_name)
-                    app_filter_uid = preloaded_data[gvars.l7_app_filter_object].get(app_name)
-                    app_group_uid = preloaded_data[gvars.l7_app_group_object].get(app_name)
-                    db.security_policy_l7_apps_table.insert(self.uid, app_uid, app_filter_uid, app_group_uid)
-
-        def insert_schedule(schedule_name):
-            """
-            Insert schedule data into the db.
-
-            Args:
-                schedule_name (list): List of schedule names.
-            """
-            if not schedule_name:
-                db.security_policy_schedule_table.insert(self.uid, None)
-            else:
-                schedule_uid = preloaded_data[gvars.schedule_object].get(schedule_name[0])
-                db.security_policy_schedule_table.insert(self.uid, schedule_uid)
-
-        # Insert source and destination zones
-        insert_zones(self.source_zones, 'source')
-        insert_zones(self.destination_zones, 'destination')
-
-        # Insert source and destination networks
-        insert_networks(self.source_networks, 'source')
-        insert_networks(self.destination_networks, 'destination')
-
-        # Insert source and destination ports
-        insert_ports(self.source_ports, 'source')
-        insert_ports(self.destination_ports, 'destination')
-
-        # Insert users
-        insert_users(self.users)
-
-        # Insert URLs
-        insert_urls(self.urls)
-
-        # Insert Layer 7 applications
-        insert_l7_apps(self.l7_policy_apps)
-
-        # Insert schedule
-        insert_schedule(self.schedule)
+            db (Database): The db instance holding the relationship tables.
+            name_index (TypedNameIndex): The index resolving the names of the referenced objects to uids.
+
+        Returns:
+            list: (table, rows) tuples.
+        """
+        return [
+            # Source and destination zones
+            (db.security_policy_zones_table, self.get_reference_rows(self.source_zones, self.zone_lookup_types, name_index, 'source')
+                                             + self.get_reference_rows(self.destination_zones, self.zone_lookup_types, name_index, 'destination')),
+            # Source and destination networks
+            (db.security_policy_networks_table, self.get_reference_rows(self.source_networks, self.network_lookup_types, name_index, 'source')
+                                                + self.get_reference_rows(self.destination_networks, self.network_lookup_types, name_index, 'destination')),
+            # Source and destination ports
+            (db.security_policy_ports_table, self.get_reference_rows(self.source_ports, self.port_lookup_types, name_index, 'source')
+                                             + self.get_reference_rows(self.destination_ports, self.port_lookup_types, name_index, 'destination')),
+            # Users
+            (db.security_policy_users_table, self.get_reference_rows(self.users, self.user_lookup_types, name_index)),
+            # URLs
+            (db.security_policy_urls_table, self.get_reference_rows(self.urls, self.url_lookup_types, name_index)),
+            # Layer 7 applications
+            (db.security_policy_l7_apps_table, self.get_reference_rows(self.l7_policy_apps, self.l7_app_lookup_types, name_index)),
+            # Schedule. Only the first schedule is kept
+            (db.security_policy_schedule_table, self.get_reference_rows(self.schedule[:1] if self.schedule else None, self.schedule_lookup_types, name_index)),
+        ]
 
 class NATPolicy(Policy):
+    # The types of the objects the referenced names are resolved to, in the order of the columns of the relationship tables
+    zone_lookup_types = (gvars.security_zone,)
+    network_lookup_types = (gvars.network_object, gvars.network_group_object)
+    port_lookup_types = (gvars.port_object, gvars.icmp_object, gvars.port_group_object)
+
     def __init__(self,
                 policy_container, 
                 name, 
@@ -870,92 +819,31 @@ class NATPolicy(Policy):
             self._target_device_uid,
         )
 
-    def create_relationships_in_db(self, db, preloaded_data):
+    def get_relationship_rows(self, db, name_index):
         """
-        Create relationships in the db for the NAT policy.
+        Build the relationship rows of the NAT policy.
 
         Args:
-            db (Database): The db instance to create relationships in.
-            preloaded_data (dict): Preloaded data for creating relationships.
-        """
-        def insert_zones(zone_names, flow):
-            """
-            Insert zone data into the db.
-
-            Args:
-                zone_names (list): List of zone names.
-                flow (str): Flow direction ('source' or 'destination').
-            """
-            if not zone_names:
-                db.nat_policy_zones_table.insert(self.uid, None, flow)
-            else:
-                for zone_name in zone_names:
-                    zone_uid = preloaded_data[gvars.security_zone].get(zone_name)
-                    db.nat_policy_zones_table.insert(self.uid, zone_uid, flow)
-
-        def insert_networks(network_names, flow, table_type):
-            """
-            Insert network data into the specified db table.
-
-            Args:
-                network_names (list): List of network names.
-                flow (str): Flow direction ('source' or 'destination').
-                table_type (str): Type of table ('original' or 'translated').
-            """
-            table_map = {
-                'original': db.nat_policy_original_networks_table,
-                'translated': db.nat_policy_translated_networks_table
-            }
-            target_table = table_map.get(table_type)
-
-            if not network_names:
-                target_table.insert(self.uid, None, None, flow)
-            else:
-                for network_name in network_names:
-                    object_uid = preloaded_data[gvars.network_object].get(network_name)
-                    group_uid = preloaded_data[gvars.network_group_object].get(network_name)
-                    target_table.insert(self.uid, object_uid, group_uid, flow)
-
-        def insert_ports(port_names, flow, table_type):
-            """
-            Insert port data into the specified db table.
-
-            Args:
-                port_names (list): List of port names.
-                flow (str): Flow direction ('source' or 'destination').
-                table_type (str): Type of table ('original' or 'translated').
-            """
-            table_map = {
-                'original': db.nat_policy_original_ports_table,
-                'translated': db.nat_policy_translated_ports_table
-            }
-            target_table = table_map.get(table_type)
-
-            if not port_names:
-                target_table.insert(self.uid, None, None, None, flow)
-            else:
-                for port_name in port_names:
-                    object_uid = preloaded_data[gvars.port_object].get(port_name)
-                    icmp_uid = preloaded_data[gvars.icmp_object].get(port_name)
-                    group_uid = preloaded_data[gvars.port_group_object].get(port_name)
-                    target_table.insert(self.uid, object_uid, icmp_uid, group_uid, flow)
-                    
-        # Insert source and destination zones
-        insert_zones(self.source_zones, 'source')
-        insert_zones(self.destination_zones, 'destination')
-
-        # Insert original source and destination networks
-        insert_networks(self.original_source, 'source', 'original')
-        insert_networks(self.original_destination, 'destination', 'original')
-
-        # Insert original source and destination ports
-        insert_ports(self.original_source_port, 'source', 'original')
-        insert_ports(self.original_destination_port, 'destination', 'original')
-
-        # Insert translated source and destination networks
-        insert_networks(self.translated_source, 'source', 'translated')
-        insert_networks(self.translated_destination, 'destination', 'translated')
-
-        # Insert translated source and destination ports
-        insert_ports(self.translated_source_port, 'source', 'translated')
-        insert_ports(self.translated_destination_port, 'destination', 'translated')
\ No newline at end of file
+            db (Database): The db instance holding the relationship tables.
+            name_index (TypedNameIndex): The index resolving the names of the referenced objects to uids.
+
+        Returns:
+            list: (table, rows) tuples.
+        """
+        return [
+            # Source and destination zones
+            (db.nat_policy_zones_table, self.get_reference_rows(self.source_zones, self.zone_lookup_types, name_index, 'source')
+                                        + self.get_reference_rows(self.destination_zones, self.zone_lookup_types, name_index, 'destination')),
+            # Original source and destination networks
+            (db.nat_policy_original_networks_table, self.get_reference_rows(self.original_source, self.network_lookup_types, name_index, 'source')
+                                                    + self.get_reference_rows(self.original_destination, self.network_lookup_types, name_index, 'destination')),
+            # Original source and destination ports
+            (db.nat_policy_original_ports_table, self.get_reference_rows(self.original_source_port, self.port_lookup_types, name_index, 'source')
+                                                 + self.get_reference_rows(self.original_destination_port, self.port_lookup_types, name_index, 'destination')),
+            # Translated source and destination networks
+            (db.nat_policy_translated_networks_table, self.get_reference_rows(self.translated_source, self.network_lookup_types, name_index, 'source')
+                                                      + self.get_reference_rows(self.translated_destination, self.network_lookup_types, name_index, 'destination')),
+            # Translated source and destination ports
+            (db.nat_policy_translated_ports_table, self.get_reference_rows(self.translated_source_port, self.port_lookup_types, name_index, 'source')
+                                                   + self.get_reference_rows(self.translated_destination_port, self.port_lookup_types, name_index, 'destination')),
+        ]
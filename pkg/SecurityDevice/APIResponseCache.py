@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import utils.helper as helper
+import utils.gvars as gvars
+
+general_logger = helper.logging.getLogger('general')
+
+class APIResponseCache:
+    """
+    On-disk snapshot of the raw responses returned by the API of a security device.
+
+    Every response is stored as compressed JSON, in a file named after the endpoint and, when relevant, the container
+    the data was retrieved for. Snapshots older than the TTL are fetched again. In offline mode, the responses are
+    replayed from the snapshot only and the API of the device is never called.
+
+    Attributes:
+        _snapshot_folder (str): The folder holding the snapshot of the device.
+        _ttl (int): The number of seconds a snapshot is valid for. 0 means it never expires.
+        _offline (bool): If True, the responses are only read from the snapshot.
+    """
+
+    def __init__(self, security_device_name, ttl=gvars.api_snapshot_ttl, offline=False, snapshot_root=gvars.api_snapshot_folder):
+        """
+        Initialize the APIResponseCache instance.
+
+        Args:
+            security_device_name (str): The name of the security device.
+            ttl (int): The number of seconds a snapshot is valid for. 0 means it never expires.
+            offline (bool): If True, the responses are only read from the snapshot.
+            snapshot_root (str): The folder holding the snapshots of all the devices.
+        """
+        self._snapshot_folder = os.path.join(snapshot_root, security_device_name)
+        self._ttl = ttl
+        self._offline = offline
+
+    @property
+    def offline(self):
+        """
+        Check if the responses are only replayed from the snapshot.
+
+        Returns:
+            bool: True if the API of the device is never called.
+        """
+        return self._offline
+
+    def invalidate(self):
+        """
+        Delete the whole snapshot of the device, so every response is fetched again.
+        """
+        if os.path.isdir(self._snapshot_folder):
+            shutil.rmtree(self._snapshot_folder)
+            general_logger.info(f"Deleted the API snapshot in <{self._snapshot_folder}>.")
+
+    def get_snapshot_path(self, endpoint, container_name=None):
+        """
+        Build the path of the file holding a response.
+
+        Args:
+            endpoint (str): The endpoint the response was returned by, for example gvars.network_object.
+            container_name (str, optional): The name of the container the response was retrieved for.
+
+        Returns:
+            str: The path of the snapshot file.
+        """
+        file_name = endpoint
+        if container_name is not None:
+            # Container names can hold any character, so they are made safe and a short hash keeps them unique
+            safe_container_name = re.sub(r'[^A-Za-z0-9_.-]', '_', container_name)
+            container_hash = hashlib.sha1(container_name.encode('utf-8')).hexdigest()[:8]
+            file_name = f"{endpoint}__{safe_container_name}_{container_hash}"
+        return os.path.join(self._snapshot_folder, f"{file_name}.json.gz")
+
+    def load(self, endpoint, container_name=None):
+        """
+        Read a response from the snapshot.
+
+        Args:
+            endpoint (str): The endpoint the response was returned by.
+            container_name (str, optional): The name of the container the response was retrieved for.
+
+        Returns:
+            tuple: (True, response) if a valid snapshot exists, (False, None) otherwise.
+        """
+        snapshot_path = self.get_snapshot_path(endpoint, container_name)
+        if not os.path.isfile(snapshot_path):
+            return False, None
+
+        try:
+            with gzip.open(snapshot_path, 'rt', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (OSError, ValueError) as err:
+            general_logger.warning(f"Could not read the API snapshot <{snapshot_path}>. Reason: <{err}>.")
+            return False, None
+
+        # Expired snapshots are still good enough when the API cannot be used
+        if self._ttl and not self._offline and time.time() - snapshot['created'] > self._ttl:
+            general_logger.info(f"The API snapshot <{snapshot_path}> expired.")
+            return False, None
+
+        return True, snapshot['data']
+
+    def store(self, endpoint, container_name, response):
+        """
+        Write a response to the snapshot.
+
+        Args:
+            endpoint (str): The endpoint the response was returned by.
+            container_name (str): The name of the container the response was retrieved for, or None.
+            response: The response. It must be serializable to JSON.
+        """
+        snapshot_path = self.get_snapshot_path(endpoint, container_name)
+        os.makedirs(self._snapshot_folder, exist_ok=True)
+
+        try:
+            snapshot = json.dumps({'created': time.time(), 'data': response})
+        except TypeError as err:
+            general_logger.warning(f"The response of endpoint <{endpoint}> cannot be stored in the API snapshot. Reason: <{err}>.")
+            return
+
+        # Write to a temporary file first, so an interrupted import never leaves a truncated snapshot behind
+        temporary_path = f"{snapshot_path}.tmp"
+        with gzip.open(temporary_path, 'wt', encoding='utf-8') as snapshot_file:
+            snapshot_file.write(snapshot)
+        os.replace(temporary_path, snapshot_path)
+
+    def get_or_fetch(self, endpoint, container_name, fetch_function):
+        """
+        Return a response from the snapshot, or fetch it from the device and add it to the snapshot.
+
+        Args:
+            endpoint (str): The endpoint the response is returned by.
+            container_name (str): The name of the container the response is retrieved for, or None.
+            fetch_function (Callable): Function that calls the API of the device.
+
+        Returns:
+            The response.
+
+        Raises:
+            SystemExit: If the response is missing from the snapshot in offline mode.
+        """
+        found, response = self.load(endpoint, container_name)
+        if found:
+            general_logger.debug(f"Replaying the response of endpoint <{endpoint}>, container <{container_name}> from the API snapshot.")
+            return response
+
+        if self._offline:
+            general_logger.critical(f"The response of endpoint <{endpoint}>, container <{container_name}> is missing from the API snapshot in <{self._snapshot_folder}>. It cannot be retrieved in offline mode.")
+            sys.exit(1)
+
+        response = fetch_function()
+        self.store(endpoint, container_name, response)
+        return response
@@ -0,0 +1,364 @@
+import codecs
+import json
+import xml.etree.ElementTree as ET
+import utils.helper as helper
+import utils.gvars as gvars
+
+general_logger = helper.logging.getLogger('general')
+
+class JSONValueStream:
+    """
+    Reads the JSON values of a file one after the other, without loading the whole file in memory.
+
+    The file is read in chunks. Only the text of the value being read is kept in memory. Arrays and objects can be
+    read item by item, so a single entry is decoded at a time, even when the whole file is a single JSON object.
+
+    Attributes:
+        _config_file (file): The file, opened in binary mode.
+        _text_decoder (IncrementalDecoder): Decodes the chunks, which can end in the middle of a character.
+        _buffer (str): The text read from the file and not consumed yet.
+        _buffer_offset (int): The position in the file of the first byte of the buffer.
+        _position (int): The position of the next character to read in the buffer.
+        _end_of_file (bool): True once the whole file was read.
+    """
+
+    json_decoder = json.JSONDecoder()
+
+    def __init__(self, config_file, offset=0):
+        """
+        Initialize the JSONValueStream instance.
+
+        Args:
+            config_file (file): The file, opened in binary mode.
+            offset (int): The position in the file where the stream starts.
+        """
+        config_file.seek(offset)
+        self._config_file = config_file
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._buffer_offset = offset
+        self._position = 0
+        self._end_of_file = False
+
+    @property
+    def offset(self):
+        """
+        Get the position of the next character to read in the file.
+
+        Returns:
+            int: The position, in bytes.
+        """
+        return self._buffer_offset + len(self._buffer[:self._position].encode('utf-8'))
+
+    def read_chunk(self):
+        """
+        Drop the text that was consumed and append the next chunk of the file to the buffer.
+
+        Returns:
+            bool: False if the end of the file was reached.
+        """
+        self._buffer_offset = self.offset
+        self._buffer = self._buffer[self._position:]
+        self._position = 0
+
+        chunk = self._config_file.read(gvars.config_file_chunk_size)
+        self._end_of_file = not chunk
+        self._buffer += self._text_decoder.decode(chunk, final=self._end_of_file)
+        return not self._end_of_file
+
+    def peek(self):
+        """
+        Skip the whitespace and return the next character, without consuming it.
+
+        Returns:
+            str: The next character, or None at the end of the file.
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in ' \t\r\n':
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self.read_chunk():
+                return None
+
+    def consume(self, character):
+        """
+        Consume the next character, which must be the expected one.
+
+        Args:
+            character (str): The expected character.
+
+        Raises:
+            ValueError: If the next character is a different one.
+        """
+        next_character = self.peek()
+        if next_character != character:
+            raise ValueError(f"Expected <{character}> at position <{self.offset}> of the config file, found <{next_character}>.")
+        self._position += 1
+
+    def read_value(self):
+        """
+        Read and decode the next JSON value.
+
+        Returns:
+            The decoded value.
+
+        Raises:
+            ValueError: If the value is invalid or the file ends before it does.
+        """
+        self.peek()
+        while True:
+            try:
+                value, value_end = self.json_decoder.raw_decode(self._buffer, self._position)
+                # A number ending the buffer can go on in the next chunk
+                if value_end < len(self._buffer) or self._end_of_file:
+                    self._position = value_end
+                    return value
+            except json.JSONDecodeError as err:
+                if self._end_of_file:
+                    raise ValueError(f"Invalid JSON value at position <{self.offset}> of the config file. Reason: <{err}>.")
+
+            # The value goes on in the next chunks
+            self.read_chunk()
+
+    def skip_value(self):
+        """
+        Move past the next JSON value. Arrays and objects are decoded item by item, so they are never held in memory.
+        """
+        match self.peek():
+            case '[':
+                for _ in self.iter_array():
+                    pass
+            case '{':
+                for _ in self.iter_object_keys():
+                    self.skip_value()
+            case _:
+                self.read_value()
+
+    def iter_array(self):
+        """
+        Read the items of the array starting at the current position, one at a time.
+
+        Yields:
+            The decoded items.
+        """
+        self.consume('[')
+        while True:
+            next_character = self.peek()
+            if next_character == ']':
+                self._position += 1
+                return
+            if next_character == ',':
+                self._position += 1
+                continue
+            yield self.read_value()
+
+    def iter_object_keys(self):
+        """
+        Read the keys of the object starting at the current position. The caller reads or skips the value of each key.
+
+        Yields:
+            str: The keys. When a key is yielded, the stream is positioned at the start of its value.
+        """
+        self.consume('{')
+        while True:
+            next_character = self.peek()
+            if next_character == '}':
+                self._position += 1
+                return
+            if next_character == ',':
+                self._position += 1
+                continue
+            key = self.read_value()
+            self.consume(':')
+            self.peek()
+            yield key
+
+class JSONConfigReader:
+    """
+    Streams the sections of a JSON config export.
+
+    The export is a JSON object. Its keys are the Pioneer data types, for example gvars.network_object, and their values
+    are lists holding the entries of that type, in the format returned by the API of the device. The values of the
+    policy types are objects holding the list of policies of each policy container. The file is indexed once, then each
+    section is read on its own, so only one entry is held in memory at a time.
+
+    Attributes:
+        _config_file_path (str): The path of the export.
+        _sections (dict): The positions of the sections in the file, keyed by (data type, container name).
+    """
+
+    # The data types whose sections hold the entries of each container
+    container_sections = (gvars.security_policy, gvars.nat_policy)
+
+    def __init__(self, config_file_path):
+        """
+        Initialize the JSONConfigReader instance.
+
+        Args:
+            config_file_path (str): The path of the export.
+        """
+        self._config_file_path = config_file_path
+        self._sections = None
+
+    def get_sections(self):
+        """
+        Index the sections of the export. The values are skipped one entry at a time, so they are never held in memory.
+
+        Returns:
+            dict: The positions of the sections in the file, keyed by (data type, container name). The container name
+                  is None for the sections that are not split by container.
+        """
+        if self._sections is not None:
+            return self._sections
+
+        sections = {}
+        with open(self._config_file_path, 'rb') as config_file:
+            stream = JSONValueStream(config_file)
+            for key in stream.iter_object_keys():
+                if key in self.container_sections and stream.peek() == '{':
+                    for container_name in stream.iter_object_keys():
+                        sections[(key, container_name)] = stream.offset
+                        stream.skip_value()
+                else:
+                    sections[(key, None)] = stream.offset
+                    stream.skip_value()
+
+        general_logger.info(f"Indexed <{len(sections)}> sections of the config file <{self._config_file_path}>.")
+        self._sections = sections
+        return sections
+
+    def read_value(self, data_type):
+        """
+        Read the whole value of a section. Only meant for small sections, for example the device version.
+
+        Args:
+            data_type (str): The key of the section.
+
+        Returns:
+            The decoded value, or None if the export does not have the section.
+        """
+        offset = self.get_sections().get((data_type, None))
+        if offset is None:
+            return None
+
+        with open(self._config_file_path, 'rb') as config_file:
+            return JSONValueStream(config_file, offset).read_value()
+
+    def iter_section(self, data_type, container_name=None):
+        """
+        Read the entries of a section one at a time.
+
+        Args:
+            data_type (str): The data type of the entries.
+            container_name (str, optional): The name of the container, for the sections split by container.
+
+        Yields:
+            dict: The entries.
+        """
+        offset = self.get_sections().get((data_type, container_name))
+        if offset is None:
+            general_logger.info(f"The config file does not hold any <{data_type}> data. Container: <{container_name}>.")
+            return
+
+        with open(self._config_file_path, 'rb') as config_file:
+            yield from JSONValueStream(config_file, offset).iter_array()
+
+class XMLConfigReader:
+    """
+    Streams the entries of an XML config export, for example a Panorama configuration.
+
+    The file is parsed incrementally. The elements outside of the requested entries are dropped as soon as they are
+    parsed, so the memory usage does not grow with the size of the export.
+
+    Attributes:
+        _config_file_path (str): The path of the export.
+    """
+
+    def __init__(self, config_file_path):
+        """
+        Initialize the XMLConfigReader instance.
+
+        Args:
+            config_file_path (str): The path of the export.
+        """
+        self._config_file_path = config_file_path
+
+    def get_root_attribute(self, attribute_name):
+        """
+        Get an attribute of the root element, without parsing the rest of the file.
+
+        Args:
+            attribute_name (str): The name of the attribute.
+
+        Returns:
+            str: The value of the attribute, or None if the root element does not have it.
+        """
+        with open(self._config_file_path, 'rb') as config_file:
+            for event, element in ET.iterparse(config_file, events=('start',)):
+                return element.get(attribute_name)
+
+    def iter_entry_attributes(self, entry_path):
+        """
+        Read the attributes of the elements found at the specified path, one at a time.
+
+        The elements are dropped as soon as they are parsed, so it is the cheapest way of listing large elements by name.
+
+        Args:
+            entry_path (tuple): The path of the elements, as a tuple of tag names starting with the root tag.
+
+        Yields:
+            dict: The attributes of each element.
+        """
+        current_path = []
+        # The elements being parsed, from the root down. Each element is removed from its parent once it is parsed.
+        open_elements = []
+        with open(self._config_file_path, 'rb') as config_file:
+            for event, element in ET.iterparse(config_file, events=('start', 'end')):
+                if event == 'start':
+                    current_path.append(element.tag)
+                    open_elements.append(element)
+                    if tuple(current_path) == entry_path:
+                        yield dict(element.attrib)
+                    continue
+
+                current_path.pop()
+                open_elements.pop()
+                element.clear()
+                if open_elements:
+                    open_elements[-1].remove(element)
+
+    def iter_entries(self, *entry_paths):
+        """
+        Read the elements found at the specified paths, one at a time.
+
+        Args:
+            *entry_paths (tuple): The paths of the elements, as tuples of tag names starting with the root tag.
+
+        Yields:
+            tuple: (path, element) pairs. The element is cleared and removed from its parent once the caller moves to
+                   the next one, so the parsed tree never grows beyond the element being read.
+        """
+        current_path = []
+        # The elements being parsed, from the root down
+        open_elements = []
+        with open(self._config_file_path, 'rb') as config_file:
+            for event, element in ET.iterparse(config_file, events=('start', 'end')):
+                if event == 'start':
+                    current_path.append(element.tag)
+                    open_elements.append(element)
+                    continue
+
+                element_path = tuple(current_path)
+                current_path.pop()
+                open_elements.pop()
+
+                if element_path in entry_paths:
+                    yield element_path, element
+                # The children of a requested element are kept until the element itself is read
+                elif any(element_path[:len(entry_path)] == entry_path for entry_path in entry_paths):
+                    continue
+
+                element.clear()
+                if open_elements:
+                    open_elements[-1].remove(element)
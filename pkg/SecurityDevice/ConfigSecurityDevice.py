@@ -0,0 +1,172 @@
+import itertools
+from pkg.SecurityDevice.FMCSecurityDevice import FMCSecurityDevice
+from pkg.SecurityDevice.PANMCSecurityDevice import PANMCSecurityDevice
+from pkg.SecurityDevice.ConfigFileReader import JSONConfigReader, XMLConfigReader
+from pkg.SecurityDevice.ImportScheduler import APIRateLimiter
+import utils.helper as helper
+import utils.gvars as gvars
+
+general_logger = helper.logging.getLogger('general')
+
+class FMCConfigSecurityDevice(FMCSecurityDevice):
+    """
+    Represents a Firepower Management Center whose data is read from a JSON export instead of its API.
+
+    The entries of the export are in the same format as the ones returned by the API, so they are processed by the
+    same methods as the ones of an FMC API device. See JSONConfigReader for the layout of the export.
+
+    Attributes:
+        _config_reader (JSONConfigReader): Streams the sections of the export.
+    """
+
+    def __init__(self, uid, name, security_device_database, config_file_path):
+        """
+        Initialize the FMCConfigSecurityDevice instance.
+
+        Args:
+            uid (str): The unique identifier for the security device.
+            name (str): The name of the security device.
+            security_device_database (SecurityDeviceDatabase): The database for the security device.
+            config_file_path (str): The path of the JSON export.
+        """
+        super().__init__(uid, name, security_device_database, None)
+        self._config_reader = JSONConfigReader(config_file_path)
+        # Reading the export is not limited, the limiter only keeps the ImportScheduler from limiting it either
+        self._api_rate_limiter = APIRateLimiter(0)
+
+    def get_device_version(self):
+        """
+        Retrieve the version of the FMC the export was taken from.
+
+        Returns:
+            str: The version of the FMC.
+        """
+        return self._config_reader.read_value('device_version') or gvars.config_device_default_version
+
+    # returning container info methods
+    def return_security_policy_container_info(self):
+        return list(self._config_reader.iter_section(gvars.security_policy_container))
+
+    def return_nat_policy_container_info(self):
+        return list(self._config_reader.iter_section(gvars.nat_policy_container))
+
+    # returning objects info methods
+    def return_managed_device_info(self):
+        return self._config_reader.iter_section(gvars.managed_device)
+
+    def return_network_object_info(self):
+        return self._config_reader.iter_section(gvars.network_object)
+
+    def return_network_group_object_info(self):
+        return self._config_reader.iter_section(gvars.network_group_object)
+
+    def return_port_object_info(self):
+        return self._config_reader.iter_section(gvars.port_object)
+
+    def return_port_group_object_info(self):
+        return self._config_reader.iter_section(gvars.port_group_object)
+
+    def return_url_object_info(self):
+        return self._config_reader.iter_section(gvars.url_object)
+
+    def return_url_group_object_info(self):
+        return self._config_reader.iter_section(gvars.url_group_object)
+
+    def return_security_zone_info(self):
+        return self._config_reader.iter_section(gvars.security_zone)
+
+    def return_schedule_object_info(self):
+        return self._config_reader.iter_section(gvars.schedule_object)
+
+    def return_security_policy_info(self, security_policy_container):
+        return self._config_reader.iter_section(gvars.security_policy, security_policy_container.name)
+
+    def return_nat_policy_info(self, nat_policy_container):
+        return self._config_reader.iter_section(gvars.nat_policy, nat_policy_container.name)
+
+    # paging through objects methods
+    def return_object_info_pages(self, object_type, object_container):
+        """
+        Read the entries of the specified type from the export, one page at a time.
+
+        Args:
+            object_type (str): The type of the objects.
+            object_container: The container of the objects. It is only used by the policy object types.
+
+        Yields:
+            list: The entries of a page.
+        """
+        entries = iter(self.fetch_object_info(object_type, object_container) or [])
+        while True:
+            page = list(itertools.islice(entries, gvars.import_page_size))
+            if not page:
+                return
+            yield page
+
+class PANMCConfigSecurityDevice(PANMCSecurityDevice):
+    """
+    Represents a Panorama Management Center whose data is read from an XML export of its configuration.
+
+    The same data as for a PANMC API device is imported: the device groups, the templates and their security zones.
+
+    Attributes:
+        _config_reader (XMLConfigReader): Streams the entries of the export.
+    """
+
+    # The paths of the entries in the Panorama configuration
+    device_group_path = ('config', 'devices', 'entry', 'device-group', 'entry')
+    device_group_hierarchy_path = ('config', 'readonly', 'devices', 'entry', 'device-group', 'entry')
+    template_path = ('config', 'devices', 'entry', 'template', 'entry')
+    zone_path = template_path + ('config', 'devices', 'entry', 'vsys', 'entry', 'zone', 'entry')
+
+    def __init__(self, uid, name, security_device_database, config_file_path):
+        """
+        Initialize the PANMCConfigSecurityDevice instance.
+
+        Args:
+            uid (str): The unique identifier for the security device.
+            name (str): The name of the security device.
+            security_device_database (SecurityDeviceDatabase): The database for the security device.
+            config_file_path (str): The path of the XML export.
+        """
+        super().__init__(uid, name, security_device_database, None)
+        self._config_reader = XMLConfigReader(config_file_path)
+
+    def get_device_version(self):
+        """
+        Retrieve the version of the Panorama the export was taken from.
+
+        Returns:
+            str: The version of the Panorama.
+        """
+        return self._config_reader.get_root_attribute('version') or gvars.config_device_default_version
+
+    def return_device_group_info(self):
+        """
+        Read the device groups and their parents from the export.
+
+        Returns:
+            list: Dictionaries holding the name and the parent of each device group. Top level device groups have no parent.
+        """
+        # The hierarchy of the device groups is stored apart from their configuration
+        device_group_parents = {entry.get('name'): entry.findtext('parent-dg') for entry_path, entry in self._config_reader.iter_entries(self.device_group_hierarchy_path)}
+
+        return [{"name": attributes.get('name'), "parent": device_group_parents.get(attributes.get('name'))} for attributes in self._config_reader.iter_entry_attributes(self.device_group_path)]
+
+    def return_template_info(self):
+        """
+        Read the templates from the export.
+
+        Returns:
+            list: Dictionaries holding the name of each template.
+        """
+        return [{'name': attributes.get('name'), 'parent': None} for attributes in self._config_reader.iter_entry_attributes(self.template_path)]
+
+    def return_security_zone_info(self):
+        """
+        Read the security zones of all the templates from the export.
+
+        Returns:
+            iterator: Dictionaries holding the name of each security zone.
+        """
+        return ({'name': attributes.get('name')} for attributes in self._config_reader.iter_entry_attributes(self.zone_path))
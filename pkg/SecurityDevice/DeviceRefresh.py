@@ -0,0 +1,306 @@
+import psycopg2
+import utils.helper as helper
+import utils.gvars as gvars
+
+general_logger = helper.logging.getLogger('general')
+
+class DeviceRefresh:
+    """
+    Tracks the changes made to the db of an existing security device while it is imported again.
+
+    Every refreshed object has the hash of the data it was created from stored in the row content hashes table.
+    The hashes are only computed by the refreshes, so the first refresh of a device writes all of its objects again.
+    When the device is refreshed, an object keeps the uid of the existing object with the same name in the same
+    container, so the rows referencing it stay valid. The object is only written again if its hash changed, and the
+    relationships of the groups and policies that changed are recreated. The objects that are no longer returned by
+    the device are deleted at the end.
+
+    Attributes:
+        _db (SecurityDeviceDatabase): The db of the security device.
+        _stored_hashes (dict): The hashes stored by the previous import, keyed by (object type, uid).
+        _existing_uids (dict): The uids of the existing objects, keyed by (object type, container uid) and then by name.
+        _untracked_objects (set): The (object type, uid) pairs of the objects existing before the first refresh, which
+                                  have no stored hash.
+        _seen_objects (set): The (object type, uid) pairs returned by the device during the refresh.
+    """
+
+    # The object types, in the order they are imported. Stale objects are deleted in the reverse order,
+    # so the rows referencing an object are deleted before it.
+    import_order = [
+        gvars.object_containers,
+        gvars.security_zone_container,
+        gvars.managed_device_container,
+        gvars.security_policy_container,
+        gvars.nat_policy_container,
+        gvars.network_object,
+        gvars.network_group_object,
+        gvars.port_object,
+        gvars.port_group_object,
+        gvars.url_object,
+        gvars.url_group_object,
+        gvars.schedule_object,
+        gvars.security_zone,
+        gvars.managed_device,
+        gvars.security_policy,
+        gvars.nat_policy
+    ]
+
+    # The types of the containers. They are not deleted by the first refresh, see load_untracked_objects().
+    container_types = [
+        gvars.object_containers,
+        gvars.security_zone_container,
+        gvars.managed_device_container,
+        gvars.security_policy_container,
+        gvars.nat_policy_container
+    ]
+
+    def __init__(self, db):
+        """
+        Initialize the DeviceRefresh instance and load the hashes stored by the previous refresh.
+
+        Args:
+            db (SecurityDeviceDatabase): The db of the security device.
+        """
+        self._db = db
+        self._stored_hashes = {(object_type, uid): content_hash for object_type, uid, content_hash in db.row_content_hashes_table.get(['object_type', 'uid', 'content_hash'])}
+        self._existing_uids = {}
+        self._untracked_objects = set() if self._stored_hashes else self.load_untracked_objects()
+        self._seen_objects = set()
+        self._inserted_count = 0
+        self._updated_count = 0
+        self._unchanged_count = 0
+        self._deleted_count = 0
+        general_logger.info(f"Loaded <{len(self._stored_hashes)}> content hashes stored by the previous refresh.")
+
+    def load_untracked_objects(self):
+        """
+        Get the objects written by the import of the device, before its first refresh.
+
+        Returns:
+            set: The (object type, uid) pairs of the objects. The containers are left out.
+        """
+        untracked_objects = set()
+        for object_type in self.import_order:
+            if object_type in self.container_types:
+                continue
+            for table, container_column in self.get_object_tables(object_type):
+                untracked_objects.update((object_type, uid) for uid, in table.get(['uid']))
+
+        general_logger.info(f"First refresh of the device. Found <{len(untracked_objects)}> objects written by its import.")
+        return untracked_objects
+
+    def get_object_tables(self, object_type):
+        """
+        Get the tables holding the objects of the specified type.
+
+        Args:
+            object_type (str): The type of the objects, for example gvars.network_object.
+
+        Returns:
+            list: (table, container column) tuples. The container column references the container of the rows.
+
+        Raises:
+            ValueError: If the object type is unknown.
+        """
+        match object_type:
+            case gvars.object_containers:
+                return [(self._db.object_containers_table, 'security_device_uid')]
+            case gvars.security_zone_container:
+                return [(self._db.zone_containers_table, 'security_device_uid')]
+            case gvars.managed_device_container:
+                return [(self._db.managed_device_containers_table, 'security_device_uid')]
+            case gvars.security_policy_container:
+                return [(self._db.security_policy_containers_table, 'security_device_uid')]
+            case gvars.nat_policy_container:
+                return [(self._db.nat_policy_containers_table, 'security_device_uid')]
+            case gvars.security_zone:
+                return [(self._db.security_zones_table, 'zone_container_uid')]
+            case gvars.managed_device:
+                return [(self._db.managed_devices_table, 'managed_device_container_uid')]
+            case gvars.network_object:
+                return [(self._db.network_address_objects_table, 'object_container_uid')]
+            case gvars.network_group_object:
+                return [(self._db.network_group_objects_table, 'object_container_uid')]
+            case gvars.port_object:
+                # The ICMP objects are returned together with the port objects
+                return [(self._db.port_objects_table, 'object_container_uid'), (self._db.icmp_objects_table, 'object_container_uid')]
+            case gvars.port_group_object:
+                return [(self._db.port_group_objects_table, 'object_container_uid')]
+            case gvars.url_object:
+                return [(self._db.url_objects_table, 'object_container_uid')]
+            case gvars.url_group_object:
+                return [(self._db.url_group_objects_table, 'object_container_uid')]
+            case gvars.schedule_object:
+                return [(self._db.schedule_objects_table, 'object_container_uid')]
+            case gvars.geolocation_object:
+                return [(self._db.geolocation_objects_table, 'object_container_uid')]
+            case gvars.country_object:
+                return [(self._db.country_objects_table, 'object_container_uid')]
+            case gvars.security_policy:
+                return [(self._db.security_policies_table, 'security_policy_container_uid')]
+            case gvars.nat_policy:
+                return [(self._db.nat_policies_table, 'nat_policy_container_uid')]
+            case _:
+                raise ValueError(f"Unknown object type: {object_type}")
+
+    def get_relationship_tables(self, object_type):
+        """
+        Get the tables holding the relationships of the objects of the specified type.
+
+        Args:
+            object_type (str): The type of the objects.
+
+        Returns:
+            list: (table, column) tuples. The column references the uid of the object.
+        """
+        match object_type:
+            case gvars.network_group_object:
+                return [(self._db.network_group_objects_members_table, 'group_uid')]
+            case gvars.port_group_object:
+                return [(self._db.port_group_objects_members_table, 'group_uid')]
+            case gvars.url_group_object:
+                return [(self._db.url_group_objects_members_table, 'group_uid')]
+            case gvars.security_policy:
+                return [(table, 'security_policy_uid') for table in [
+                    self._db.security_policy_zones_table,
+                    self._db.security_policy_networks_table,
+                    self._db.security_policy_ports_table,
+                    self._db.security_policy_users_table,
+                    self._db.security_policy_urls_table,
+                    self._db.security_policy_l7_apps_table,
+                    self._db.security_policy_schedule_table
+                ]]
+            case gvars.nat_policy:
+                return [(table, 'nat_policy_uid') for table in [
+                    self._db.nat_policy_zones_table,
+                    self._db.nat_policy_original_networks_table,
+                    self._db.nat_policy_original_ports_table,
+                    self._db.nat_policy_translated_networks_table,
+                    self._db.nat_policy_translated_ports_table
+                ]]
+            case _:
+                return []
+
+    def get_existing_uids(self, object_type, container_uid):
+        """
+        Get the uids of the objects of the specified type that already exist in a container.
+
+        Args:
+            object_type (str): The type of the objects.
+            container_uid (str): The uid of the container.
+
+        Returns:
+            dict: The uids of the objects, keyed by their names.
+        """
+        cache_key = (object_type, container_uid)
+        if cache_key not in self._existing_uids:
+            existing_uids = {}
+            for table, container_column in self.get_object_tables(object_type):
+                existing_uids.update(table.get(['name', 'uid'], container_column, container_uid))
+            self._existing_uids[cache_key] = existing_uids
+        return self._existing_uids[cache_key]
+
+    def clear_relationships(self, object_type, uid):
+        """
+        Delete the relationships of an object, so they can be recreated from its new data.
+
+        Args:
+            object_type (str): The type of the object.
+            uid (str): The uid of the object.
+        """
+        for table, column in self.get_relationship_tables(object_type):
+            table.delete(column, uid)
+
+    def prepare(self, object_type, py_object, container_uid, content_hash):
+        """
+        Match an object returned by the device with the existing one and check if it changed.
+
+        If the object already exists, it takes the uid of the existing object. If its data changed, its relationships
+        are deleted and its new hash is stored.
+
+        Args:
+            object_type (str): The type of the object.
+            py_object: The object created from the data returned by the device.
+            container_uid (str): The uid of the container of the object.
+            content_hash (str): The hash of the data the object was created from.
+
+        Returns:
+            bool: True if the object is new or changed, and must be saved to the db.
+        """
+        existing_uid = self.get_existing_uids(object_type, container_uid).get(py_object.name)
+
+        if existing_uid is None:
+            self._inserted_count += 1
+        else:
+            # Keep the uid of the existing object, so the rows referencing it stay valid
+            py_object.uid = existing_uid
+            self._seen_objects.add((object_type, existing_uid))
+
+            if self._stored_hashes.get((object_type, existing_uid)) == content_hash:
+                self._unchanged_count += 1
+                return False
+
+            self._updated_count += 1
+            self.clear_relationships(object_type, existing_uid)
+
+        self._seen_objects.add((object_type, py_object.uid))
+        self._db.row_content_hashes_table.insert(object_type, py_object.uid, content_hash)
+        return True
+
+    def reuse_converted_literal(self, object_type, py_object, container_uid):
+        """
+        Match an object converted from a literal with the one converted by the previous import.
+
+        The name of a converted object is built from the value of the literal, so an existing object with the same
+        name in the same container holds the same value. The object takes its uid and does not need to be saved again.
+
+        Args:
+            object_type (str): The type of the converted object.
+            py_object: The converted object.
+            container_uid (str): The uid of the container of the object.
+
+        Returns:
+            bool: True if the object is new and must be saved to the db.
+        """
+        existing_uid = self.get_existing_uids(object_type, container_uid).get(py_object.name)
+        if existing_uid is None:
+            return True
+
+        py_object.uid = existing_uid
+        self._seen_objects.add((object_type, existing_uid))
+        return False
+
+    def delete_stale_rows(self):
+        """
+        Delete the objects imported previously that were not returned by the device during the refresh.
+
+        Only the objects with a stored hash are considered, and on the first refresh the objects written by the import.
+        The objects converted from literal values are matched with the existing ones by reuse_converted_literal(), so
+        they are kept while they are still used. If an object is still referenced by other rows, it is kept and a
+        warning is logged.
+        """
+        tracked_objects = set(self._stored_hashes) | self._untracked_objects
+        stale_objects = [key for key in tracked_objects if key not in self._seen_objects]
+        general_logger.info(f"Found <{len(stale_objects)}> objects that are no longer returned by the device.")
+
+        # Delete the policies first and the containers last
+        stale_objects.sort(key=lambda key: self.import_order.index(key[0]) if key[0] in self.import_order else -1, reverse=True)
+
+        for object_type, uid in stale_objects:
+            try:
+                # Delete the object together with its relationships and its hash, or keep all of them
+                with self._db.savepoint():
+                    self.clear_relationships(object_type, uid)
+                    for table, container_column in self.get_object_tables(object_type):
+                        table.delete('uid', uid)
+                    self._db.row_content_hashes_table.delete(['object_type', 'uid'], [object_type, uid], multiple_where=True)
+                self._deleted_count += 1
+
+            except psycopg2.Error as err:
+                general_logger.warning(f"Could not delete the stale <{object_type}> object <{uid}>. It is still referenced by other rows. Reason: <{err}>.")
+
+    def log_summary(self):
+        """
+        Log the number of objects inserted, updated, left unchanged and deleted by the refresh.
+        """
+        general_logger.info(f"Refresh finished. Inserted: <{self._inserted_count}>, updated: <{self._updated_count}>, unchanged: <{self._unchanged_count}>, deleted: <{self._deleted_count}>.")
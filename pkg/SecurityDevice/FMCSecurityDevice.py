@@ -1,10 +1,14 @@
 from abc import abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from pkg.Container.FMCContainer import FMCSecurityPolicyContainer, FMCObjectContainer, FMCZoneContainer, FMCManagedDeviceContainer, FMCNATPolicyContainer
 from pkg.DeviceObject.FMCDeviceObject import FMCNetworkGroupObject, FMCNetworkObject, \
-FMCPortObject, FMCICMPObject, FMCPortGroupObject, FMCGeolocationObject, FMCURLObject, FMCURLGroupObject, FMCScheduleObject
+FMCPortObject, FMCICMPObject, FMCPortGroupObject, FMCGeolocationObject, FMCURLObject, FMCURLGroupObject, FMCScheduleObject, FMCObjectWithLiterals
 from pkg.Policy.FMCPolicy import FMCSecurityPolicy, FMCNATPolicy
 from pkg.SecurityZone.FMCSecurityZone import FMCSecurityZone
 from pkg.SecurityDevice import SecurityDevice 
+from pkg.SecurityDevice.ImportScheduler import APIRateLimiter
 from pkg.ManagedDevice.FMCManagedDevice import FMCManagedDevice
 
 import utils.helper as helper
@@ -24,6 +28,10 @@ class FMCSecurityDevice(SecurityDevice):
 
     Attributes:
         _security_device_connection (SecurityDeviceConnection): The connection to the FMC device.
+        _api_rate_limiter (APIRateLimiter): Keeps the API calls under the documented rate limit of the FMC.
+        _api_connection_slots (BoundedSemaphore): Keeps the number of simultaneous API calls under the documented limit of the FMC.
+        _max_api_connections (int): The number of simultaneous API calls the ImportScheduler may run.
+        _container_uuids (dict): The uuids of the policy containers, keyed by the container path and then by their names.
     """
 
     def __init__(self, uid, name, security_device_database, security_device_connection):
@@ -38,6 +46,38 @@ class FMCSecurityDevice(SecurityDevice):
         """
         super().__init__(uid, name, security_device_database, security_device_connection)
         self._security_device_connection = security_device_connection
+        # The objects converted from literals are only reused within the import of a single device
+        FMCObjectWithLiterals.clear_converted_literals()
+        # Every API call takes a token, so the pages retrieved in parallel stay under the rate limit of the FMC
+        self._api_rate_limiter = APIRateLimiter(gvars.fmc_api_requests_per_minute, gvars.fmc_api_max_connections)
+        self._api_connection_slots = threading.BoundedSemaphore(gvars.fmc_api_max_connections)
+        self._max_api_connections = gvars.fmc_api_max_connections
+        self._container_uuids = {}
+
+        # fireREST retries the calls rejected with HTTP 429 by itself. The hook pauses the other calls in the meantime.
+        if security_device_connection is not None:
+            security_device_connection.conn.session.hooks['response'].append(self.handle_api_response)
+
+    def handle_api_response(self, response, *args, **kwargs):
+        """
+        Pause the API calls if the FMC answered that its rate limit was exceeded.
+
+        The method is registered as a response hook of the session of the connection to the FMC.
+
+        Args:
+            response (requests.Response): The response returned by the FMC.
+        """
+        if response.status_code != 429:
+            return
+
+        # Follow the delay requested by the FMC, if any
+        try:
+            delay = float(response.headers.get('Retry-After', gvars.fmc_api_backoff_delay))
+        except ValueError:
+            delay = gvars.fmc_api_backoff_delay
+
+        general_logger.warning(f"The FMC API rate limit was exceeded. Pausing the API calls for <{delay}> seconds.")
+        self._api_rate_limiter.backoff(delay)
 
     # returning container info methods
     def return_security_policy_container_info(self):
@@ -211,15 +251,8 @@ class FMCSecurityDevice(SecurityDevice):
         Returns:
             list: List of dictionaries containing information about security policies.
         """
-        # Execute the request to retrieve information about the security policies
-        security_policies_info = self._security_device_connection.policy.accesspolicy.accessrule.get(container_name=security_policy_container.name)
-        
-        # Filter out the security policies which are not part of the current container being processed
-        filtered_data_gen = (entry for entry in security_policies_info if entry['metadata']['accessPolicy']['name'] == security_policy_container.name)
-
-        # Convert generator to a list if needed
-        filtered_data = list(filtered_data_gen)
-        return filtered_data
+        # The rules are requested from the access policy itself, so the FMC only returns the rules of the container
+        return [entry for page in self.return_object_info_pages(gvars.security_policy, security_policy_container) for entry in page]
 
     def return_nat_policy_info(self, nat_policy_container):
         """
@@ -231,8 +264,138 @@ class FMCSecurityDevice(SecurityDevice):
         Returns:
             list: List of dictionaries containing information about NAT policies.
         """
-        # Execute the request to retrieve information about the NAT policies
-        return self._device_connection.policy.ftdnatpolicy.natrule.get(container_name=nat_policy_container.name)
+        # The rules are requested from the NAT policy itself, so the FMC only returns the rules of the container
+        return [entry for page in self.return_object_info_pages(gvars.nat_policy, nat_policy_container) for entry in page]
+
+    # paging through objects methods
+    def request_api_page(self, connection, url, params):
+        """
+        Retrieve a single page of an FMC collection, within the rate and connection limits of the FMC.
+
+        Args:
+            connection (fireREST.Connection): The connection to the FMC.
+            url (str): The url of the collection.
+            params (dict): The paging parameters of the request.
+
+        Returns:
+            dict: The payload of the page.
+        """
+        self._api_rate_limiter.wait()
+        with self._api_connection_slots:
+            return connection._request('get', url, params=params).json()
+
+    def return_api_pages(self, resource, container_uuid=None):
+        """
+        Retrieve the items of an FMC collection one page at a time.
+
+        The first page tells how many items the collection holds. The other pages are then requested by offset in a
+        bounded thread pool, and they are yielded in order as soon as they are available.
+
+        Args:
+            resource (fireREST.fmc.Resource): The resource of the collection, for example fmc.object.networkaddress.
+            container_uuid (str, optional): The uuid of the container of the collection, for child resources.
+
+        Yields:
+            list: The items of a page.
+        """
+        connection = resource.conn
+        url = resource.url(resource.PATH.format(container_uuid=container_uuid, uuid=None))
+        page_size = gvars.import_page_size
+
+        first_page = self.request_api_page(connection, url, {'offset': 0, 'limit': page_size, 'expanded': True})
+        yield first_page.get('items', [])
+
+        remaining_offsets = iter(range(page_size, first_page.get('paging', {}).get('count', 0), page_size))
+        executor = ThreadPoolExecutor(max_workers=max(1, gvars.fmc_api_page_threads), thread_name_prefix='pioneer_fmc_pages')
+        pending_pages = deque()
+        try:
+            # Only a few pages are requested in advance, so the memory usage stays bounded
+            for offset in remaining_offsets:
+                pending_pages.append(executor.submit(self.request_api_page, connection, url, {'offset': offset, 'limit': page_size, 'expanded': True}))
+                if len(pending_pages) >= gvars.fmc_api_page_threads:
+                    break
+
+            while pending_pages:
+                page = pending_pages.popleft().result()
+                offset = next(remaining_offsets, None)
+                if offset is not None:
+                    pending_pages.append(executor.submit(self.request_api_page, connection, url, {'offset': offset, 'limit': page_size, 'expanded': True}))
+                yield page.get('items', [])
+
+        finally:
+            # Stop requesting pages if the caller did not consume all of them
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def return_container_uuid(self, resource, container_name):
+        """
+        Find the uuid of the container of a child resource by its name.
+
+        Args:
+            resource (fireREST.fmc.ChildResource): The child resource, for example fmc.policy.accesspolicy.accessrule.
+            container_name (str): The name of the container.
+
+        Returns:
+            str: The uuid of the container.
+
+        Raises:
+            ValueError: If the container does not exist.
+        """
+        # The containers are only listed once per container type
+        if resource.CONTAINER_PATH not in self._container_uuids:
+            containers_url = resource.url(resource.CONTAINER_PATH.format(uuid=None))
+            self._api_rate_limiter.wait()
+            with self._api_connection_slots:
+                container_entries = resource.conn.get(containers_url)
+            self._container_uuids[resource.CONTAINER_PATH] = {container_entry['name']: container_entry['id'] for container_entry in container_entries}
+
+        container_uuid = self._container_uuids[resource.CONTAINER_PATH].get(container_name)
+        if container_uuid is None:
+            raise ValueError(f"Container <{container_name}> does not exist on the device.")
+        return container_uuid
+
+    def return_object_info_pages(self, object_type, object_container):
+        """
+        Retrieve information about the objects of the specified type one page at a time.
+
+        Args:
+            object_type (str): The type of the objects.
+            object_container: The container of the objects. It is only used by the policy object types.
+
+        Yields:
+            list: Information about the objects of a page.
+        """
+        container_uuid = None
+        match object_type:
+            case gvars.security_zone:
+                resource = self._security_device_connection.object.securityzone
+            case gvars.managed_device:
+                resource = self._security_device_connection.device.devicerecord
+            case gvars.network_object:
+                resource = self._security_device_connection.object.networkaddress
+            case gvars.network_group_object:
+                resource = self._security_device_connection.object.networkgroup
+            case gvars.port_object:
+                resource = self._security_device_connection.object.port
+            case gvars.port_group_object:
+                resource = self._security_device_connection.object.portobjectgroup
+            case gvars.url_object:
+                resource = self._security_device_connection.object.url
+            case gvars.url_group_object:
+                resource = self._security_device_connection.object.urlgroup
+            case gvars.schedule_object:
+                resource = self._security_device_connection.object.timerange
+            case gvars.security_policy:
+                resource = self._security_device_connection.policy.accesspolicy.accessrule
+                container_uuid = self.return_container_uuid(resource, object_container.name)
+            case gvars.nat_policy:
+                resource = self._security_device_connection.policy.ftdnatpolicy.natrule
+                container_uuid = self.return_container_uuid(resource, object_container.name)
+            case _:
+                yield from super().return_object_info_pages(object_type, object_container)
+                return
+
+        # The rules of a policy are requested from the policy itself, so the FMC already filters them by container
+        yield from self.return_api_pages(resource, container_uuid)
 
     # returning objects methods
     def return_managed_device(self, managed_device_container, managed_device_entry):
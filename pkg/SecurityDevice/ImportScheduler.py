@@ -0,0 +1,306 @@
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+import time
+import utils.helper as helper
+import utils.gvars as gvars
+
+general_logger = helper.logging.getLogger('general')
+
+class APIRateLimiter:
+    """
+    Token bucket keeping the calls made to the API of a security device under its rate limit.
+
+    The bucket holds up to burst_size tokens and is refilled at the allowed rate. Every call takes a token and waits
+    for the refill when the bucket is empty. When the device answers that the limit was exceeded anyway, all the calls
+    are paused with backoff(). The limiter is shared by all the threads of an import.
+    """
+
+    def __init__(self, requests_per_minute, burst_size=1):
+        """
+        Initialize the APIRateLimiter instance.
+
+        Args:
+            requests_per_minute (int): The maximum number of calls started per minute. 0 disables the limiter.
+            burst_size (int): The maximum number of calls started at once when the bucket is full.
+        """
+        self._rate = requests_per_minute / 60
+        self._capacity = max(1, burst_size)
+        self._tokens = self._capacity
+        self._last_refill_time = time.monotonic()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Block until the next call is allowed to start.
+        """
+        # Reserve a token while holding the lock, then sleep outside of it
+        with self._lock:
+            now = time.monotonic()
+            call_time = max(now, self._paused_until)
+
+            if self._rate:
+                # The bucket is not refilled while the calls are paused
+                self._tokens = min(self._capacity, self._tokens + max(0, now - self._last_refill_time) * self._rate)
+                self._last_refill_time = max(now, self._last_refill_time)
+                # A negative number of tokens is the number of calls already waiting for the refill
+                self._tokens -= 1
+                if self._tokens < 0:
+                    call_time = max(call_time, self._last_refill_time - self._tokens / self._rate)
+
+        if call_time > now:
+            time.sleep(call_time - now)
+
+    def backoff(self, delay):
+        """
+        Pause all the calls, because the device answered that its rate limit was exceeded.
+
+        Args:
+            delay (float): The number of seconds the calls are paused for.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + delay)
+            # The calls start again slowly once the pause is over
+            self._tokens = min(self._tokens, 0)
+            self._last_refill_time = max(self._last_refill_time, self._paused_until)
+
+class PageStream:
+    """
+    Iterates over the entries of a paginated collection, while the next pages are retrieved in the background.
+
+    A single thread retrieves the pages and hands them over through a bounded queue, so at most a few pages are held
+    in memory at any time and the caller writes the entries of a page to the db while the next one is downloaded.
+    """
+
+    def __init__(self, fetch_pages, rate_limiter, max_pending_pages=gvars.stream_prefetch_pages):
+        """
+        Initialize the PageStream instance.
+
+        Args:
+            fetch_pages (Callable): Function returning an iterator over the pages. Each page is a list of entries.
+            rate_limiter (APIRateLimiter): Keeps the page requests under the rate limit of the device API.
+            max_pending_pages (int): The maximum number of pages retrieved in advance.
+        """
+        self._fetch_pages = fetch_pages
+        self._rate_limiter = rate_limiter
+        self._pending_pages = queue.Queue(maxsize=max(1, max_pending_pages))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name='pioneer_page_stream', daemon=True)
+
+    def _put(self, kind, payload):
+        """
+        Hand a message over to the consumer, unless it stopped iterating.
+
+        Args:
+            kind (str): 'page', 'error' or 'end'.
+            payload: The entries of the page, or the exception raised while retrieving it.
+
+        Returns:
+            bool: False if the consumer stopped iterating.
+        """
+        while not self._stopped.is_set():
+            try:
+                self._pending_pages.put((kind, payload), timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        """
+        Retrieve the pages one after the other and queue them. Runs on the background thread.
+        """
+        try:
+            pages = iter(self._fetch_pages())
+            while not self._stopped.is_set():
+                self._rate_limiter.wait()
+                page = next(pages, None)
+                if page is None:
+                    break
+                if not self._put('page', page):
+                    return
+
+        # The critical errors of the fetch functions exit the program, so SystemExit is forwarded as well
+        except BaseException as err:
+            self._put('error', err)
+            return
+
+        self._put('end', None)
+
+    def __iter__(self):
+        """
+        Start retrieving the pages and yield their entries.
+
+        Yields:
+            The entries of the collection, in the order they are returned by the device.
+        """
+        self._thread.start()
+        try:
+            while True:
+                kind, payload = self._pending_pages.get()
+                if kind == 'end':
+                    return
+                if kind == 'error':
+                    raise payload
+                yield from payload
+        finally:
+            # Stop the background thread if the caller did not consume all the entries
+            self._stopped.set()
+            self._thread.join()
+
+class ImportScheduler:
+    """
+    Retrieves data from a security device in parallel, while the caller processes it in dependency order.
+
+    The fetches of independent containers and object types run in a bounded thread pool. The results are consumed
+    on the calling thread, which is the only one that writes to the db. Objects are therefore still saved before
+    the groups, and the groups before the policies, while the API calls of later steps already run in the background.
+
+    Attributes:
+        _security_device (SecurityDevice): The security device the data is retrieved from.
+        _executor (ThreadPoolExecutor): The pool running the fetches.
+        _rate_limiter (APIRateLimiter): Keeps the fetches under the rate limit of the device API.
+        _futures (dict): The fetches that were submitted and not consumed yet.
+        _stream_pages (bool): If True, the objects are streamed page by page instead of being prefetched.
+    """
+
+    def __init__(self, security_device, max_workers=gvars.import_threads, requests_per_minute=gvars.fmc_api_requests_per_minute, stream_pages=False):
+        """
+        Initialize the ImportScheduler instance.
+
+        Args:
+            security_device (SecurityDevice): The security device the data is retrieved from.
+            max_workers (int): The maximum number of fetches running at the same time.
+            requests_per_minute (int): The maximum number of fetches started per minute.
+            stream_pages (bool): If True, the objects are streamed page by page instead of being prefetched, which bounds
+                                 the memory usage of the import.
+        """
+        self._security_device = security_device
+        # The fetches never exceed the number of simultaneous calls accepted by the device
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, security_device.max_api_connections)), thread_name_prefix='pioneer_import')
+        # Devices limiting each of their API calls themselves are not limited again by the scheduler
+        self._rate_limiter = APIRateLimiter(0 if security_device.api_rate_limiter is not None else requests_per_minute)
+        self._futures = {}
+        self._stream_pages = stream_pages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+    def _submit(self, key, fetch_function, *args):
+        """
+        Schedule a fetch, unless it was already scheduled.
+
+        Args:
+            key (tuple): Identifies the fetch.
+            fetch_function (Callable): The function retrieving the data.
+            *args: The arguments of the fetch function.
+        """
+        if key in self._futures:
+            return
+
+        def run_fetch():
+            self._rate_limiter.wait()
+            general_logger.debug(f"Fetching <{key[0]}> data from the security device.")
+            return fetch_function(*args)
+
+        self._futures[key] = self._executor.submit(run_fetch)
+
+    def _result(self, key, fetch_function, *args):
+        """
+        Wait for a fetch and return its result. Fetches that were not scheduled run right away.
+
+        Args:
+            key (tuple): Identifies the fetch.
+            fetch_function (Callable): The function retrieving the data.
+            *args: The arguments of the fetch function.
+
+        Returns:
+            list: The retrieved data.
+        """
+        self._submit(key, fetch_function, *args)
+        # The result is consumed only once, so it does not need to be kept in memory afterwards
+        return self._futures.pop(key).result()
+
+    def prefetch_container_info(self, container_types):
+        """
+        Schedule the retrieval of the containers of the specified types.
+
+        Args:
+            container_types (list): The container types, for example gvars.object_containers.
+        """
+        for container_type in container_types:
+            self._submit((container_type,), self._security_device.fetch_container_info, container_type)
+
+    def prefetch_object_info(self, object_types, containers):
+        """
+        Schedule the retrieval of the objects of the specified types, for each of the containers.
+
+        Args:
+            object_types (list): The object types, for example gvars.network_object.
+            containers (iterable): The containers of the objects.
+        """
+        # Streamed objects are only retrieved when they are consumed
+        if self._stream_pages:
+            return
+
+        for container in containers:
+            for object_type in object_types:
+                self._submit((object_type, container), self._security_device.fetch_object_info, object_type, container)
+
+    def container_info(self, container_type):
+        """
+        Get the information about the containers of the specified type.
+
+        Args:
+            container_type (str): The container type.
+
+        Returns:
+            list: The information about the containers.
+        """
+        return self._result((container_type,), self._security_device.fetch_container_info, container_type)
+
+    def object_info(self, object_type, container):
+        """
+        Get the information about the objects of the specified type and container.
+
+        Args:
+            object_type (str): The object type.
+            container (Container): The container of the objects.
+
+        Returns:
+            iterable: The information about the objects.
+        """
+        if self._stream_pages:
+            return self.object_stream(object_type, container)
+        return self._result((object_type, container), self._security_device.fetch_object_info, object_type, container)
+
+    def object_stream(self, object_type, container):
+        """
+        Stream the information about the objects of the specified type and container, one page at a time.
+
+        The objects are not prefetched. The pages are retrieved in the background while the caller consumes them.
+
+        Args:
+            object_type (str): The object type.
+            container (Container): The container of the objects.
+
+        Returns:
+            PageStream: Iterator over the information about the objects.
+        """
+        general_logger.debug(f"Streaming <{object_type}> data from the security device.")
+        return PageStream(lambda: self._security_device.fetch_object_pages(object_type, container), self._rate_limiter)
+
+    def shutdown(self):
+        """
+        Cancel the fetches that did not start yet and wait for the running ones to finish.
+        """
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._executor.shutdown(wait=True)
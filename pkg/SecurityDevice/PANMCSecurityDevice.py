@@ -1,7 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from pkg.SecurityDevice import SecurityDevice
 from pkg.Container.PANMCContainer import PANMCSecurityPolicyContainer, PANMCObjectContainer, PANMCSecurityZoneContainer, PANMCNATContainer
 from pkg.SecurityZone.PANMCSecurityZone import PANMCSecurityZone
-from panos.panorama import DeviceGroup, Template
+from panos.panorama import Panorama, DeviceGroup, Template
 from panos.network import Zone
 from panos.objects import AddressObject, AddressGroup, ServiceObject, ServiceGroup, CustomUrlCategory, Tag
 from panos.policies import PreRulebase, PostRulebase, SecurityRule
@@ -20,6 +22,52 @@ class PANMCSecurityDevice(SecurityDevice):
     def __init__(self, uid, name, SecurityDeviceDatabase, SecurityDeviceConnection):
         super().__init__(uid, name, SecurityDeviceDatabase, SecurityDeviceConnection)
         self._SecurityDeviceConnection = SecurityDeviceConnection
+        # The device groups, their hierarchy and the templates are retrieved once per import. See get_topology()
+        self._topology = {}
+        self._topology_locks = {}
+        self._topology_lock = threading.Lock()
+
+    def get_topology(self, key, fetch_function):
+        """
+        Get a part of the topology of the Panorama, retrieving it only the first time it is needed.
+
+        The containers of all types are built from the same device groups and templates, and they are retrieved by
+        several threads at once, so each part is retrieved by the first thread asking for it while the others wait.
+
+        Args:
+            key (str): The part of the topology, for example 'device_groups'.
+            fetch_function (Callable): Function retrieving the part from the Panorama.
+
+        Returns:
+            list: The part of the topology.
+        """
+        with self._topology_lock:
+            key_lock = self._topology_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key not in self._topology:
+                self._topology[key] = fetch_function()
+            return self._topology[key]
+
+    def return_templates(self):
+        """
+        Get the templates of the Panorama.
+
+        Returns:
+            list: The Template objects.
+        """
+        return self.get_topology('templates', lambda: Template.refreshall(parent=self.device_connection))
+
+    def create_device_connection(self):
+        """
+        Open another connection to the Panorama, for a thread that needs a configuration tree of its own.
+
+        The new connection reuses the API key of the main one, so no other key is generated.
+
+        Returns:
+            Panorama: The new connection.
+        """
+        return Panorama(self.device_connection.hostname, api_key=self.device_connection.api_key, port=self.device_connection.port)
 
     def get_device_version(self):
         return self._SecurityDeviceConnection.refresh_system_info().version
@@ -70,7 +118,7 @@ class PANMCSecurityDevice(SecurityDevice):
         return PANMCObjectContainer(self, container_entry)
 
     def return_object_container_info(self):
-        return self.return_device_group_info()
+        return self.get_topology('device_groups', self.return_device_group_info)
 
     def return_security_policy_container_object(self, container_entry):
         return PANMCSecurityPolicyContainer(self, container_entry)
@@ -85,33 +133,54 @@ class PANMCSecurityDevice(SecurityDevice):
         return PANMCSecurityZone(ZoneContainer, zone_entry)
 
     def return_security_policy_container_info(self):
-        return self.return_device_group_info()
+        return self.get_topology('device_groups', self.return_device_group_info)
 
     def return_nat_policy_container_info(self):
-        return self.return_device_group_info()
+        return self.get_topology('device_groups', self.return_device_group_info)
 
     def return_template_info(self):
         templates_info = []
-        templates = Template.refreshall(parent=self.device_connection)
+        templates = self.return_templates()
         for template in templates:
             templates_info.append({'name':template.name, 'parent':None})
         
         return templates_info
 
     def return_zone_container_info(self):
-        return self.return_template_info()
+        return self.get_topology('template_info', self.return_template_info)
 
     def return_managed_device_container_info(self):
         print("Importing managed device containers not supported yet for PANMC.")
         return None
     
+    def return_template_zones(self, template_name):
+        """
+        Retrieve the zones of a template.
+
+        The retrieval goes through a connection of its own, as the connections of pan-os-python cannot be shared
+        between threads.
+
+        Args:
+            template_name (str): The name of the template.
+
+        Returns:
+            list: The Zone objects.
+        """
+        template = self.create_device_connection().add(Template(template_name))
+        return Zone.refreshall(template)
+
     def return_security_zone_info(self):
         zones_info = []
-        templates = Template.refreshall(parent=self.device_connection)
-        for template in templates:
-            zones = Zone.refreshall(template)
-            for zone in zones:
-                zones_info.append({'name':zone.name})
+        templates = self.return_templates()
+        if not templates:
+            return zones_info
+
+        # The zones of the templates are refreshed in parallel, within the number of simultaneous calls allowed
+        template_names = [template.name for template in templates]
+        with ThreadPoolExecutor(max_workers=min(gvars.panmc_api_threads, len(template_names)), thread_name_prefix='pioneer_panmc_zones') as executor:
+            for zones in executor.map(self.return_template_zones, template_names):
+                for zone in zones:
+                    zones_info.append({'name':zone.name})
         return zones_info
         
     def return_managed_device_info(self):
@@ -1,5 +1,6 @@
 from .FMCSecurityDevice import FMCSecurityDevice
 from .PANMCSecurityDevice import PANMCSecurityDevice
+from .ConfigSecurityDevice import FMCConfigSecurityDevice, PANMCConfigSecurityDevice
 import utils.helper as helper
 import utils.gvars as gvars
 from pkg import PioneerDatabase
@@ -24,7 +25,7 @@ class SecurityDeviceConnection:
 
 class SecurityDeviceFactory:
     @staticmethod
-    def build_api_security_device(security_device_uid, security_device_name, security_device_type, security_device_db, security_device_hostname, security_device_username, security_device_secret, security_device_port, domain):
+    def build_api_security_device(security_device_uid, security_device_name, security_device_type, security_device_db, security_device_hostname, security_device_username, security_device_secret, security_device_port, domain, offline=False):
         """
         Build an API Security Device Python object based on its type.
 
@@ -38,6 +39,7 @@ class SecurityDeviceFactory:
             security_device_secret (str): The secret for accessing the security device.
             security_device_port (int): The port number for connecting to the security device.
             domain (str): The domain of the security device.
+            offline (bool): If True, no connection is opened to the device. Its data is replayed from an API snapshot instead.
 
         Returns:
             SecurityDevice: An instance of the appropriate API security device class.
@@ -45,12 +47,12 @@ class SecurityDeviceFactory:
         match security_device_type:
             case gvars.fmc_device_type:
                 general_logger.info(f"Device <{security_device_name}> is a Firepower Management Center.")
-                connection = FMCDeviceConnection(security_device_username, security_device_secret, security_device_hostname, security_device_port, domain).connect_to_security_device()
+                connection = None if offline else FMCDeviceConnection(security_device_username, security_device_secret, security_device_hostname, security_device_port, domain).connect_to_security_device()
                 return FMCSecurityDevice(security_device_uid, security_device_name, security_device_db, connection)
 
             case gvars.panmc_device_type:
                 general_logger.info(f"Device <{security_device_name}> is a Panorama Management Center.")
-                connection = PANMCDeviceConnection(security_device_username, security_device_secret, security_device_hostname, security_device_port).connect_to_security_device()
+                connection = None if offline else PANMCDeviceConnection(security_device_username, security_device_secret, security_device_hostname, security_device_port).connect_to_security_device()
                 return PANMCSecurityDevice(security_device_uid, security_device_name, security_device_db, connection)
 
             # default case
@@ -58,7 +60,40 @@ class SecurityDeviceFactory:
                 general_logger.critical(f"Device <{security_device_name}>, with type <{security_device_type}>, is an invalid API device.")
                 sys.exit(1)
         
-    def create_security_device(db_user, security_device_name, db_password, db_host, db_port):
+    @staticmethod
+    def build_config_security_device(security_device_uid, security_device_name, security_device_type, security_device_db, config_file_path):
+        """
+        Build a Security Device Python object reading its data from a config file, based on its type.
+
+        Args:
+            security_device_uid (str): The unique identifier for the security device.
+            security_device_name (str): The name of the security device.
+            security_device_type (str): The type of the security device.
+            security_device_db (class): The database class for the security device.
+            config_file_path (str): The path of the config file exported from the security device.
+
+        Returns:
+            SecurityDevice: An instance of the appropriate config file security device class.
+        """
+        if not config_file_path or not helper.os.path.isfile(config_file_path):
+            general_logger.critical(f"The config file <{config_file_path}> of device <{security_device_name}> does not exist.")
+            sys.exit(1)
+
+        match security_device_type:
+            case gvars.fmc_config_device_type:
+                general_logger.info(f"Device <{security_device_name}> is a Firepower Management Center. Its data is read from the JSON export <{config_file_path}>.")
+                return FMCConfigSecurityDevice(security_device_uid, security_device_name, security_device_db, config_file_path)
+
+            case gvars.panmc_config_device_type:
+                general_logger.info(f"Device <{security_device_name}> is a Panorama Management Center. Its data is read from the XML export <{config_file_path}>.")
+                return PANMCConfigSecurityDevice(security_device_uid, security_device_name, security_device_db, config_file_path)
+
+            # default case
+            case _:
+                general_logger.critical(f"Device <{security_device_name}>, with type <{security_device_type}>, is an invalid config file device.")
+                sys.exit(1)
+
+    def create_security_device(db_user, security_device_name, db_password, db_host, db_port, offline=False):
         """
         Create a security device object based on its type and extract all necessary data.
 
@@ -68,6 +103,7 @@ class SecurityDeviceFactory:
             db_password (str): The password for accessing the database.
             db_host (str): The hostname of the database.
             db_port (int): The port number for connecting to the database.
+            offline (bool): If True, no connection is opened to the device. Its data is replayed from an API snapshot instead.
 
         Returns:
             SecurityDevice: An instance of the specific security device class.
@@ -127,12 +163,21 @@ class SecurityDeviceFactory:
             specific_security_device_object = SecurityDeviceFactory.build_api_security_device(
                 security_device_uid, security_device_name, security_device_type, security_device_db,
                 security_device_hostname, security_device_username, security_device_secret,
-                security_device_port, security_device_domain
+                security_device_port, security_device_domain, offline
             )
 
         elif '_config' in security_device_type:
             general_logger.info(f"{security_device_name} is a device that does not use API. Only its config file will be processed.")
-            specific_security_device_object = None
+
+            # The path of the config file is stored as the hostname of the device
+            config_file_path = generic_security_device.get_general_data("hostname", "name", security_device_name)
+
+            # Get the security device UID
+            security_device_uid = generic_security_device.get_general_data("uid", "name", security_device_name)
+
+            specific_security_device_object = SecurityDeviceFactory.build_config_security_device(
+                security_device_uid, security_device_name, security_device_type, security_device_db, config_file_path
+            )
 
         else:
             general_logger.critical(f"{security_device_name} is an invalid API device! Type: {security_device_type}")
@@ -5,7 +5,9 @@ GeolocationObjectsTable, CountryObjectsTable, PortObjectsTable, ICMPObjectsTable
 NetworkGroupObjectsTable, PortGroupObjectsTable, URLGroupObjectsTable, NetworkGroupObjectsMembersTable, PortGroupObjectsMembersTable, URLGroupObjectsMembersTable, \
 PolicyUsersTable, L7AppsTable, L7AppFiltersTable, L7AppGroupsTable, L7AppGroupMembersTable, URLCategoriesTable, SecurityPolicyZonesTable, SecurityPolicyNetworksTable, \
 SecurityPolicyPortsTable, SecurityPolicyUsersTable, SecurityPolicyURLsTable, SecurityPolicyL7AppsTable, SecurityPolicyScheduleTable, NATPoliciesTable, NATPolicyZonesTable, \
-NATPolicyOriginalNetworksTable, NATPolicyOriginalPortsTable, NATPolicyTranslatedNetworksTable, NATPolicyTranslatedPortsTable
+NATPolicyOriginalNetworksTable, NATPolicyOriginalPortsTable, NATPolicyTranslatedNetworksTable, NATPolicyTranslatedPortsTable, RowContentHashesTable
+import hashlib
+import json
 import utils.helper as helper
 import sys
 import utils.gvars as gvars
@@ -67,6 +69,7 @@ class SecurityDeviceDatabase(PioneerDatabase):
         self._nat_policy_original_ports_table = NATPolicyOriginalPortsTable(self)
         self._nat_policy_translated_networks_table = NATPolicyTranslatedNetworksTable(self)
         self._nat_policy_translated_ports_table = NATPolicyTranslatedPortsTable(self)
+        self._row_content_hashes_table = RowContentHashesTable(self)
 
     def create_security_device_tables(self):
         """
@@ -116,6 +119,7 @@ class SecurityDeviceDatabase(PioneerDatabase):
         self._nat_policy_original_ports_table.create()
         self._nat_policy_translated_networks_table.create()
         self._nat_policy_translated_ports_table.create()
+        self._row_content_hashes_table.create()
 
     @property
     def security_policy_zones_table(self):
@@ -527,6 +531,16 @@ class SecurityDeviceDatabase(PioneerDatabase):
         """
         return self._nat_policy_translated_ports_table
 
+    @property
+    def row_content_hashes_table(self):
+        """
+        Get the RowContentHashesTable instance.
+        
+        Returns:
+            RowContentHashesTable: The row content hashes table instance.
+        """
+        return self._row_content_hashes_table
+
 class SecurityDevice:
     def __init__(self, uid, name, db, device_connection):
         """
@@ -542,6 +556,14 @@ class SecurityDevice:
         self._name = name
         self._db = db
         self._device_connection = device_connection
+        # Snapshot of the raw API responses. None means every response is fetched from the device.
+        self._api_response_cache = None
+        # Tracks the changes while an existing device is refreshed. None means the device is imported from scratch.
+        self._device_refresh = None
+        # Limits each call made to the API of the device. None means the calls are only limited by the ImportScheduler.
+        self._api_rate_limiter = None
+        # Number of calls the device accepts at the same time. The connection is shared, so a single one by default.
+        self._max_api_connections = 1
 
     @property
     def uid(self):
@@ -613,6 +635,120 @@ class SecurityDevice:
         """
         self._device_connection = value
 
+    @property
+    def api_response_cache(self):
+        """
+        Get the snapshot of the raw API responses of the device.
+        
+        Returns:
+            APIResponseCache: The snapshot, or None if responses are always fetched from the device.
+        """
+        return self._api_response_cache
+
+    @api_response_cache.setter
+    def api_response_cache(self, value):
+        """
+        Set the snapshot of the raw API responses of the device.
+        
+        Parameters:
+            value (APIResponseCache): The new snapshot.
+        """
+        self._api_response_cache = value
+
+    @property
+    def api_rate_limiter(self):
+        """
+        Get the limiter applied to each call made to the API of the device.
+        
+        Returns:
+            APIRateLimiter: The limiter, or None if the calls are only limited by the ImportScheduler.
+        """
+        return self._api_rate_limiter
+
+    @property
+    def max_api_connections(self):
+        """
+        Get the number of calls the device accepts at the same time.
+        
+        Returns:
+            int: The number of simultaneous calls. The ImportScheduler never runs more fetches than this.
+        """
+        return self._max_api_connections
+
+    @property
+    def device_refresh(self):
+        """
+        Get the tracker of the changes made while refreshing the device.
+        
+        Returns:
+            DeviceRefresh: The tracker, or None if the device is imported from scratch.
+        """
+        return self._device_refresh
+
+    @device_refresh.setter
+    def device_refresh(self, value):
+        """
+        Set the tracker of the changes made while refreshing the device.
+        
+        Parameters:
+            value (DeviceRefresh): The new tracker.
+        """
+        self._device_refresh = value
+
+    @staticmethod
+    def compute_content_hash(entry):
+        """
+        Compute the hash of the data an object is created from.
+
+        Parameters:
+            entry: The information about the object, as returned by the security device.
+
+        Returns:
+            str: The SHA-256 hash of the data, in hexadecimal.
+        """
+        # The keys are sorted, so the same data always gives the same hash
+        serialized_entry = json.dumps(entry, sort_keys=True, default=str)
+        return hashlib.sha256(serialized_entry.encode('utf-8')).hexdigest()
+
+    def track_object_content(self, object_type, py_object, object_entry, container_uid):
+        """
+        Check if an object must be saved.
+
+        While the device is refreshed, the hash of the data the object is created from is recorded, the object takes the
+        uid of the existing object with the same name and it is only saved if its data changed since the previous
+        refresh. A device imported from scratch saves all of its objects, without computing their hashes.
+
+        Parameters:
+            object_type (str): The type of the object, for example gvars.network_object.
+            py_object: The object created from the data.
+            object_entry: The information about the object, as returned by the security device.
+            container_uid (str): The uid of the container of the object.
+
+        Returns:
+            bool: True if the object must be saved to the db.
+        """
+        if self._device_refresh is None:
+            return True
+
+        content_hash = self.compute_content_hash(object_entry)
+        return self._device_refresh.prepare(object_type, py_object, container_uid, content_hash)
+
+    def fetch_through_cache(self, endpoint, container_name, fetch_function):
+        """
+        Call the API of the device, unless the response is available in the API snapshot.
+
+        Parameters:
+            endpoint (str): The endpoint called, for example gvars.network_object.
+            container_name (str): The name of the container the data is retrieved for, or None.
+            fetch_function (Callable): Function that calls the API of the device.
+
+        Returns:
+            The response of the API.
+        """
+        if self._api_response_cache is None:
+            return fetch_function()
+        return self._api_response_cache.get_or_fetch(endpoint, container_name, fetch_function)
+
     def save_general_info(self, security_device_uid, security_device_name, security_device_username, security_device_secret, security_device_hostname, security_device_type, security_device_port, security_device_version, domain):
         """
         Save general information about the security device to the db.
@@ -659,7 +795,7 @@ class SecurityDevice:
         general_logger.debug("Attempting to retrieve the device version from the device connection.")
 
         try:
-            device_version = self.get_device_version()
+            device_version = self.fetch_through_cache('device_version', None, self.get_device_version)
             # Log an informational message with the retrieved device version
             general_logger.info(f"Got device version: {device_version}")
             
@@ -761,54 +897,81 @@ class SecurityDevice:
                 # Raise an error if the object type does not match any known type
                 raise ValueError(f"Unknown object type: {object_type}")
 
-    def get_container_info_from_device_conn(self, container_type):
+    def fetch_container_info(self, container_type):
         """
-        Retrieve information about containers from the security device and process it.
-
-        This function retrieves information about containers of the specified type from the security device. It processes the retrieved
-        information, creates Python objects for each container, and saves them to the database. The function handles different container types,
-        including nested containers, and provides logging and error handling.
+        Retrieve information about the containers of the specified type from the security device.
 
         Parameters:
             container_type (str): The type of containers to retrieve information for. Examples include 'object_containers', 'security_policy_container', etc.
 
         Returns:
-            set: A set of container objects that were created and processed.
+            list: The information about the containers, as returned by the security device.
 
         Raises:
-            ValueError: If the provided container_type is unknown.
+            SystemExit: If the information cannot be retrieved.
         """
-        # Log the start of the process, including the type of container being imported
-        general_logger.info(f"Importing configuration of the device containers. Container type: <{container_type}>")
-        
         try:
             # Match the container_type with predefined constants and retrieve the relevant container information
             match container_type:
                 case gvars.security_policy_container:
-                    containers_info = self.return_security_policy_container_info()
+                    fetch_function = self.return_security_policy_container_info
                 case gvars.security_zone_container:
-                    containers_info = self.return_zone_container_info()
+                    fetch_function = self.return_zone_container_info
                 case gvars.managed_device_container:
-                    containers_info = self.return_managed_device_container_info()
+                    fetch_function = self.return_managed_device_container_info
                 case gvars.object_containers:
-                    containers_info = self.return_object_container_info()
+                    fetch_function = self.return_object_container_info
                 case gvars.nat_policy_container:
-                    containers_info = self.return_nat_policy_container_info()
+                    fetch_function = self.return_nat_policy_container_info
                 case _:
                     raise ValueError(f"Unknown container type: {container_type}")
+
+            return self.fetch_through_cache(container_type, None, fetch_function)
         
         except Exception as err:
             # Log a critical error if an exception occurs during retrieval
             general_logger.critical(f"Could not retrieve container info. Reason: <{err}>")
             sys.exit(1)
 
+    def get_container_info_from_device_conn(self, container_type, containers_info=None):
+        """
+        Retrieve information about containers from the security device and process it.
+
+        This function retrieves information about containers of the specified type from the security device. It processes the retrieved
+        information, creates Python objects for each container, and saves them to the database. The function handles different container types,
+        including nested containers, and provides logging and error handling.
+
+        Parameters:
+            container_type (str): The type of containers to retrieve information for. Examples include 'object_containers', 'security_policy_container', etc.
+            containers_info (list, optional): Container information that was already retrieved from the security device, for example by an
+                                              ImportScheduler. If not provided, the information is retrieved now.
+
+        Returns:
+            set: A set of container objects that were created and processed.
+
+        Raises:
+            ValueError: If the provided container_type is unknown.
+        """
+        # Log the start of the process, including the type of container being imported
+        general_logger.info(f"Importing configuration of the device containers. Container type: <{container_type}>")
+        
+        if containers_info is None:
+            containers_info = self.fetch_container_info(container_type)
+
         # Initialize a set to store container objects
         container_objects = set()
 
+        # The containers that are new or that changed since the previous import. All of them, unless the device is refreshed.
+        changed_container_objects = set()
+
         if containers_info is not None:
             for container_entry in containers_info:
                 # Create a Python object for each container entry
                 current_container = self.create_py_object(container_type, container_entry, object_container=None)
+
+                # Track the container data, so it can be compared when the device is refreshed
+                if self.track_object_content(container_type, current_container, container_entry, self._uid):
+                    changed_container_objects.add(current_container)
                 
                 # Log the name of the current container being processed
                 general_logger.info(f"Processing <{container_type}> container. Name: <{current_container.parent_name}>")
@@ -835,73 +998,172 @@ class SecurityDevice:
                         container.parent = parent_container
                 
                 # Save the container object to the database
-                container.save(self._db)
+                if container in changed_container_objects:
+                    container.save(self._db)
+
+            # Write the containers queued by buffered inserts and commit them if an import session is active
+            self._db.checkpoint()
         
         return container_objects
 
-    def get_object_info_from_device_conn(self, object_type, object_container):
+    def fetch_object_info(self, object_type, object_container):
         """
-        Retrieve and process information about objects from the security device.
-
-        This function retrieves information about objects of the specified type from the security device. Depending on the type of object, 
-        it processes and saves the information into the database. For group objects, additional relationships are created.
+        Retrieve information about the objects of the specified type from the security device.
 
         Parameters:
             object_type (str): The type of objects to retrieve information for. Examples include 'security_zone', 'managed_device', etc.
-            object_container: The container object used for processing specific types of objects. Its usage depends on the object_type.
+            object_container: The container of the objects. It is only used by the policy object types.
 
         Returns:
-            None
+            list: The information about the objects, as returned by the security device.
+
+        Raises:
+            ValueError: If the provided object_type is unknown.
         """
+        # Only the policies are retrieved for a particular container
+        container_name = None
+
         # Retrieve the object information based on the provided object_type
         match object_type:
             case gvars.security_zone:
-                objects_info = self.return_security_zone_info()
+                fetch_function = self.return_security_zone_info
             case gvars.managed_device:
-                objects_info = self.return_managed_device_info()
+                fetch_function = self.return_managed_device_info
             case gvars.network_object:
-                objects_info = self.return_network_object_info()
+                fetch_function = self.return_network_object_info
             case gvars.network_group_object:
-                objects_info = self.return_network_group_object_info()
+                fetch_function = self.return_network_group_object_info
             case gvars.port_object:
-                objects_info = self.return_port_object_info()
+                fetch_function = self.return_port_object_info
             case gvars.port_group_object:
-                objects_info = self.return_port_group_object_info()
+                fetch_function = self.return_port_group_object_info
             case gvars.url_object:
-                objects_info = self.return_url_object_info()
+                fetch_function = self.return_url_object_info
             case gvars.url_group_object:
-                objects_info = self.return_url_group_object_info()
+                fetch_function = self.return_url_group_object_info
             case gvars.schedule_object:
-                objects_info = self.return_schedule_object_info()
+                fetch_function = self.return_schedule_object_info
             case gvars.security_policy:
-                objects_info = self.return_security_policy_info(object_container)
+                fetch_function = lambda: self.return_security_policy_info(object_container)
+                container_name = object_container.name
             case gvars.nat_policy:
-                objects_info = self.return_nat_policy_info(object_container)
+                fetch_function = lambda: self.return_nat_policy_info(object_container)
+                container_name = object_container.name
             case _:
                 raise ValueError(f"Unknown object type: {object_type}")
 
+        return self.fetch_through_cache(object_type, container_name, fetch_function)
+
+    def fetch_object_pages(self, object_type, object_container):
+        """
+        Retrieve information about the objects of the specified type from the security device, one page at a time.
+
+        Responses replayed from the API snapshot are returned in a single page.
+
+        Parameters:
+            object_type (str): The type of objects to retrieve information for.
+            object_container: The container of the objects.
+
+        Yields:
+            list: The information about the objects of a page.
+        """
+        if self._api_response_cache is not None:
+            yield self.fetch_object_info(object_type, object_container) or []
+            return
+
+        yield from self.return_object_info_pages(object_type, object_container)
+
+    def create_group_relationships(self, object_type, group_objects):
+        """
+        Create the relationships of group objects in the db.
+
+        Parameters:
+            object_type (str): The type of the group objects.
+            group_objects (list): The group objects. They must already be saved.
+        """
+        if not group_objects:
+            return
+
+        # Write the group objects queued by buffered inserts before their uids are preloaded
+        self.db.flush_buffered_inserts()
+
+        if object_type in (gvars.security_policy, gvars.nat_policy):
+            # Every referenced name is resolved with a single lookup in the name index of the import
+            name_index = self.db.get_typed_name_index(object_type)
+
+            # Build the relationship rows of all the policies first, then write each table in bulk
+            relationship_rows = {}
+            for policy in group_objects:
+                for table, rows in policy.get_relationship_rows(self.db, name_index):
+                    relationship_rows.setdefault(table, []).extend(rows)
+
+            for table, rows in relationship_rows.items():
+                table.insert_many(rows)
+            return
+
+        # Preload data for group objects
+        preloaded_object_data = PioneerDatabase.preload_object_data(object_type, self.db)
+
+        # Create relationships for group objects in the database
+        for group_object in group_objects:
+            group_object.create_relationships_in_db(self.db, preloaded_object_data)
+
+    def get_object_info_from_device_conn(self, object_type, object_container, objects_info=None):
+        """
+        Retrieve and process information about objects from the security device.
+
+        This function retrieves information about objects of the specified type from the security device. Depending on the type of object, 
+        it processes and saves the information into the database. For group objects, additional relationships are created.
+
+        Parameters:
+            object_type (str): The type of objects to retrieve information for. Examples include 'security_zone', 'managed_device', etc.
+            object_container: The container object used for processing specific types of objects. Its usage depends on the object_type.
+            objects_info (iterable, optional): Object information that was already retrieved from the security device, for example by an
+                                               ImportScheduler. It can also be a stream yielding the objects while they are retrieved.
+                                               If not provided, the information is retrieved now.
+
+        Returns:
+            None
+        """
+        if objects_info is None:
+            objects_info = self.fetch_object_info(object_type, object_container)
+
         if objects_info is not None:
             if 'group' not in object_type:
                 # Process and save individual objects to the database
                 for object_entry in objects_info:
                     security_device_object = self.create_py_object(object_type, object_entry, object_container)
-                    security_device_object.save(self.db)
+                    # Objects that did not change since the previous import are not saved again
+                    if self.track_object_content(object_type, security_device_object, object_entry, object_container.uid):
+                        security_device_object.save(self.db)
             else:
+                # Policies never reference each other, so their relationships are created every few policies, which keeps
+                # the memory usage bounded. A group can have members returned after it, so all the groups are processed at once.
+                relationships_batch_size = gvars.import_page_size if object_type in (gvars.security_policy, gvars.nat_policy) else None
+
                 # Process and save group objects to the database
                 group_objects = []
                 for object_entry in objects_info:
                     security_device_object = self.create_py_object(object_type, object_entry, object_container)
-                    security_device_object.save(self.db)
-                    group_objects.append(security_device_object)
+                    # The relationships of the groups that did not change since the previous import are kept as they are
+                    if self.track_object_content(object_type, security_device_object, object_entry, object_container.uid):
+                        security_device_object.save(self.db)
+                        group_objects.append(security_device_object)
 
-                # Preload data for group objects
-                preloaded_object_data = PioneerDatabase.preload_object_data(object_type, self.db)
+                    if relationships_batch_size and len(group_objects) >= relationships_batch_size:
+                        self.create_group_relationships(object_type, group_objects)
+                        group_objects = []
 
-                # Create relationships for group objects in the database
-                for group_object in group_objects:
-                    group_object.create_relationships_in_db(self.db, preloaded_object_data)
+                self.create_group_relationships(object_type, group_objects)
+
+            # Write the remaining rows queued by buffered inserts and commit them if an import session is active
+            self.db.checkpoint()
 
     # these functions are overridden in the subclasses whenever needed/relevant
+    def return_object_info_pages(self, object_type, object_container):
+        # devices that cannot page through their objects return all of them in a single page
+        yield self.fetch_object_info(object_type, object_container) or []
+
     def return_object_container_info(self):
         return ["container"]
 
@@ -36,6 +36,16 @@ class SecurityZone:
             str: The UID of the security zone.
         """
         return self._uid
+
+    @uid.setter
+    def uid(self, value):
+        """
+        Set the unique identifier (UID) of the security zone.
+
+        Args:
+            value (str): The new UID of the security zone.
+        """
+        self._uid = value
     
     def save(self, db):
         """
@@ -1,5 +1,12 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import io
+import itertools
+import threading
+import time
 import psycopg2
+import psycopg2.errorcodes
+import psycopg2.extras
 import sys
 import utils.helper as helper
 import utils.gvars as gvars
@@ -69,12 +76,15 @@ class DBConnection:
     def port(self, value):
         self._port = value
 
-    def create_cursor(self):
+    def create_connection(self, autocommit=True):
         """
-        Create a cursor for interacting with the db.
+        Open a new connection to the db.
+
+        Args:
+            autocommit (bool): Whether every statement is committed as soon as it is executed.
 
         Returns:
-            cursor: A cursor object for the db connection.
+            connection: A psycopg2 connection object.
 
         Raises:
             SystemExit: If there is an error connecting to the db.
@@ -88,13 +98,32 @@ class DBConnection:
                 host=self._host,
                 port=self._port
             )
-            # Set autocommit to True for the connection
-            postgres_connection.autocommit = True
+            # Set the autocommit mode of the connection
+            postgres_connection.autocommit = autocommit
         
         except psycopg2.Error as error:
             # Log the error and exit the program if connection fails
             general_logger.critical(f"Error connecting to PostgreSQL Platform: {error}.")
             sys.exit(1)
+
+        general_logger.debug(f"Successfully opened connection to db <{self._db}>.")
+        return postgres_connection
+
+    def create_cursor(self, autocommit=True):
+        """
+        Create a cursor for interacting with the db.
+
+        Args:
+            autocommit (bool): Whether every statement is committed as soon as it is executed. Import sessions
+                               switch the connection to transactional mode on their own, regardless of this value.
+
+        Returns:
+            cursor: A cursor object for the db connection.
+
+        Raises:
+            SystemExit: If there is an error connecting to the db.
+        """
+        postgres_connection = self.create_connection(autocommit)
         
         # Initialize and return the db cursor
         db_cursor = postgres_connection.cursor()
@@ -102,6 +131,265 @@ class DBConnection:
         
         return db_cursor
 
+class DBConnectionPool:
+    """
+    A thread-safe pool of connections to a single db.
+
+    There is one pool per (user, db, host, port) key, shared by the whole process. A connection acquired from
+    the pool is used exclusively by its owner until it is released, so import and migration workers running in
+    different threads can share the pool safely.
+    """
+    # Registry of the pools, keyed by (user, db, host, port)
+    _pools = {}
+    # Maps every connection handed out to the pool it belongs to
+    _connection_owners = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, user, db, password, host, port, max_size=gvars.db_pool_max_size, acquire_timeout=gvars.db_pool_acquire_timeout):
+        """
+        Initialize a connection pool.
+
+        Args:
+            user (str): The username for the db connection.
+            db (str): The name of the db to connect to.
+            password (str): The password for the db connection.
+            host (str): The hostname of the db server.
+            port (int): The port number for connecting to the db server.
+            max_size (int): The maximum number of connections opened by the pool.
+            acquire_timeout (int): The number of seconds to wait for a free connection before giving up.
+        """
+        self._db_connection = DBConnection(user, db, password, host, port)
+        self._max_size = max_size
+        self._acquire_timeout = acquire_timeout
+        self._idle_connections = []
+        self._open_connections = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+    @property
+    def max_size(self):
+        """int: The maximum number of connections opened by the pool."""
+        return self._max_size
+
+    @property
+    def closed(self):
+        """bool: True if the pool was shut down."""
+        return self._closed
+
+    @classmethod
+    def get_pool(cls, user, db, password, host, port):
+        """
+        Get the pool for the given connection parameters, creating it if needed.
+
+        Args:
+            user (str): The username for the db connection.
+            db (str): The name of the db to connect to.
+            password (str): The password for the db connection.
+            host (str): The hostname of the db server.
+            port (int): The port number for connecting to the db server.
+
+        Returns:
+            DBConnectionPool: The pool of connections to the db.
+        """
+        key = (user, db, host, port)
+        with cls._registry_lock:
+            pool = cls._pools.get(key)
+            if pool is None or pool.closed:
+                general_logger.debug(f"Creating connection pool for db <{db}>.")
+                pool = cls(user, db, password, host, port)
+                cls._pools[key] = pool
+            return pool
+
+    @staticmethod
+    def is_healthy(connection):
+        """
+        Check if a connection can still be used.
+
+        Args:
+            connection: The psycopg2 connection to check.
+
+        Returns:
+            bool: True if the connection is open and answers a trivial query.
+        """
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as health_check_cursor:
+                health_check_cursor.execute("SELECT 1;")
+            # Do not leave the health check transaction open on non-autocommit connections
+            if not connection.autocommit:
+                connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def acquire(self, autocommit=True):
+        """
+        Get a connection from the pool.
+
+        An idle connection is reused if it passes the health check. Otherwise, a new connection is opened if the
+        pool did not reach its maximum size. If it did, the call waits for another thread to release a connection.
+
+        Args:
+            autocommit (bool): The autocommit mode the connection must have.
+
+        Returns:
+            connection: A psycopg2 connection object.
+
+        Raises:
+            SystemExit: If the pool is closed or no connection becomes available in time.
+        """
+        deadline = time.monotonic() + self._acquire_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    general_logger.critical(f"Connection pool of db <{self._db_connection.db}> is closed.")
+                    sys.exit(1)
+
+                # Reuse the idle connections that are still healthy and drop the others
+                while self._idle_connections:
+                    connection = self._idle_connections.pop()
+                    if self.is_healthy(connection):
+                        connection.autocommit = autocommit
+                        return self._register(connection)
+                    general_logger.warning(f"Dropping broken connection to db <{self._db_connection.db}>.")
+                    self._discard(connection)
+
+                # Open a new connection if the pool has room for it
+                if self._open_connections < self._max_size:
+                    self._open_connections += 1
+                    break
+
+                # Wait for a connection to be released
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 0 or not self._condition.wait(remaining_time):
+                    general_logger.critical(f"Timed out waiting for a connection to db <{self._db_connection.db}>. Pool size: <{self._max_size}>.")
+                    sys.exit(1)
+
+        # Open the connection outside of the lock, so other threads are not blocked while connecting
+        try:
+            connection = self._db_connection.create_connection(autocommit)
+        except BaseException:
+            with self._condition:
+                self._open_connections -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            return self._register(connection)
+
+    def release(self, connection):
+        """
+        Give a connection back to the pool.
+
+        Uncommitted work is rolled back before the connection is made available again. Broken connections are closed.
+
+        Args:
+            connection: The psycopg2 connection to release.
+        """
+        with DBConnectionPool._registry_lock:
+            DBConnectionPool._connection_owners.pop(connection, None)
+
+        with self._condition:
+            if self._closed or connection.closed:
+                self._discard(connection)
+            else:
+                try:
+                    # Make sure the next owner gets a connection without an open transaction
+                    if connection.status != psycopg2.extensions.STATUS_READY:
+                        connection.rollback()
+                    self._idle_connections.append(connection)
+                except psycopg2.Error:
+                    self._discard(connection)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, autocommit=True):
+        """
+        Context manager that acquires a connection and releases it at the end of the block.
+
+        Args:
+            autocommit (bool): The autocommit mode the connection must have.
+        """
+        connection = self.acquire(autocommit)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """
+        Shut down the pool and close all its idle connections.
+
+        Connections that are still in use are closed when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            while self._idle_connections:
+                self._discard(self._idle_connections.pop())
+            self._condition.notify_all()
+        general_logger.debug(f"Closed connection pool of db <{self._db_connection.db}>.")
+
+    @classmethod
+    def release_connection(cls, connection):
+        """
+        Give a connection back to the pool it was acquired from.
+
+        Args:
+            connection: The psycopg2 connection to release.
+        """
+        with cls._registry_lock:
+            pool = cls._connection_owners.get(connection)
+        if pool is not None:
+            pool.release(connection)
+        elif not connection.closed:
+            connection.close()
+
+    @classmethod
+    def close_all(cls):
+        """
+        Shut down all the pools and close all their connections, including the ones still in use.
+        """
+        with cls._registry_lock:
+            pools = list(cls._pools.values())
+            connections_in_use = list(cls._connection_owners.keys())
+            cls._pools.clear()
+            cls._connection_owners.clear()
+
+        for pool in pools:
+            pool.close()
+        for connection in connections_in_use:
+            if not connection.closed:
+                connection.close()
+
+    def _register(self, connection):
+        """
+        Record that a connection was handed out by this pool.
+
+        Args:
+            connection: The psycopg2 connection handed out.
+
+        Returns:
+            connection: The same connection.
+        """
+        with DBConnectionPool._registry_lock:
+            DBConnectionPool._connection_owners[connection] = self
+        return connection
+
+    def _discard(self, connection):
+        """
+        Close a connection and free its slot in the pool. Must be called while holding the pool lock.
+
+        Args:
+            connection: The psycopg2 connection to close.
+        """
+        self._open_connections -= 1
+        if not connection.closed:
+            try:
+                connection.close()
+            except psycopg2.Error:
+                pass
+
 class PioneerDatabase():
     def __init__(self, cursor):
         """
@@ -111,6 +399,16 @@ class PioneerDatabase():
             cursor: The db cursor used for executing SQL commands.
         """
         self._cursor = cursor
+        # State of the import session. See import_session()
+        self._session_active = False
+        self._atomic_session = False
+        self._commit_every = 0
+        self._rows_since_commit = 0
+        self._savepoint_depth = 0
+        # If True, the inserts update the rows that already exist. See upserting()
+        self._upsert_active = False
+        # Name indexes used to resolve the references of the policies, keyed by policy type. See get_typed_name_index()
+        self._typed_name_indexes = {}
 
     @abstractmethod
     def table_factory(self):
@@ -186,6 +484,46 @@ class PioneerDatabase():
             general_logger.critical(f"Error creating table: <{table_name}>. Reason: <{err}>.")
             sys.exit(1)
 
+    def create_index(self, table_name, index_name, index_columns):
+        """
+        Create an index on a table if it does not already exist.
+
+        Args:
+            table_name (str): The name of the indexed table.
+            index_name (str): The name of the index.
+            index_columns (tuple): The names of the columns covered by the index.
+
+        Raises:
+            SystemExit: If an error occurs while creating the index.
+        """
+        command = f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(index_columns)});"
+        try:
+            general_logger.info(f"Creating index: <{index_name}> on table: <{table_name}>.")
+            self._cursor.execute(command)
+
+        except psycopg2.Error as err:
+            general_logger.critical(f"Error creating index: <{index_name}>. Reason: <{err}>.")
+            sys.exit(1)
+
+    def create_missing_indexes(self):
+        """
+        Add the secondary indexes declared by the tables to an existing db.
+
+        Databases created before a table declared its indexes do not have them. Tables missing from the db are skipped.
+        """
+        general_logger.info("Creating the missing indexes of the db.")
+        for table in self.get_tables():
+            # Skip the tables without indexes and the ones that were never created in this db
+            if not table.table_indexes:
+                continue
+            self._cursor.execute("SELECT to_regclass(%s);", (table.name,))
+            if self._cursor.fetchone()[0] is None:
+                general_logger.warning(f"Table <{table.name}> does not exist in the db. Skipping its indexes.")
+                continue
+            table.create_indexes()
+            # Refresh the planner statistics so the new indexes are used right away
+            self._cursor.execute(f"ANALYZE {table.name};")
+
     @property
     def cursor(self):
         """
@@ -196,8 +534,226 @@ class PioneerDatabase():
         """
         return self._cursor
 
+    def get_tables(self):
+        """
+        Get all the table instances registered on this db.
+
+        The tables are returned in the order in which they were defined on the db instance, which is also
+        the order in which they are created. This guarantees that parent tables come before their children.
+
+        Returns:
+            list: A list of PioneerTable instances.
+        """
+        return [attribute for attribute in vars(self).values() if isinstance(attribute, PioneerTable)]
+
+    def start_buffered_inserts(self, batch_size=gvars.db_insert_batch_size, bulk_load=False):
+        """
+        Enable buffered insert mode on all the tables of the db.
+
+        While buffered insert mode is active, every call to PioneerTable.insert() queues the row in memory
+        instead of executing a statement. Rows are written with multi-row INSERT statements whenever a table buffer
+        reaches the batch size, whenever data is read back from the db, or when the buffers are flushed explicitly.
+
+        Args:
+            batch_size (int): The number of rows sent to the db in a single statement.
+            bulk_load (bool): If True, the tables supporting it are flushed with COPY instead of INSERT statements.
+        """
+        general_logger.info(f"Enabling buffered inserts. Batch size: <{batch_size}>, bulk load: <{bulk_load}>.")
+        for table in self.get_tables():
+            table.start_buffering(batch_size, bulk_load)
+
+    def flush_buffered_inserts(self):
+        """
+        Write all the rows queued in the table buffers to the db.
+
+        The tables are flushed in their definition order, so rows referenced by foreign keys are written first.
+        """
+        for table in self.get_tables():
+            table.flush()
+
+    def stop_buffered_inserts(self):
+        """
+        Flush the table buffers and disable buffered insert mode on all the tables of the db.
+        """
+        self.flush_buffered_inserts()
+        for table in self.get_tables():
+            table.stop_buffering()
+        general_logger.info("Disabled buffered inserts.")
+
+    @contextmanager
+    def buffered_inserts(self, batch_size=gvars.db_insert_batch_size, bulk_load=False):
+        """
+        Context manager that keeps buffered insert mode active for the duration of the block.
+
+        Args:
+            batch_size (int): The number of rows sent to the db in a single statement.
+            bulk_load (bool): If True, the tables supporting it are flushed with COPY instead of INSERT statements.
+        """
+        self.start_buffered_inserts(batch_size, bulk_load)
+        try:
+            yield self
+        finally:
+            self.stop_buffered_inserts()
+
+    @property
+    def session_active(self):
+        """
+        Check if an import session is active on the db.
+
+        Returns:
+            bool: True if the writes are currently done inside an import session.
+        """
+        return self._session_active
+
+    @contextmanager
+    def import_session(self, atomic=False, commit_every=0):
+        """
+        Context manager that runs the writes done in the block inside explicit transactions.
+
+        The connection is switched out of autocommit mode for the duration of the session. Every write is
+        isolated with a savepoint, so a failing row or batch is rolled back without aborting the transaction.
+        The transaction is committed at every checkpoint() (the import flow calls it after each container type
+        and object type) and, optionally, every time a number of rows has been written. If the block raises,
+        the uncommitted work is rolled back.
+
+        Args:
+            atomic (bool): If True, the whole session is a single transaction. Checkpoints do not commit, and a
+                           failed import leaves nothing behind in the db.
+            commit_every (int): Commit after this many rows have been written. 0 disables row based commits.
+                                Ignored for atomic sessions.
+        """
+        connection = self._cursor.connection
+        previous_autocommit = connection.autocommit
+
+        # Write the rows queued before the session, so they are not part of it
+        self.flush_buffered_inserts()
+
+        general_logger.info(f"Starting import session. Atomic: <{atomic}>, commit every: <{commit_every}> rows.")
+        connection.autocommit = False
+        self._session_active = True
+        self._atomic_session = atomic
+        self._commit_every = commit_every
+        self._rows_since_commit = 0
+
+        try:
+            yield self
+            # Write whatever is still queued and commit the last transaction
+            self.flush_buffered_inserts()
+            connection.commit()
+            general_logger.info("Import session committed.")
+
+        except BaseException as err:
+            # Roll back the uncommitted work, including the case where the program exits
+            connection.rollback()
+            general_logger.critical(f"Import session failed, rolled back the uncommitted changes. Reason: <{err}>.")
+            raise
+
+        finally:
+            self._session_active = False
+            self._atomic_session = False
+            connection.autocommit = previous_autocommit
+
+    def checkpoint(self):
+        """
+        Write the queued rows and commit the current transaction of the import session.
+
+        Without an active import session, or inside an atomic one, the queued rows are only written.
+        """
+        self.flush_buffered_inserts()
+        if self._session_active and not self._atomic_session:
+            self._cursor.connection.commit()
+            general_logger.debug(f"Committed <{self._rows_since_commit}> rows at checkpoint.")
+            self._rows_since_commit = 0
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Context manager isolating the statements executed in the block with a savepoint.
+
+        If a psycopg2 error is raised inside the block, the changes of the block are rolled back to the
+        savepoint, so the transaction of the import session stays usable, and the error is re-raised.
+        Outside of an import session, the block is executed as it is. Savepoints can be nested.
+        """
+        if not self._session_active:
+            yield
+            return
+
+        # Every nesting level has its own savepoint, so an inner rollback does not affect the outer blocks
+        savepoint_name = f"pioneer_write_{self._savepoint_depth}"
+        self._savepoint_depth += 1
+        self._cursor.execute(f"SAVEPOINT {savepoint_name};")
+        try:
+            yield
+        except psycopg2.Error:
+            self._cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint_name};")
+            raise
+        else:
+            self._cursor.execute(f"RELEASE SAVEPOINT {savepoint_name};")
+        finally:
+            self._savepoint_depth -= 1
+
+        # The commits due while the savepoints were open are done once the outermost one is released
+        if not self._savepoint_depth:
+            self.commit_if_due()
+
+    @property
+    def upsert_active(self):
+        """
+        Check if the inserts currently update the rows that already exist.
+
+        Returns:
+            bool: True if the inserts are done inside an upserting() block.
+        """
+        return self._upsert_active
+
+    @contextmanager
+    def upserting(self):
+        """
+        Context manager that makes the inserts done in the block update the rows that already exist.
+
+        A row already exists if it has the same values in the conflict columns of its table, see
+        PioneerTable.get_conflict_columns(). Tables without conflict columns keep ignoring the duplicate rows.
+        """
+        # Write the rows queued before the block, so they are not updated by mistake
+        self.flush_buffered_inserts()
+        previous_upsert_active = self._upsert_active
+        self._upsert_active = True
+        try:
+            yield self
+            self.flush_buffered_inserts()
+        finally:
+            self._upsert_active = previous_upsert_active
+
+    def register_written_rows(self, count):
+        """
+        Keep track of the rows written in the import session and commit once the commit interval is reached.
+
+        Args:
+            count (int): The number of rows that were just written.
+        """
+        if not self._session_active:
+            return
+
+        self._rows_since_commit += count
+        self.commit_if_due()
+
+    def commit_if_due(self):
+        """
+        Commit the import session if the commit interval is reached.
+
+        A commit would release the savepoints that are still open, so it is deferred until the outermost one is
+        released, see savepoint().
+        """
+        if self._savepoint_depth:
+            return
+
+        if not self._atomic_session and self._commit_every and self._rows_since_commit >= self._commit_every:
+            self._cursor.connection.commit()
+            general_logger.debug(f"Committed <{self._rows_since_commit}> rows.")
+            self._rows_since_commit = 0
+
     @staticmethod
-    def connect_to_db(user, db, password, host, port):
+    def connect_to_db(user, db, password, host, port, autocommit=True):
         """
         Connect to a PostgreSQL db and return a cursor object.
 
@@ -207,6 +763,7 @@ class PioneerDatabase():
             password (str): Password for the db user.
             host (str): Hostname of the db server.
             port (int): Port number of the db server.
+            autocommit (bool): Whether the connection commits every statement as soon as it is executed.
 
         Returns:
             cursor: Cursor object for db operations.
@@ -214,12 +771,89 @@ class PioneerDatabase():
         Raises:
             SystemExit: If there is an error connecting to the db.
         """
-        # Create a DBConnection instance
-        db_connection = DBConnection(user, db, password, host, port)
+        # Get a connection from the pool of the db
         general_logger.info(f"Connecting to device db: <{db}>.")
-        cursor = db_connection.create_cursor()
+        connection = DBConnectionPool.get_pool(user, db, password, host, port).acquire(autocommit)
+        cursor = connection.cursor()
+        general_logger.debug(f"Successfully created cursor {cursor}.")
         return cursor
+
+    @staticmethod
+    def release_db_connection(cursor):
+        """
+        Close a cursor returned by connect_to_db() and give its connection back to the pool.
+
+        Args:
+            cursor: The cursor to close.
+        """
+        connection = cursor.connection
+        if not cursor.closed:
+            cursor.close()
+        DBConnectionPool.release_connection(connection)
     
+    @staticmethod
+    def get_policy_lookup_tables(object_type, db):
+        """
+        Get the tables holding the objects that can be referenced by the policies of the specified type.
+
+        Parameters:
+            object_type (str): The type of the policies, gvars.security_policy or gvars.nat_policy.
+            db (Database): An instance of the database holding the tables.
+
+        Returns:
+            dict: The tables, keyed by the type of the objects they hold.
+        """
+        match object_type:
+            case gvars.security_policy:
+                return {
+                    gvars.security_zone: db.security_zones_table,
+                    gvars.network_object: db.network_address_objects_table,
+                    gvars.network_group_object: db.network_group_objects_table,
+                    gvars.country_object: db.country_objects_table,
+                    gvars.geolocation_object: db.geolocation_objects_table,
+                    gvars.port_object: db.port_objects_table,
+                    gvars.port_group_object: db.port_group_objects_table,
+                    gvars.icmp_object: db.icmp_objects_table,
+                    gvars.url_object: db.url_objects_table,
+                    gvars.url_group_object: db.url_group_objects_table,
+                    gvars.url_category_object: db.url_categories_table,
+                    gvars.schedule_object: db.schedule_objects_table,
+                    gvars.policy_user_object: db.policy_users_table,
+                    gvars.l7_app_object: db.l7_apps_table,
+                    gvars.l7_app_filter_object: db.l7_app_filters_table,
+                    gvars.l7_app_group_object: db.l7_app_groups_table
+                }
+            case gvars.nat_policy:
+                return {
+                    gvars.security_zone: db.security_zones_table,
+                    gvars.network_object: db.network_address_objects_table,
+                    gvars.network_group_object: db.network_group_objects_table,
+                    gvars.port_object: db.port_objects_table,
+                    gvars.port_group_object: db.port_group_objects_table,
+                    gvars.icmp_object: db.icmp_objects_table,
+                }
+            case _:
+                return {}
+
+    def get_typed_name_index(self, object_type):
+        """
+        Get the index resolving the names referenced by the policies of the specified type.
+
+        The index is built once per db instance and policy type. Every call brings it up to date with the rows written
+        since the previous call, so it must be called after the buffered inserts are flushed.
+
+        Args:
+            object_type (str): The type of the policies, gvars.security_policy or gvars.nat_policy.
+
+        Returns:
+            TypedNameIndex: The name index.
+        """
+        if object_type not in self._typed_name_indexes:
+            self._typed_name_indexes[object_type] = TypedNameIndex(PioneerDatabase.get_policy_lookup_tables(object_type, self))
+        typed_name_index = self._typed_name_indexes[object_type]
+        typed_name_index.refresh()
+        return typed_name_index
+
     @staticmethod
     def preload_object_data(object_type, db):
         """
@@ -227,6 +861,8 @@ class PioneerDatabase():
 
         This method retrieves data from different tables depending on the type of object specified.
         It fetches data from each relevant table and organizes it into a dictionary for easy access.
+        Every table is only read once per db instance. Afterwards, its name to uid index is kept up to date
+        as rows are written, see PioneerTable.get_name_uid_index().
 
         Parameters:
             object_type (str): The type of object for which to preload data.
@@ -237,17 +873,16 @@ class PioneerDatabase():
         """
         def get_table_data(table, columns):
             """
-            Helper function to get data from a table and convert it to a dictionary.
+            Helper function to get the name to uid index of a table.
 
             Parameters:
                 table (Table): The table from which to retrieve data.
-                columns (list): The list of columns to retrieve.
+                columns (list): The list of columns to retrieve. Only ['name', 'uid'] is supported.
 
             Returns:
                 dict: A dictionary mapping column values to their corresponding uids.
             """
-            values_tuple_list = table.get(columns=columns)
-            return dict(values_tuple_list)
+            return table.get_name_uid_index()
 
         members_dict_from_db = {}
 
@@ -267,40 +902,9 @@ class PioneerDatabase():
                 db.url_objects_table,
                 db.url_group_objects_table
             ]
-        elif object_type == 'security_policy_group':
-            tables_to_fetch = {
-                gvars.security_zone: db.security_zones_table,
-                gvars.network_object: db.network_address_objects_table,
-                gvars.network_group_object: db.network_group_objects_table,
-                gvars.country_object: db.country_objects_table,
-                gvars.geolocation_object: db.geolocation_objects_table,
-                gvars.port_object: db.port_objects_table,
-                gvars.port_group_object: db.port_group_objects_table,
-                gvars.icmp_object: db.icmp_objects_table,
-                gvars.url_object: db.url_objects_table,
-                gvars.url_group_object: db.url_group_objects_table,
-                gvars.url_category_object: db.url_categories_table,
-                gvars.schedule_object: db.schedule_objects_table,
-                gvars.policy_user_object: db.policy_users_table,
-                gvars.l7_app_object: db.l7_apps_table,
-                gvars.l7_app_filter_object: db.l7_app_filters_table,
-                gvars.l7_app_group_object: db.l7_app_groups_table
-            }
-            # Fetch data for each table and store it in members_dict_from_db with the table name as key
-            for table_name, table in tables_to_fetch.items():
-                members_dict_from_db[table_name] = get_table_data(table, ['name', 'uid'])
-            return members_dict_from_db
-        elif object_type == 'nat_policy_group':
-            tables_to_fetch = {
-                gvars.security_zone: db.security_zones_table,
-                gvars.network_object: db.network_address_objects_table,
-                gvars.network_group_object: db.network_group_objects_table,
-                gvars.port_object: db.port_objects_table,
-                gvars.port_group_object: db.port_group_objects_table,
-                gvars.icmp_object: db.icmp_objects_table,
-            }
-            # Fetch data for each table and store it in members_dict_from_db with the table name as key
-            for table_name, table in tables_to_fetch.items():
+        elif object_type in (gvars.security_policy, gvars.nat_policy):
+            # Fetch data for each table and store it in members_dict_from_db with the object type as key
+            for table_name, table in PioneerDatabase.get_policy_lookup_tables(object_type, db).items():
                 members_dict_from_db[table_name] = get_table_data(table, ['name', 'uid'])
             return members_dict_from_db
         else:
@@ -312,6 +916,77 @@ class PioneerDatabase():
 
         return members_dict_from_db
 
+class TypedNameIndex:
+    """
+    Single index resolving the names referenced by policies to the uids of the objects of every type.
+
+    The policies reference objects by name only, and the same name can belong to objects of different types, for
+    example a network object and a country. Each name is mapped once to the (type, uid) pairs of all the objects
+    having it, so a reference is resolved with a single lookup instead of one lookup per table. The index is built
+    from the name to uid indexes of the tables and only the rows written since the previous refresh are added to it.
+
+    Attributes:
+        _tables (dict): The tables holding the objects, keyed by the type of the objects.
+        _entries (dict): The uids of the objects, keyed by their names and then by their types.
+        _sources (dict): The name to uid index of each table and the number of its entries already indexed.
+        _resolved (dict): The uids resolved for a tuple of object types, keyed by the names.
+    """
+
+    def __init__(self, tables):
+        """
+        Initialize the TypedNameIndex instance.
+
+        Args:
+            tables (dict): The tables holding the objects, keyed by the type of the objects.
+        """
+        self._tables = tables
+        self._entries = {}
+        self._sources = {}
+        self._resolved = {}
+
+    def refresh(self):
+        """
+        Add the rows written to the tables since the previous refresh to the index.
+        """
+        name_uid_indexes = {object_type: table.get_name_uid_index() for object_type, table in self._tables.items()}
+
+        # The name to uid index of a table is replaced when rows are deleted from it, so everything is indexed again
+        if any(self._sources.get(object_type, (name_uid_index, 0))[0] is not name_uid_index for object_type, name_uid_index in name_uid_indexes.items()):
+            self._entries = {}
+            self._sources = {}
+
+        new_entries_count = 0
+        for object_type, name_uid_index in name_uid_indexes.items():
+            indexed_count = self._sources.get(object_type, (name_uid_index, 0))[1]
+            # The name to uid indexes only grow, so the entries after the indexed ones are the new rows
+            for name, uid in itertools.islice(name_uid_index.items(), indexed_count, None):
+                self._entries.setdefault(name, {})[object_type] = uid
+                new_entries_count += 1
+            self._sources[object_type] = (name_uid_index, len(name_uid_index))
+
+        # Names that were not found before can be resolved now
+        if new_entries_count:
+            self._resolved = {}
+
+    def resolve(self, name, object_types):
+        """
+        Resolve a name to the uids of the objects of the specified types having it.
+
+        Args:
+            name (str): The name of the objects.
+            object_types (tuple): The types of the objects, in the order the uids are returned.
+
+        Returns:
+            tuple: The uid of the object of each type, or None if there is no object of that type with the name.
+        """
+        resolved_names = self._resolved.setdefault(object_types, {})
+        uids = resolved_names.get(name)
+        if uids is None:
+            typed_uids = self._entries.get(name, {})
+            uids = tuple(typed_uids.get(object_type) for object_type in object_types)
+            resolved_names[name] = uids
+        return uids
+
 class PioneerTable:
     def __init__(self, db):
         """
@@ -322,7 +997,19 @@ class PioneerTable:
         """
         self._name = None
         self._table_columns = None
+        # Secondary indexes of the table. Each entry is a tuple with the names of the indexed columns.
+        self._table_indexes = []
+        # In-memory index of the uids of the rows by their names. None means it was not loaded yet.
+        self._name_uid_index = None
+        # Columns matching an inserted row with an existing one in upsert mode. None means the primary key column is used.
+        self._conflict_columns = None
         self._db = db
+        # Rows waiting to be written while buffered insert mode is active. None means the mode is disabled.
+        self._insert_buffer = None
+        self._batch_size = gvars.db_insert_batch_size
+        # Tables holding large amounts of rows set this to True in order to be loaded with COPY in bulk load mode
+        self._supports_bulk_load = False
+        self._bulk_load = False
 
     @property
     def name(self):
@@ -352,6 +1039,20 @@ class PioneerTable:
     def table_columns(self, value):
         self._table_columns = value
 
+    @property
+    def table_indexes(self):
+        """
+        Get or set the secondary indexes of the table.
+
+        Returns:
+            list: List of tuples where each tuple holds the names of the columns covered by an index.
+        """
+        return self._table_indexes
+
+    @table_indexes.setter
+    def table_indexes(self, value):
+        self._table_indexes = value
+
     @property
     def db(self):
         """
@@ -368,9 +1069,29 @@ class PioneerTable:
 
     def create(self):
         """
-        Create the table in the db using the specified name and schema.
+        Create the table in the db using the specified name and schema, together with its secondary indexes.
         """
         self._db.create_table(self._name, self.get_schema())
+        self.create_indexes()
+
+    def create_indexes(self):
+        """
+        Create the secondary indexes declared by the table, if they do not already exist.
+        """
+        for index_columns in self._table_indexes:
+            self._db.create_index(self._name, self.get_index_name(index_columns), index_columns)
+
+    def get_index_name(self, index_columns):
+        """
+        Build the name of a secondary index of the table.
+
+        Args:
+            index_columns (tuple): The names of the columns covered by the index.
+
+        Returns:
+            str: The name of the index.
+        """
+        return f"idx_{self._name}_{'_'.join(index_columns)}"
 
     def get_schema(self):
         """
@@ -396,31 +1117,287 @@ class PioneerTable:
         table_columns_str = ", ".join(column_names)
         return table_columns_str
 
+    def get_column_names(self):
+        """
+        Get the column names from the table columns, excluding constraints and primary keys.
+
+        Returns:
+            list: The names of the columns, in the order the values are inserted.
+        """
+        return self.get_columns().split(", ")
+
+    def get_name_uid_index(self):
+        """
+        Get the uids of the rows of the table, indexed by their names.
+
+        The index is read from the db the first time it is needed. Afterwards, the rows written through this table
+        instance are added to it, so it never has to be read again. The first uid written for a name is kept, the same
+        as the ON CONFLICT DO NOTHING clause of the inserts does.
+
+        Returns:
+            dict: The uids of the rows, keyed by their names.
+        """
+        if self._name_uid_index is None:
+            self._name_uid_index = {}
+            for name, uid in self.get(['name', 'uid']):
+                self._name_uid_index.setdefault(name, uid)
+        return self._name_uid_index
+
+    def index_written_rows(self, rows):
+        """
+        Add rows that were just written to the name to uid index of the table, if it is loaded.
+
+        Args:
+            rows (iterable): The rows. Each row holds the values of all the columns.
+        """
+        if self._name_uid_index is None:
+            return
+
+        column_names = self.get_column_names()
+        if 'name' not in column_names or 'uid' not in column_names:
+            return
+
+        name_position = column_names.index('name')
+        uid_position = column_names.index('uid')
+        for row in rows:
+            self._name_uid_index.setdefault(row[name_position], row[uid_position])
+
+    def get_conflict_columns(self):
+        """
+        Get the columns matching an inserted row with an existing one while the db is in upsert mode.
+
+        Returns:
+            tuple: The names of the columns. Empty if the rows of the table are never updated.
+        """
+        if self._conflict_columns is not None:
+            return self._conflict_columns
+
+        # By default, the rows are matched on their primary key, if it is declared on the first column
+        first_column = self._table_columns[0]
+        if first_column[1].endswith("PRIMARY KEY"):
+            return (first_column[0],)
+        return ()
+
+    def get_conflict_clause(self):
+        """
+        Build the ON CONFLICT clause of the insert commands of the table.
+
+        Returns:
+            str: The clause. Existing rows are updated in upsert mode and left untouched otherwise.
+        """
+        conflict_columns = self.get_conflict_columns()
+        if not self._db.upsert_active or not conflict_columns:
+            return "ON CONFLICT DO NOTHING"
+
+        # Overwrite all the columns that do not identify the row
+        updated_columns = [column for column in self.get_column_names() if column not in conflict_columns]
+        if not updated_columns:
+            return "ON CONFLICT DO NOTHING"
+
+        set_clause = ", ".join(f"{column} = EXCLUDED.{column}" for column in updated_columns)
+        return f"ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {set_clause}"
+
     def insert(self, *values):
         """
         Insert values into the table.
 
+        If buffered insert mode is active, the row is queued and written later in a batch.
+
         Args:
             *values: Values to be inserted into the table.
         """
+        # Queue the row if the table is buffering its inserts
+        if self._insert_buffer is not None:
+            self._insert_buffer.append(values)
+            if len(self._insert_buffer) >= self._batch_size:
+                self.flush()
+            return
+
         columns = self.get_columns()
         
         # Construct placeholders for the values in the SQL query
         placeholders = ', '.join(['%s'] * len(values))
         
-        # Create the insert command with ON CONFLICT DO NOTHING to avoid errors on duplicate keys
-        insert_command = f"INSERT INTO {self._name} ({columns}) VALUES ({placeholders}) ON CONFLICT DO NOTHING;"
+        # Create the insert command with an ON CONFLICT clause to avoid errors on duplicate keys
+        insert_command = f"INSERT INTO {self._name} ({columns}) VALUES ({placeholders}) {self.get_conflict_clause()};"
         try:
             cursor = self._db.cursor
             
             # Execute the insert command with the actual values
-            cursor.execute(insert_command, values)
+            with self._db.savepoint():
+                cursor.execute(insert_command, values)
+                written_row_count = cursor.rowcount
             
-            general_logger.info(f"Successfully inserted values into table <{self._name}>.")
+            general_logger.debug(f"Successfully inserted values into table <{self._name}>.")
+            self._db.register_written_rows(1)
+
+            # Rows skipped by the ON CONFLICT clause are not indexed
+            if written_row_count:
+                self.index_written_rows([values])
             
         except psycopg2.Error as err:
+            # In upsert mode, a row matching an existing one on another unique constraint is skipped, the same as without it
+            if self._db.upsert_active and err.pgcode == psycopg2.errorcodes.UNIQUE_VIOLATION:
+                general_logger.debug(f"Values <{values}> already exist in table <{self._name}> under another key. Skipping them.")
+                return
             general_logger.error(f"Failed to insert values <{values}> into table <{self._name}>. Reason: {err}")
 
+    def insert_many(self, rows, batch_size=None):
+        """
+        Insert multiple rows into the table using multi-row INSERT statements.
+
+        The rows are split in batches and each batch is sent to the db in a single statement. If a batch fails,
+        its rows are inserted one by one, so that only the offending rows are lost, the same as with insert().
+        If buffered insert mode is active, the rows are queued instead.
+
+        Args:
+            rows (iterable): An iterable of tuples, each tuple holding the values of a row.
+            batch_size (int, optional): The number of rows per statement. Defaults to the batch size of the table.
+        """
+        # Queue the rows if the table is buffering its inserts
+        if self._insert_buffer is not None:
+            self._insert_buffer.extend(tuple(row) for row in rows)
+            if len(self._insert_buffer) >= self._batch_size:
+                self.flush()
+            return
+
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return
+
+        batch_size = batch_size or self._batch_size
+        columns = self.get_columns()
+
+        # Create the insert command. execute_values() expands the VALUES placeholder into multiple rows
+        # The rows skipped by the ON CONFLICT clause are not returned, so only the written rows are indexed
+        insert_command = f"INSERT INTO {self._name} ({columns}) VALUES %s {self.get_conflict_clause()} RETURNING {columns};"
+        cursor = self._db.cursor
+
+        for batch_start in range(0, len(rows), batch_size):
+            batch = rows[batch_start:batch_start + batch_size]
+            try:
+                with self._db.savepoint():
+                    written_rows = psycopg2.extras.execute_values(cursor, insert_command, batch, page_size=len(batch), fetch=True)
+                general_logger.info(f"Successfully inserted <{len(written_rows)}> of <{len(batch)}> rows into table <{self._name}>.")
+                self._db.register_written_rows(len(written_rows))
+                self.index_written_rows(written_rows)
+
+            except psycopg2.Error as err:
+                general_logger.error(f"Failed to insert a batch of <{len(batch)}> rows into table <{self._name}>. Reason: {err}. Retrying row by row.")
+                # Fall back to single row inserts in order to isolate the failing rows
+                for row in batch:
+                    self.insert(*row)
+
+    @staticmethod
+    def format_copy_value(value):
+        """
+        Convert a Python value to its representation in the PostgreSQL COPY text format.
+
+        Args:
+            value: The value to be converted.
+
+        Returns:
+            str: The value as it must appear in the COPY stream.
+        """
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+
+        # Escape the characters that have a special meaning in the COPY text format
+        return (str(value)
+                .replace('\\', '\\\\')
+                .replace('\t', '\\t')
+                .replace('\n', '\\n')
+                .replace('\r', '\\r'))
+
+    def copy_many(self, rows):
+        """
+        Bulk load rows into the table using COPY FROM STDIN.
+
+        The rows are streamed into a temporary staging table, which is then merged into the table with
+        INSERT ... SELECT ... and the ON CONFLICT clause of the table, so duplicates are handled exactly like insert()
+        does, including in upsert mode.
+        If the bulk load fails, the rows are inserted with insert_many().
+
+        Args:
+            rows (iterable): An iterable of tuples, each tuple holding the values of a row.
+        """
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return
+
+        columns = self.get_columns()
+        staging_table = f"{self._name}_staging"
+
+        # Build the COPY stream in memory, one tab separated line per row
+        copy_stream = io.StringIO()
+        for row in rows:
+            copy_stream.write('\t'.join(self.format_copy_value(value) for value in row) + '\n')
+        copy_stream.seek(0)
+
+        try:
+            cursor = self._db.cursor
+
+            with self._db.savepoint():
+                # The staging table lives for the duration of the db session
+                cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} (LIKE {self._name} INCLUDING DEFAULTS);")
+                cursor.execute(f"TRUNCATE {staging_table};")
+
+                # Stream the rows into the staging table and merge them into the table
+                cursor.copy_expert(f"COPY {staging_table} ({columns}) FROM STDIN", copy_stream)
+                cursor.execute(f"INSERT INTO {self._name} ({columns}) SELECT {columns} FROM {staging_table} {self.get_conflict_clause()} RETURNING {columns};")
+                written_rows = cursor.fetchall()
+                cursor.execute(f"TRUNCATE {staging_table};")
+
+            general_logger.info(f"Successfully bulk loaded <{len(written_rows)}> of <{len(rows)}> rows into table <{self._name}>.")
+            self._db.register_written_rows(len(written_rows))
+            # The rows skipped by the ON CONFLICT clause are not returned, so only the written rows are indexed
+            self.index_written_rows(written_rows)
+
+        except psycopg2.Error as err:
+            general_logger.error(f"Failed to bulk load <{len(rows)}> rows into table <{self._name}>. Reason: {err}. Falling back to batched inserts.")
+            self.insert_many(rows)
+
+    def start_buffering(self, batch_size=gvars.db_insert_batch_size, bulk_load=False):
+        """
+        Enable buffered insert mode for the table.
+
+        Args:
+            batch_size (int): The number of rows sent to the db in a single statement.
+            bulk_load (bool): If True and the table supports it, the buffer is flushed with COPY.
+        """
+        if self._insert_buffer is None:
+            self._insert_buffer = []
+        self._batch_size = batch_size
+        self._bulk_load = bulk_load and self._supports_bulk_load
+
+    def flush(self):
+        """
+        Write the rows queued in the buffer of the table to the db.
+        """
+        if not self._insert_buffer:
+            return
+
+        # Swap out the buffer before writing, so that insert_many() executes the statements
+        pending_rows = self._insert_buffer
+        self._insert_buffer = None
+        try:
+            if self._bulk_load:
+                self.copy_many(pending_rows)
+            else:
+                self.insert_many(pending_rows)
+        finally:
+            self._insert_buffer = []
+
+    def stop_buffering(self):
+        """
+        Flush the buffer of the table and disable buffered insert mode.
+        """
+        self.flush()
+        self._insert_buffer = None
+        self._bulk_load = False
+
     def get(self, columns, name_col=None, val=None, order_param=None, join=None, not_null_condition=False, multiple_where=False):
         """
         Retrieve records from the table based on the specified criteria.
@@ -480,6 +1457,9 @@ class PioneerTable:
         # Construct the final SELECT query
         select_query = f"SELECT {columns_str} FROM {self._name} {join_clause} {where_clause} {order_clause};"
 
+        # Make sure the rows queued by buffered inserts are visible to the query
+        self._db.flush_buffered_inserts()
+
         # Execute the query
         try:
             cursor = self._db.cursor
@@ -491,6 +1471,47 @@ class PioneerTable:
             general_logger.error(f"Failed to select values from table: {self._name}. Reason: {e}")
             raise
 
+    def delete(self, name_col, val, multiple_where=False):
+        """
+        Delete the records of the table matching the specified criteria.
+
+        Args:
+            name_col (str, list): Column name(s) for the WHERE clause.
+            val (str, list): Value(s) for the WHERE clause.
+            multiple_where (bool, optional): If True, multiple WHERE conditions will be applied.
+
+        Returns:
+            int: The number of deleted records.
+
+        Raises:
+            psycopg2.Error: If the records cannot be deleted, for example because other records still reference them.
+        """
+        # Construct the WHERE clause
+        if multiple_where:
+            where_clause = " AND ".join(f"{col} = %s" for col in name_col)
+            params = tuple(val)
+        else:
+            where_clause = f"{name_col} = %s"
+            params = (val,)
+
+        delete_command = f"DELETE FROM {self._name} WHERE {where_clause};"
+
+        # Make sure the rows queued by buffered inserts are deleted as well
+        self._db.flush_buffered_inserts()
+
+        cursor = self._db.cursor
+        with self._db.savepoint():
+            cursor.execute(delete_command, params)
+            deleted_count = cursor.rowcount
+
+        general_logger.debug(f"Deleted <{deleted_count}> rows from table <{self._name}>.")
+        self._db.register_written_rows(deleted_count)
+
+        # The deleted rows may be in the name to uid index, so it is read again the next time it is needed
+        if deleted_count:
+            self._name_uid_index = None
+        return deleted_count
+
 class GeneralDataTable(PioneerTable):
     def __init__(self, db):
         """
@@ -674,6 +1695,7 @@ class SecurityPoliciesTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "security_policies"
+        self._table_indexes = [("security_policy_container_uid",)]
         self._table_columns = [
             ("uid", "TEXT PRIMARY KEY"),
             ("name", "TEXT NOT NULL"),
@@ -709,6 +1731,7 @@ class NATPoliciesTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "nat_policies"
+        self._table_indexes = [("nat_policy_container_uid",)]
         self._table_columns = [
             ("uid", "TEXT PRIMARY KEY"),
             ("name", "TEXT NOT NULL"),
@@ -790,6 +1813,7 @@ class NetworkAddressObjectsTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "network_address_objects"
+        self._supports_bulk_load = True
         self._table_columns = [
             ("uid", "TEXT PRIMARY KEY"),
             ("name", "TEXT NOT NULL"),
@@ -885,6 +1909,8 @@ class NetworkGroupObjectsMembersTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "network_group_objects_members"
+        self._table_indexes = [("group_uid",)]
+        self._supports_bulk_load = True
         self._table_columns = [
             ("group_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT NOT NULL"),
@@ -905,6 +1931,8 @@ class PortGroupObjectsMembersTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "port_group_objects_members"
+        self._table_indexes = [("group_uid",)]
+        self._supports_bulk_load = True
         self._table_columns = [
             ("group_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT NOT NULL"),
@@ -925,6 +1953,8 @@ class URLGroupObjectsMembersTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "url_group_objects_members"
+        self._table_indexes = [("group_uid",)]
+        self._supports_bulk_load = True
         self._table_columns = [
             ("group_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT NOT NULL"),
@@ -1208,6 +2238,7 @@ class SecurityPolicyZonesTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "security_policy_zones"
+        self._table_indexes = [("security_policy_uid", "flow")]
         self._table_columns = [
             ("security_policy_uid", "TEXT NOT NULL"),
             ("zone_uid", "TEXT"),
@@ -1228,6 +2259,8 @@ class SecurityPolicyNetworksTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "security_policy_networks"
+        self._table_indexes = [("security_policy_uid", "flow")]
+        self._supports_bulk_load = True
         self._table_columns = [
             ("security_policy_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT"),
@@ -1254,6 +2287,8 @@ class SecurityPolicyPortsTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "security_policy_ports"
+        self._table_indexes = [("security_policy_uid", "flow")]
+        self._supports_bulk_load = True
         self._table_columns = [
             ("security_policy_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT"),
@@ -1279,6 +2314,7 @@ class SecurityPolicyUsersTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "security_policy_users"
+        self._table_indexes = [("security_policy_uid",)]
         self._table_columns = [
             ("security_policy_uid", "TEXT NOT NULL"),
             ("user_uid", "TEXT"),
@@ -1290,6 +2326,7 @@ class SecurityPolicyURLsTable(PioneerTable):
     def __init__(self, db):
         super().__init__(db)
         self._name = "security_policy_urls"
+        self._table_indexes = [("security_policy_uid",)]
         self._table_columns = [
             ("security_policy_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT"),
@@ -1314,6 +2351,7 @@ class SecurityPolicyL7AppsTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "security_policy_l7_apps"
+        self._table_indexes = [("security_policy_uid",)]
         self._table_columns = [
             ("security_policy_uid", "TEXT"),
             ("l7_app_uid", "TEXT"),
@@ -1338,6 +2376,7 @@ class SecurityPolicyScheduleTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "security_policy_schedule"
+        self._table_indexes = [("security_policy_uid",)]
         self._table_columns = [
             ("security_policy_uid", "TEXT"),
             ("schedule_uid", "TEXT"),
@@ -1448,6 +2487,28 @@ class NATPolicyContainersMapTable(PioneerTable):
             ("CONSTRAINT fk_target_nat_policy_container FOREIGN KEY (target_nat_policy_container_uid)", "REFERENCES nat_policy_containers (uid)")
         ]
 
+class NameMapTable(PioneerTable):
+    def __init__(self, db) -> None:
+        """
+        Initialize the NameMapTable with the provided database connection.
+
+        Args:
+            db (PioneerDatabase): The database connection object used to interact with the database.
+
+        This constructor sets up the table name and schema storing the name every migrated object and policy gets on
+        the target device. A target name is unique within its name type, so two source names never get the same one.
+        """
+        super().__init__(db)
+        self._name = "name_map"
+        self._conflict_columns = ("name_type", "source_name")
+        self._table_columns = [
+            ("name_type", "TEXT NOT NULL"),
+            ("source_name", "TEXT NOT NULL"),
+            ("target_name", "TEXT NOT NULL"),
+            ("PRIMARY KEY (name_type, source_name)", ""),
+            ("CONSTRAINT name_map_target_name_key UNIQUE (name_type, target_name)", "")
+        ]
+
 class NATPolicyZonesTable(PioneerTable):
     def __init__(self, db):
         """
@@ -1461,6 +2522,7 @@ class NATPolicyZonesTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "nat_policy_zones"
+        self._table_indexes = [("nat_policy_uid", "flow")]
         self._table_columns = [
             ("nat_policy_uid", "TEXT NOT NULL"),
             ("zone_uid", "TEXT"),
@@ -1482,6 +2544,7 @@ class NATPolicyOriginalNetworksTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "nat_policy_original_networks"
+        self._table_indexes = [("nat_policy_uid", "flow")]
         self._table_columns = [
             ("nat_policy_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT"),
@@ -1505,6 +2568,7 @@ class NATPolicyOriginalPortsTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "nat_policy_original_ports"
+        self._table_indexes = [("nat_policy_uid", "flow")]
         self._table_columns = [
             ("nat_policy_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT"),
@@ -1530,6 +2594,7 @@ class NATPolicyTranslatedNetworksTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "nat_policy_translated_networks"
+        self._table_indexes = [("nat_policy_uid", "flow")]
         self._table_columns = [
             ("nat_policy_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT"),
@@ -1553,6 +2618,7 @@ class NATPolicyTranslatedPortsTable(PioneerTable):
         """
         super().__init__(db)
         self._name = "nat_policy_translated_ports"
+        self._table_indexes = [("nat_policy_uid", "flow")]
         self._table_columns = [
             ("nat_policy_uid", "TEXT NOT NULL"),
             ("object_uid", "TEXT"),
@@ -1565,6 +2631,27 @@ class NATPolicyTranslatedPortsTable(PioneerTable):
             ("CONSTRAINT fk_group_object_uid FOREIGN KEY (group_object_uid)", "REFERENCES port_group_objects (uid)")
         ]
 
+class RowContentHashesTable(PioneerTable):
+    def __init__(self, db):
+        """
+        Initialize the RowContentHashesTable with the provided database connection.
+
+        Args:
+            db (PioneerDatabase): The database connection object used to interact with the database.
+
+        This constructor sets up the table name and schema storing the hash of the data every refreshed object was
+        created from. The hashes are compared when the device is refreshed, in order to find the objects that changed.
+        """
+        super().__init__(db)
+        self._name = "row_content_hashes"
+        self._conflict_columns = ("object_type", "uid")
+        self._table_columns = [
+            ("object_type", "TEXT NOT NULL"),
+            ("uid", "TEXT NOT NULL"),
+            ("content_hash", "TEXT NOT NULL"),
+            ("PRIMARY KEY (object_type, uid)", "")
+        ]
+
 # the following tables are very simplistic and limited and will be rewritten
 # in the future. the feature they are trying to emulate is needed now
 class LogSettingsTable(PioneerTable):
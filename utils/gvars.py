@@ -11,6 +11,9 @@ pioneer_db_user_pass = "2wsx#EDC"
 landing_db = "pioneer_projects"
 db_host = "127.0.0.1"
 db_port = 5432
+# maximum number of connections opened to a single database and number of seconds to wait for a free one
+db_pool_max_size = 10
+db_pool_acquire_timeout = 60
 
 # LOGGING VARIABLES
 general_logger = "general"
@@ -21,6 +24,8 @@ special_policies_logger_file = special_policies_logger + ".log"
 # DATABASE TABLE VARIABLES
 general_data_table_name = "general_data"
 security_policy_containers_table_name = "security_policy_containers"
+# number of rows sent to the database in a single multi-row INSERT statement
+db_insert_batch_size = 1000
 
 # IMPORTING CONTAINER OBJECT TYPES VARIABLES
 object_containers = 'object_container'
@@ -58,3 +63,38 @@ nat_policy = 'nat_policy_group'
 # DEVICE TYPES VARIABLES
 fmc_device_type = 'fmc_api'
 panmc_device_type = 'panmc_api'
+fmc_config_device_type = 'fmc_config'
+panmc_config_device_type = 'panmc_config'
+
+# CONFIG FILE DEVICE VARIABLES
+# number of bytes read at once from the config file of a device and version saved when the config file does not hold one
+config_file_chunk_size = 1048576
+config_device_default_version = 'unknown'
+
+# DEVICE API VARIABLES
+# number of threads retrieving data from the security device during an import
+import_threads = 4
+# the FMC REST API accepts at most 120 requests per minute and 10 simultaneous connections per user
+fmc_api_requests_per_minute = 120
+fmc_api_max_connections = 10
+# folder holding the snapshots of the raw API responses and number of seconds a snapshot is valid for (0 means forever)
+api_snapshot_folder = "snapshots"
+api_snapshot_ttl = 86400
+# number of objects requested per page when streaming the objects of a device and number of pages retrieved in advance
+import_page_size = 1000
+stream_prefetch_pages = 2
+# number of policies sent to the target device in a single call during a migration
+policy_push_chunk_size = 100
+# number of Panorama device groups whose policies are pushed in parallel during a migration
+panmc_migration_threads = 4
+# hostname of the offline Panorama a migration plan is built on and version used when the target device has no version
+migration_plan_hostname = 'migration-plan'
+migration_plan_default_version = '10.1.0'
+# number of containers loaded from the db in advance while another container is migrated by --migrate-all
+migration_prefetch_containers = 1
+# number of Panorama templates whose zones are refreshed in parallel
+panmc_api_threads = 8
+# number of pages of a single FMC collection retrieved in parallel
+fmc_api_page_threads = 4
+# number of seconds the FMC API calls are paused after a 429 response that does not hold a Retry-After header
+fmc_api_backoff_delay = 10
@@ -1,6 +1,7 @@
 import argparse
 import sys
 import utils.exceptions as PioneerExceptions
+import utils.gvars as gvars
 import logging
 import os
 import uuid
@@ -48,11 +49,30 @@ def create_parser():
     parser.add_argument("--hostname [hostname]", help="Specify the hostname or IP address of the security device.")
     parser.add_argument("--port [port]", default='https', help="Specify the port. Default value is https.")
     parser.add_argument("--domain [fmc_domain]", default='Global', help="For FMC devices, specify the administration domain.")
-
+    parser.add_argument("--config-file [path]", help="For config file devices (fmc_config, panmc_config), specify the JSON or XML export the device is imported from.")
+
+    parser.add_argument("--bulk-load", action='store_true', help="Load the largest tables of the device with COPY while importing a device.")
+    parser.add_argument("--atomic-import", action='store_true', help="Import the device in a single transaction. Nothing is kept in the device database if the import fails.")
+    parser.add_argument("--commit-every", type=int, default=0, help="While importing a device, also commit every time this many rows are written. By default, the import is committed after each container and object type.")
+    parser.add_argument("--insert-batch-size", type=int, default=gvars.db_insert_batch_size, help=f"Number of rows written to the database in a single statement while importing a device. Default value is {gvars.db_insert_batch_size}.")
+
+    parser.add_argument("--import-threads", type=int, default=gvars.import_threads, help=f"Number of threads retrieving data from the security device while importing it. Default value is {gvars.import_threads}.")
+    parser.add_argument("--stream-pages", action='store_true', help="Save the objects and policies of the device page by page while they are retrieved, instead of retrieving all of them first. Keeps the memory usage of large imports bounded.")
+    parser.add_argument("--use-snapshot", action='store_true', help="Store the raw API responses of the device in a local snapshot and reuse them on the next imports of the device.")
+    parser.add_argument("--snapshot-ttl", type=int, default=gvars.api_snapshot_ttl, help=f"Number of seconds an API snapshot is reused for. 0 means it never expires. Default value is {gvars.api_snapshot_ttl}.")
+    parser.add_argument("--refresh-snapshot", action='store_true', help="Delete the API snapshot of the device before importing it. Implies --use-snapshot.")
+    parser.add_argument("--offline", action='store_true', help="Import the device from its API snapshot only, without connecting to it.")
+    parser.add_argument("--refresh", action='store_true', help="Import an existing device again and only write the objects and policies that changed since its previous import. Use together with --device-name.")
+    parser.add_argument("--create-indexes", action='store_true', help="Add the missing indexes to the database of an existing project or security device. Use together with --project or --device-name.")
     parser.add_argument("--device-name [device_name]", help="Specify the security device where you make the changes.")
     
     parser.add_argument("--migrate", nargs='?', const=True, default=False, help="Flag to initiate the migration process.")
+    parser.add_argument("--migrate-all", action='store_true', help="Migrate all the mapped security and NAT policy containers. The next container is loaded from the database while the current one is migrated.")
+    parser.add_argument("--migration-threads", type=int, default=gvars.panmc_migration_threads, help=f"Number of target device groups whose policies are pushed in parallel during a migration. Each thread opens its own connection to the target device. Default value is {gvars.panmc_migration_threads}.")
+    parser.add_argument("--incremental", action='store_true', help="Together with --migrate or --migrate-all, only create the objects and policies that are missing or changed on the target device. Makes reruns after a partial failure fast.")
+    parser.add_argument("--plan [path]", help="Together with --migrate or --migrate-all, write the objects and policies of the migration to this file instead of creating them on the target device. Files ending in .xml get an XML config that can be loaded on the Panorama, the other ones get set commands.")
     parser.add_argument("--security-policy-container", help="Specify the security policy container name.")
+    parser.add_argument("--push-chunk-size", type=int, default=gvars.policy_push_chunk_size, help=f"Number of policies sent to the target device in a single call during a migration. A failed call is split until the policies that cannot be created are found. Default value is {gvars.policy_push_chunk_size}.")
     parser.add_argument("--nat-policy-container", help="Specify the NAT policy container name.")
 
     # Container mapping arguments